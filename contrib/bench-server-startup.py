@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+#
+# Copyright (C) 2026 FreeIPA Contributors see COPYING for license
+#
+"""Measure start up time of the IPA server API
+
+Every sample bootstraps and finalizes the server API in a new process, the
+same way the WSGI application does, once with all plugin modules imported
+and once with plugins added from the plugin manifest:
+
+    $ python contrib/bench-server-startup.py --runs 10
+
+The manifest is written by ipa-server-install and ipa-server-upgrade, a
+manifest of the current tree can be written with --write-manifest.
+"""
+from __future__ import print_function
+
+import optparse  # pylint: disable=deprecated-module
+import os
+import subprocess
+import sys
+import tempfile
+
+from ipaplatform.paths import paths
+
+SAMPLE_SCRIPT = """
+import sys
+import time
+start = time.time()
+from ipalib import api
+api.bootstrap(context='server', confdir=sys.argv[1], log=None,
+              plugins_on_demand=sys.argv[2] == 'on-demand',
+              plugin_manifest=sys.argv[3] or None)
+api.finalize()
+for backend in api.Backend():
+    backend.ensure_finalized()
+print(time.time() - start)
+"""
+
+MANIFEST_SCRIPT = """
+import sys
+from ipalib import api
+api.bootstrap(context='server', confdir=sys.argv[1], log=None)
+api.write_plugin_manifest(sys.argv[2])
+"""
+
+
+def sample(confdir, mode, manifest):
+    out = subprocess.check_output(
+        [sys.executable, '-c', SAMPLE_SCRIPT, confdir, mode, manifest or ''])
+    return float(out.decode('utf-8').split()[-1])
+
+
+def main():
+    parser = optparse.OptionParser()
+    parser.add_option('--runs', type='int', default=5)
+    parser.add_option('--confdir', default=paths.ETC_IPA)
+    parser.add_option('--manifest', default=paths.IPA_PLUGIN_MANIFEST)
+    parser.add_option('--write-manifest', action='store_true', default=False,
+                      help='write a manifest of the current tree first')
+    options, _args = parser.parse_args()
+
+    manifest = options.manifest
+    if options.write_manifest:
+        fd, manifest = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        subprocess.check_call(
+            [sys.executable, '-c', MANIFEST_SCRIPT, options.confdir,
+             manifest])
+
+    try:
+        for label, mode, path in (('full import', 'eager', None),
+                                  ('on demand', 'on-demand', None),
+                                  ('manifest', 'on-demand', manifest)):
+            times = sorted(sample(options.confdir, mode, path)
+                           for _i in range(options.runs))
+            print('{:<12} min {:.3f}s  median {:.3f}s  max {:.3f}s'.format(
+                label, times[0], times[len(times) // 2], times[-1]))
+    finally:
+        if options.write_manifest:
+            os.unlink(manifest)
+
+
+if __name__ == '__main__':
+    main()
@@ -43,9 +43,15 @@ from ipalib import api
 
 logger = logging.getLogger(os.path.basename(__file__))
 
-api.bootstrap(context='server', confdir=paths.ETC_IPA, log=None)
+# the plugin manifest is only used with plugins_on_demand set in the
+# configuration
+api.bootstrap(context='server', confdir=paths.ETC_IPA, log=None,
+              plugin_manifest=paths.IPA_PLUGIN_MANIFEST)
 try:
     api.finalize()
+    # WSGI applications are mounted when their backends are finalized
+    for backend in api.Backend():
+        backend.ensure_finalized()
 except Exception as e:
     logger.error('Failed to start IPA: %s', e)
 else:
@@ -20,6 +20,8 @@
 import logging
 import operator
 import socket
+import threading
+import time
 
 import six
 
@@ -44,6 +46,16 @@ UNKNOWN_ERROR = -15
 
 IPA_BASEDN_INFO = 'ipa v2.0'
 
+# results of ipacheckldap() which verify that the server can be used
+VERIFIED_RESULTS = (0, NO_ACCESS_TO_LDAP, NO_TLS_LDAP)
+
+# seconds to wait for preferred servers once a less preferred server
+# has been verified
+PREFERRED_SERVER_WAIT = 1
+
+# maximal number of servers checked at once
+PROBE_THREADS = 4
+
 error_names = {
     0: 'Success',
     NOT_FQDN: 'NOT_FQDN',
@@ -286,16 +298,34 @@ class IPADiscovery(object):
             self.kdc_source = "Kerberos DNS record discovery bypassed"
 
         # We may have received multiple servers corresponding to the domain
-        # Iterate through all of those to check if it is IPA LDAP server
+        # Check all of those concurrently to find out if they are IPA LDAP
+        # servers. Servers discovered via DNS are sorted by preference and
+        # we only need the first one which can be verified.
         ldapret = [NOT_IPA_SERVER]
         ldapaccess = True
         logger.debug("[LDAP server check]")
         valid_servers = []
-        for server in servers:
+        probes = self._probe_servers(servers, self.realm, ca_cert_path,
+                                     first_verified=autodiscovered)
+        for i, server in enumerate(servers):
             logger.debug('Verifying that %s (realm %s) is an IPA server',
                          server, self.realm)
-            # check ldap now
-            ldapret = self.ipacheckldap(server, self.realm, ca_cert_path=ca_cert_path)
+            if i not in probes:
+                logger.warning(
+                   'Skip %s: check did not finish in time, using a less '
+                   'preferred server', server)
+                continue
+            ldapret, probe, _duration = probes[i]
+            if probe.basedn is not None:
+                self.basedn = probe.basedn
+                self.basedn_source = probe.basedn_source
+            if (ldapret[0] == 0 and self.realm is not None and
+                    ldapret[2] != self.realm):
+                # servers were checked at once, not after the realm was
+                # found on a previous server
+                logger.debug("Realm %s does not match realm %s of %s",
+                             ldapret[2], self.realm, server)
+                ldapret = [REALM_NOT_FOUND]
 
             if ldapret[0] == 0:
                 self.server = ldapret[1]
@@ -358,11 +388,97 @@ class IPADiscovery(object):
         # If we have any servers left then override the last return value
         # to indicate success.
         if valid_servers:
-            self.server = servers[0]
+            if autodiscovered:
+                # preferred servers may have been skipped when their check
+                # did not finish in time
+                self.server = valid_servers[0]
+            else:
+                self.server = servers[0]
             ldapret[0] = 0
 
         return ldapret[0]
 
+    def _probe_servers(self, servers, realm, ca_cert_path=None,
+                       first_verified=False):
+        """
+        Check LDAP servers concurrently with ipacheckldap(), at most
+        PROBE_THREADS servers at once in order of preference.
+
+        When first_verified is True, return as soon as the first server in
+        order of preference is verified. A less preferred server is used
+        when the preferred ones do not finish within PREFERRED_SERVER_WAIT
+        seconds after it was verified. Otherwise wait for all servers.
+
+        Returns a dict mapping indexes of finished servers to a tuple
+        (ipacheckldap() result, IPADiscovery object used for the check,
+        duration in seconds).
+        """
+        cond = threading.Condition()
+        probes = {}
+        # index of the next server to check, checks are not started anymore
+        # once done is set
+        state = dict(next=0, done=False)
+
+        def probe(i, server):
+            discovery = IPADiscovery()
+            start = time.time()
+            ldapret = [UNKNOWN_ERROR]
+            try:
+                ldapret = discovery.ipacheckldap(
+                    server, realm, ca_cert_path=ca_cert_path)
+            finally:
+                with cond:
+                    probes[i] = (ldapret, discovery, time.time() - start)
+                    cond.notify_all()
+
+        def worker():
+            while True:
+                with cond:
+                    if state['done'] or state['next'] >= len(servers):
+                        return
+                    i = state['next']
+                    state['next'] += 1
+                probe(i, servers[i])
+
+        for _i in range(min(PROBE_THREADS, len(servers))):
+            thread = threading.Thread(target=worker)
+            thread.daemon = True
+            thread.start()
+
+        deadline = None
+        with cond:
+            while len(probes) < len(servers):
+                if first_verified:
+                    verified = [i for i in sorted(probes)
+                                if probes[i][0][0] in VERIFIED_RESULTS]
+                    if verified:
+                        if all(i in probes for i in range(verified[0])):
+                            break
+                        if deadline is None:
+                            deadline = time.time() + PREFERRED_SERVER_WAIT
+                if deadline is None:
+                    cond.wait()
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    cond.wait(remaining)
+            state['done'] = True
+            probes = dict(probes)
+
+        summary = []
+        for i, server in enumerate(servers):
+            if i in probes:
+                ldapret, _discovery, duration = probes[i]
+                summary.append('%s: %s (%.2f s)' % (
+                    server, error_names.get(ldapret[0], ldapret[0]),
+                    duration))
+            else:
+                summary.append('%s: not finished' % server)
+        logger.debug("LDAP server check results: %s", ', '.join(summary))
+
+        return probes
+
     def ipacheckldap(self, thost, trealm, ca_cert_path=None):
         """
         Given a host and kerberos realm verify that it is an IPA LDAP
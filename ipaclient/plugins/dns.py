@@ -20,6 +20,9 @@
 
 from __future__ import print_function
 
+import collections
+import json
+
 import six
 import copy
 import re
@@ -32,11 +35,11 @@ from ipalib.dns import (get_record_rrtype,
                         part_name_format,
                         record_name_format)
 from ipalib.frontend import Command
-from ipalib.parameters import Bool, Str
+from ipalib.parameters import Bool, File, Str
 from ipalib.plugable import Registry
 from ipalib import _, ngettext
 from ipalib import util
-from ipapython.dnsutil import DNSName
+from ipapython.dnsutil import DNSName, iter_zonefile_records
 
 if six.PY3:
     unicode = str
@@ -130,6 +133,122 @@ class dnszone_mod(DNSZoneMethodOverride):
     pass
 
 
+@register(override=True, no_fail=True)
+class dnszone_import(MethodOverride):
+    takes_options = (
+        File(
+            'file?',
+            label=_("Input filename"),
+            doc=_('File to load the zone data from.'),
+            include='cli',
+        ),
+    )
+
+    # Number of records sent to the server in one request
+    chunk_size = 1000
+
+    def forward(self, *args, **options):
+        if self.api.env.context == 'cli':
+            if 'zonedata' in options and 'file' in options:
+                raise errors.MutuallyExclusiveError(
+                    reason=_("cannot specify both zone data and file"))
+            if 'zonedata' not in options and 'file' in options:
+                options['zonedata'] = options.pop('file')
+
+        zonedata = options.get('zonedata')
+        batches = None
+        if zonedata:
+            zone = DNSName(args[-1]).make_absolute()
+            try:
+                batches = list(self._iter_batches(
+                    zone, zonedata, options.get('format', u'zonefile')))
+            except (ValueError, KeyError, TypeError) as e:
+                raise errors.ValidationError(name='zonedata',
+                                             error=unicode(e))
+        if not batches:
+            return super(dnszone_import, self).forward(*args, **options)
+
+        # the records are sent in JSON Lines format in batches, the records
+        # of an owner name in one batch
+        result = None
+        for batch in batches:
+            response = super(dnszone_import, self).forward(
+                *args, **dict(options, zonedata=batch, format=u'json'))
+            if result is None:
+                result = response
+            else:
+                for key, value in response['result'].items():
+                    result['result'][key] += value
+        return result
+
+    def _iter_batches(self, zone, zonedata, data_format):
+        """
+        Iterate through batches of about ``chunk_size`` records of
+        ``zonedata`` in JSON Lines format.
+        """
+        if data_format == u'json':
+            records = (json.loads(line) for line in zonedata.splitlines()
+                       if line.strip())
+        else:
+            records = (
+                dict(name=unicode(name), ttl=ttl, type=rrtype, data=data)
+                for (name, ttl, rrtype, data)
+                in iter_zonefile_records(zonedata, zone)
+            )
+
+        names = collections.OrderedDict()
+        for record in records:
+            if record.get('ttl') is None:
+                record.pop('ttl', None)
+            names.setdefault(record['name'], []).append(
+                json.dumps(record, sort_keys=True) + u'\n')
+
+        batch = []
+        for lines in names.values():
+            batch.extend(lines)
+            if len(batch) >= self.chunk_size:
+                yield u''.join(batch)
+                batch = []
+        if batch:
+            yield u''.join(batch)
+
+
+@register(override=True, no_fail=True)
+class dnszone_export(MethodOverride):
+    takes_options = (
+        Str(
+            'out?',
+            label=_("Output filename"),
+            doc=_('File to store the zone data in.'),
+            include='cli',
+        ),
+    )
+
+    def forward(self, *args, **options):
+        # pop `out` before sending to server as it is only client side option
+        out = options.pop('out', None)
+        if out:
+            util.check_writable_file(out)
+
+        res = super(dnszone_export, self).forward(*args, **options)
+
+        if out and 'result' in res:
+            try:
+                with open(out, "w") as f:
+                    f.write(res['result'])
+            except (OSError, IOError) as e:
+                raise errors.FileError(reason=unicode(e))
+
+        return res
+
+    def output_for_cli(self, textui, output, *args, **options):
+        if options.get('out'):
+            textui.print_summary(output['summary'])
+        else:
+            textui.print_plain(output['result'].rstrip(u'\n'))
+        return 0
+
+
 # Support old servers without dnsrecord_split_parts
 # Do not add anything new here!
 @register(no_fail=True)
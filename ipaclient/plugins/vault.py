@@ -26,6 +26,7 @@ import json
 import logging
 import os
 import tempfile
+import uuid
 
 from cryptography.fernet import Fernet, InvalidToken
 from cryptography.hazmat.backends import default_backend
@@ -80,6 +81,8 @@ def validated_read(argname, filename, mode='r', encoding=None):
 register = Registry()
 
 MAX_VAULT_DATA_SIZE = 2**20  # = 1 MB
+# size of parts of data archived as multi-part vault data
+VAULT_DATA_CHUNK_SIZE = MAX_VAULT_DATA_SIZE
 
 
 def generate_symmetric_key(password, salt):
@@ -667,6 +670,13 @@ class ModVaultData(Local):
             if raise_unexpected:
                 raise
 
+    def supports_chunks(self):
+        """
+        Checks whether the server supports multi-part vault data.
+        """
+        internal = self.api.Command[self.name + '_internal']
+        return 'generation' in internal.options
+
     def internal(self, algo, *args, **options):
         """
         Calls the internal counterpart of the command.
@@ -744,7 +754,9 @@ class vault_archive(ModVaultData):
 
     def get_options(self):
         for option in self.api.Command.vault_archive_internal.options():
-            if option.name not in ('nonce',
+            if option.name not in ('chunk',
+                                   'generation',
+                                   'nonce',
                                    'session_key',
                                    'vault_data',
                                    'version'):
@@ -781,6 +793,69 @@ class vault_archive(ModVaultData):
 
         return nonce, wrapped_vault_data
 
+    def _archive_part(self, vault_data, chunk, generation, *args, **options):
+        """Wrap a part of vault data and send it to the server
+
+        :param dict vault_data: vault data to be dumped to JSON
+        :param chunk: index of the part of multi-part vault data or None
+        :param generation: generation of the parts of multi-part vault data
+                           or None
+        """
+        json_vault_data = json.dumps(vault_data).encode('utf-8')
+
+        # generate session key
+        algo = self._generate_session_key()
+        # wrap vault data
+        nonce, wrapped_vault_data = self._wrap_data(algo, json_vault_data)
+        options = dict(options, nonce=nonce, vault_data=wrapped_vault_data)
+        if chunk is not None:
+            options['chunk'] = chunk
+        if generation is not None:
+            options['generation'] = generation
+        return self.internal(algo, *args, **options)
+
+    def _archive_chunks(self, input_file, encryption_key, encrypted_key,
+                        *args, **options):
+        """Archive a file as multi-part vault data
+
+        The file is read, encrypted and sent one part at a time. The parts
+        are archived under a new generation first and the header describing
+        them last, so the archived data are replaced only once all the parts
+        are archived.
+        """
+        generation = uuid.uuid4().hex
+        chunks = 0
+        try:
+            with io.open(input_file, mode='rb') as f:
+                while True:
+                    data = f.read(VAULT_DATA_CHUNK_SIZE)
+                    if not data:
+                        break
+                    chunks += 1
+                    if encryption_key:
+                        data = encrypt(data, symmetric_key=encryption_key)
+                    vault_data = {
+                        u'data': base64.b64encode(data).decode('utf-8')
+                    }
+                    self._archive_part(vault_data, chunks, generation,
+                                       *args, **options)
+        except IOError as exc:
+            raise errors.ValidationError(
+                name='in',
+                error=_("Cannot read file '%(filename)s': %(exc)s") % {
+                    'filename': input_file, 'exc': exc.args[1]
+                    }
+            )
+
+        # the header has no data, so clients which do not support
+        # multi-part vault data fail instead of returning the first part
+        vault_data = {u'chunks': chunks, u'generation': generation}
+        if encrypted_key:
+            vault_data[u'encrypted_key'] = base64.b64encode(encrypted_key)\
+                .decode('utf-8')
+        return self._archive_part(vault_data, None, generation, *args,
+                                  **options)
+
     def forward(self, *args, **options):
         data = options.get('data')
         input_file = options.get('in')
@@ -800,6 +875,8 @@ class vault_archive(ModVaultData):
         if 'password_file' in options:
             del options['password_file']
 
+        chunked = False
+
         # get data
         if data and input_file:
             raise errors.MutuallyExclusiveError(
@@ -819,12 +896,16 @@ class vault_archive(ModVaultData):
                 raise errors.ValidationError(name="in", error=_(
                     "Cannot read file '%(filename)s': %(exc)s")
                     % {'filename': input_file, 'exc': exc.args[1]})
-            if stat.st_size > MAX_VAULT_DATA_SIZE:
+            if stat.st_size <= MAX_VAULT_DATA_SIZE:
+                data = validated_read('in', input_file, mode='rb')
+            elif self.supports_chunks():
+                # large files are archived in parts, see _archive_chunks()
+                chunked = True
+            else:
                 raise errors.ValidationError(name="in", error=_(
                     "Size of data exceeds the limit. Current vault data size "
                     "limit is %(limit)d B")
                     % {'limit': MAX_VAULT_DATA_SIZE})
-            data = validated_read('in', input_file, mode='rb')
 
         else:
             data = b''
@@ -843,6 +924,7 @@ class vault_archive(ModVaultData):
 
         if vault_type == u'standard':
 
+            encryption_key = None
             encrypted_key = None
 
         elif vault_type == u'symmetric':
@@ -870,9 +952,11 @@ class vault_archive(ModVaultData):
                         'Password', confirm=False)
 
             if not override_password:
-                # verify password by retrieving existing data
+                # verify password by retrieving existing data, which may be
+                # too large to be kept in memory
                 opts = options.copy()
                 opts['password'] = password
+                opts['out'] = os.devnull
                 try:
                     self.api.Command.vault_retrieve(*args, **opts)
                 except errors.NotFound:
@@ -883,9 +967,6 @@ class vault_archive(ModVaultData):
             # generate encryption key from vault password
             encryption_key = generate_symmetric_key(password, salt)
 
-            # encrypt data with encryption key
-            data = encrypt(data, symmetric_key=encryption_key)
-
             encrypted_key = None
 
         elif vault_type == u'asymmetric':
@@ -895,9 +976,6 @@ class vault_archive(ModVaultData):
             # generate encryption key
             encryption_key = base64.b64encode(os.urandom(32))
 
-            # encrypt data with encryption key
-            data = encrypt(data, symmetric_key=encryption_key)
-
             # encrypt encryption key with public key
             encrypted_key = encrypt(encryption_key, public_key=public_key)
 
@@ -906,6 +984,13 @@ class vault_archive(ModVaultData):
                 name='vault_type',
                 error=_('Invalid vault type'))
 
+        if chunked:
+            return self._archive_chunks(input_file, encryption_key,
+                                        encrypted_key, *args, **options)
+
+        if encryption_key:
+            # encrypt data with encryption key
+            data = encrypt(data, symmetric_key=encryption_key)
 
         vault_data = {
             'data': base64.b64encode(data).decode('utf-8')
@@ -914,17 +999,7 @@ class vault_archive(ModVaultData):
             vault_data[u'encrypted_key'] = base64.b64encode(encrypted_key)\
                 .decode('utf-8')
 
-        json_vault_data = json.dumps(vault_data).encode('utf-8')
-
-        # generate session key
-        algo = self._generate_session_key()
-        # wrap vault data
-        nonce, wrapped_vault_data = self._wrap_data(algo, json_vault_data)
-        options.update(
-            nonce=nonce,
-            vault_data=wrapped_vault_data
-        )
-        return self.internal(algo, *args, **options)
+        return self._archive_part(vault_data, None, None, *args, **options)
 
 
 @register(no_fail=True)
@@ -990,7 +1065,8 @@ class vault_retrieve(ModVaultData):
 
     def get_options(self):
         for option in self.api.Command.vault_retrieve_internal.options():
-            if option.name not in ('session_key', 'version'):
+            if option.name not in ('chunk', 'generation', 'session_key',
+                                   'version'):
                 yield option
         for option in super(vault_retrieve, self).get_options():
             yield option
@@ -1017,6 +1093,29 @@ class vault_retrieve(ModVaultData):
         # load JSON
         return json.loads(json_vault_data.decode('utf-8'))
 
+    def _decode_data(self, vault_data, encryption_key):
+        data = base64.b64decode(vault_data[u'data'].encode('utf-8'))
+        if encryption_key:
+            # decrypt data with encryption key
+            data = decrypt(data, symmetric_key=encryption_key)
+        return data
+
+    def _iter_chunks(self, chunks, generation, encryption_key,
+                     *args, **options):
+        """Retrieve and decrypt parts of multi-part vault data one by one
+        """
+        for chunk in range(1, chunks + 1):
+            algo = self._generate_session_key()
+            response = self.internal(
+                algo, *args,
+                **dict(options, chunk=chunk, generation=generation))
+            vault_data = self._unwrap_response(
+                algo,
+                response['result']['nonce'],
+                response['result']['vault_data']
+            )
+            yield self._decode_data(vault_data, encryption_key)
+
     def forward(self, *args, **options):
         output_file = options.get('out')
 
@@ -1060,7 +1159,8 @@ class vault_retrieve(ModVaultData):
         )
         del algo
 
-        data = base64.b64decode(vault_data[u'data'].encode('utf-8'))
+        # multi-part vault data start with a header without any data
+        chunks = vault_data.get(u'chunks')
         encrypted_key = None
 
         if 'encrypted_key' in vault_data:
@@ -1069,7 +1169,7 @@ class vault_retrieve(ModVaultData):
 
         if vault_type == u'standard':
 
-            pass
+            encryption_key = None
 
         elif vault_type == u'symmetric':
 
@@ -1096,9 +1196,6 @@ class vault_retrieve(ModVaultData):
             # generate encryption key from password
             encryption_key = generate_symmetric_key(password, salt)
 
-            # decrypt data with encryption key
-            data = decrypt(data, symmetric_key=encryption_key)
-
         elif vault_type == u'asymmetric':
 
             # get encryption key with vault private key
@@ -1122,19 +1219,25 @@ class vault_retrieve(ModVaultData):
             # decrypt encryption key with private key
             encryption_key = decrypt(encrypted_key, private_key=private_key)
 
-            # decrypt data with encryption key
-            data = decrypt(data, symmetric_key=encryption_key)
-
         else:
             raise errors.ValidationError(
                 name='vault_type',
                 error=_('Invalid vault type'))
 
+        if chunks is None:
+            parts = [self._decode_data(vault_data, encryption_key)]
+        else:
+            parts = self._iter_chunks(chunks, vault_data[u'generation'],
+                                      encryption_key,
+                                      *args, **options)
+
         if output_file:
-            with open(output_file, 'w') as f:
-                f.write(data)
+            # write the parts as they arrive
+            with open(output_file, 'wb') as f:
+                for data in parts:
+                    f.write(data)
 
         else:
-            response['result'] = {'data': data}
+            response['result'] = {'data': b''.join(parts)}
 
         return response
@@ -33,6 +33,8 @@ import fcntl
 import termios
 import struct
 import base64
+import csv
+import shlex
 import traceback
 
 import six
@@ -54,13 +56,16 @@ from ipalib import backend
 from ipalib import plugable
 from ipalib.errors import (PublicError, CommandError, HelpError, InternalError,
                            NoSuchNamespaceError, ValidationError, NotFound,
-                           NotConfiguredError, PromptFailed)
+                           NotConfiguredError, PromptFailed, OptionError)
 from ipalib.constants import CLI_TAB, LDAP_GENERALIZED_TIME_FORMAT
-from ipalib.parameters import File, Str, Enum, Any, Flag
+from ipalib.output import Output
+from ipalib.parameters import File, Str, Enum, Any, Flag, Int
+from ipalib.rpc import json_encode_binary
 from ipalib.text import _
 from ipalib import api  # pylint: disable=unused-import
 from ipapython.dnsutil import DNSName
 from ipapython.admintool import ScriptError
+from ipapython.version import API_VERSION
 
 import datetime
 
@@ -185,6 +190,50 @@ class textui(backend.Backend):
         else:
             return value
 
+    def _csv_value(self, value):
+        if value is None:
+            return u''
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        text = u'\n'.join(unicode(self.encode_binary(v)) for v in value)
+        return self.encode(text)
+
+    def write_entries(self, entries, output_format, outfile=None):
+        """
+        Write entries in a machine-readable format.
+
+        Unlike `print_entries`, attributes are not labeled, ordered or
+        wrapped and each entry is written as soon as it is processed.
+
+        :param output_format: ``jsonl`` writes every entry as a JSON object
+            on a separate line, ``csv`` writes a header with the names of
+            all attributes followed by a row for every entry
+        """
+        if outfile is None:
+            outfile = sys.stdout
+
+        if output_format == 'jsonl':
+            for entry in entries:
+                outfile.write(json_encode_binary(entry, API_VERSION))
+                outfile.write('\n')
+        elif output_format == 'csv':
+            fields = []
+            seen = set()
+            for entry in entries:
+                for attr in entry:
+                    if attr not in seen:
+                        seen.add(attr)
+                        fields.append(attr)
+            writer = csv.writer(outfile)
+            writer.writerow(fields)
+            for entry in entries:
+                writer.writerow(
+                    [self._csv_value(entry.get(attr)) for attr in fields])
+        else:
+            raise ValueError(output_format)
+
+        outfile.flush()
+
     def print_plain(self, string):
         """
         Print exactly like ``print`` statement would.
@@ -965,6 +1014,56 @@ class console(frontend.Command):
             )
 
 
+class stream(frontend.Command):
+    """Run IPA commands read from a file or standard input.
+
+    Each line holds one command with its arguments and options, written as
+    they would be on the ipa command line. Empty lines and lines starting
+    with # are skipped. The result of each command is written to standard
+    output as a JSON object on a single line.
+
+    All commands share one connection. Consecutive commands are sent to
+    the server in batches; they still run one after another in the order
+    they were read.
+    """
+
+    takes_args = ('filename?',)
+    takes_options = (
+        Int('batch_size',
+            cli_name='batch_size',
+            label=_('Batch size'),
+            doc=_('Maximum number of commands sent to the server at once'),
+            minvalue=1,
+            default=50,
+            autofill=True,
+        ),
+    )
+    has_output = (
+        Output('failed', int, doc=_('Number of failed commands')),
+    )
+
+    topic = None
+
+    def run(self, filename=None, **options):
+        if filename:
+            try:
+                infile = open(filename)
+            except IOError as e:
+                exit("%s: %s" % (e.filename, e.strerror))
+        else:
+            infile = sys.stdin
+        try:
+            failed = self.Backend.cli.run_stream(
+                infile, sys.stdout, batch_size=options['batch_size'])
+        finally:
+            if infile is not sys.stdin:
+                infile.close()
+        return dict(failed=failed)
+
+    def output_for_cli(self, textui, output, *args, **options):
+        return 1 if output['failed'] else 0
+
+
 class show_api(frontend.Command):
     'Show attributes on dynamic API object'
 
@@ -1155,11 +1254,16 @@ class cli(backend.Executioner):
             kw = self.process_keyword_arguments(cmd, kw)
             result = self.execute(name, **kw)
             if callable(cmd.output_for_cli):
-                for param in cmd.params():
-                    if param.password and param.name in kw:
-                        del kw[param.name]
-                (args, options) = cmd.params_2_args_options(**kw)
-                rv = cmd.output_for_cli(self.api.Backend.textui, result, *args, **options)
+                rv = None
+                if self.env.output_format != 'text':
+                    rv = self.output_for_machine(cmd, result)
+                if rv is None:
+                    for param in cmd.params():
+                        if param.password and param.name in kw:
+                            del kw[param.name]
+                    (args, options) = cmd.params_2_args_options(**kw)
+                    rv = cmd.output_for_cli(
+                        self.api.Backend.textui, result, *args, **options)
                 if rv:
                     return rv
                 else:
@@ -1167,6 +1271,175 @@ class cli(backend.Executioner):
         finally:
             self.destroy_context()
 
+    def _is_batchable(self, cmd):
+        """
+        Check if a command can be executed within a ``batch`` call.
+
+        Local commands and commands which process their requests or
+        responses on the client in forward() have to be executed by
+        themselves.
+        """
+        if self.env.in_server or isinstance(cmd, frontend.Local):
+            return False
+        return (six.get_unbound_function(type(cmd).forward) is
+                six.get_unbound_function(frontend.Command.forward))
+
+    def _call(self, cmd, *args, **options):
+        """
+        Execute a command without destroying the request context.
+        """
+        try:
+            return cmd(*args, **options)
+        except PublicError:
+            raise
+        except Exception as e:
+            logger.exception(
+                'non-public: %s: %s', e.__class__.__name__, str(e)
+            )
+            raise InternalError()
+
+    def run_stream(self, infile, outfile, batch_size=1):
+        """
+        Execute commands read from infile, one command per line, and write
+        their results to outfile in the JSON Lines format.
+
+        Each output line is an object with the line number and the name of
+        the command, and either the result or an error with code, name and
+        message. Consecutive commands which can be batched are executed in
+        ``batch`` calls of up to batch_size commands.
+
+        Returns the number of failed commands.
+        """
+        pending = []
+        failures = []
+
+        def emit(lineno, name, result=None, error=None):
+            record = dict(line=lineno, command=name)
+            if error is None:
+                record['result'] = result
+            else:
+                failures.append(lineno)
+                record['error'] = error
+            outfile.write(json_encode_binary(record, API_VERSION))
+            outfile.write('\n')
+            outfile.flush()
+
+        def error_info(e):
+            return dict(code=e.errno, name=type(e).__name__,
+                        message=e.strerror)
+
+        def flush():
+            if not pending:
+                return
+            methods = [
+                dict(method=unicode(cmd.forwarded_name),
+                     params=list(cmd.params_2_args_options(**kw)))
+                for _lineno, cmd, kw in pending
+            ]
+            try:
+                results = self._call(self.Command.batch, *methods)['results']
+            except PublicError as e:
+                for lineno, cmd, _kw in pending:
+                    emit(lineno, cmd.name, error=error_info(e))
+            else:
+                for (lineno, cmd, _kw), result in zip(pending, results):
+                    error = result.pop('error', None)
+                    if error is None:
+                        emit(lineno, cmd.name, result=result)
+                    else:
+                        emit(lineno, cmd.name, error=dict(
+                            code=result.get('error_code'),
+                            name=result.get('error_name'),
+                            message=error))
+            del pending[:]
+
+        for lineno, line in enumerate(infile, 1):
+            if not isinstance(line, unicode):
+                line = self.Backend.textui.decode(line)
+            try:
+                argv = shlex.split(line, comments=True)
+            except ValueError as e:
+                flush()
+                emit(lineno, None, error=error_info(
+                    OptionError(message=unicode(e))))
+                continue
+            if not argv:
+                continue
+
+            name = from_cli(argv[0])
+            try:
+                if name not in self.Command or self.Command[name].NO_CLI:
+                    raise CommandError(name=argv[0])
+                cmd = self.Command[name]
+                try:
+                    kw = self.parse(cmd, argv[1:])
+                except SystemExit:
+                    # optparse has printed the error already
+                    raise OptionError(
+                        message=_('invalid arguments or options'))
+                if infile is sys.stdin:
+                    # standard input is the stream of commands
+                    for p in cmd.params():
+                        if (isinstance(p, File) and p.stdin_if_missing and
+                                p.name not in kw):
+                            raise ValidationError(
+                                name=to_cli(p.cli_name),
+                                error=_('No file to read'))
+                self.load_files(cmd, kw)
+            except PublicError as e:
+                flush()
+                emit(lineno, argv[0], error=error_info(e))
+                continue
+
+            if self._is_batchable(cmd):
+                pending.append((lineno, cmd, kw))
+                if len(pending) >= batch_size:
+                    flush()
+                continue
+
+            flush()
+            try:
+                result = self._call(cmd, **kw)
+            except PublicError as e:
+                emit(lineno, cmd.name, error=error_info(e))
+            else:
+                emit(lineno, cmd.name, result=result)
+
+        flush()
+
+        return len(failures)
+
+    def output_for_machine(self, cmd, result):
+        """
+        Write the result of a command in the output format set with the
+        --output-format global option.
+
+        Entries of find commands or the entry of other commands are written
+        by `textui.write_entries`. Other results are written as a single
+        JSON object in the jsonl format.
+
+        Returns None if the result cannot be written in the format.
+        """
+        if not isinstance(result, dict):
+            return None
+
+        output_format = self.env.output_format
+        entries = result.get('result')
+        if isinstance(entries, dict):
+            entries = [entries]
+        if (not isinstance(entries, (list, tuple)) or
+                not all(isinstance(e, dict) for e in entries)):
+            if output_format != 'jsonl':
+                return None
+            entries = [result]
+
+        cmd.log_messages(result)
+        self.Backend.textui.write_entries(entries, output_format)
+
+        if result.get('count') == 0:
+            return 1
+        return 0
+
     def parse(self, cmd, argv):
         parser = self.build_parser(cmd)
         (collector, args) = parser.parse_args(argv, Collector())
@@ -1380,6 +1653,7 @@ cli_plugins = (
     cli,
     textui,
     console,
+    stream,
     help,
     show_mappings,
 )
@@ -170,6 +170,9 @@ DEFAULT_CONFIG = (
     ('startup_traceback', False),
     ('mode', 'production'),
     ('wait_for_dns', 0),
+    # Entries of command output validated in production mode: all, sample
+    # or none
+    ('validate_output_entries', 'all'),
 
     # CA plugin:
     ('ca_host', FQDN),  # Set in Env._finalize_core()
@@ -191,6 +194,7 @@ DEFAULT_CONFIG = (
     ('interactive', True),
     ('fallback', True),
     ('delegate', False),
+    ('output_format', 'text'),
 
     # Enable certain optional plugins:
     ('enable_ra', False),
@@ -239,6 +243,7 @@ DEFAULT_CONFIG = (
     ('conf', object),  # File containing context specific config
     ('conf_default', object),  # File containing context independent config
     ('plugins_on_demand', object),  # Whether to finalize plugins on-demand (bool)
+    ('plugin_manifest', None),  # Plugin manifest to use with plugins_on_demand
     ('nss_dir', object),  # Path to nssdb, default {confdir}/nssdb
     ('tls_ca_cert', object),  # Path to CA cert file
 
@@ -414,6 +414,8 @@ class Command(HasParam):
 
     use_output_validation = True
     output = Plugin.finalize_attr('output')
+    _output_names = Plugin.finalize_attr('_output_names')
+    _output_validators = Plugin.finalize_attr('_output_validators')
     has_output = ('result',)
     output_params = Plugin.finalize_attr('output_params')
     has_output_params = tuple()
@@ -877,6 +879,8 @@ class Command(HasParam):
             params.insert(pos, i)
         self.params_by_default = NameSpace(params, sort=False)
         self.output = NameSpace(self._iter_output(), sort=False)
+        self._output_names = frozenset(self.output)
+        self._output_validators = tuple(self._iter_output_validators())
         self._create_param_namespace('output_params')
         super(Command, self)._on_finalize()
 
@@ -894,6 +898,26 @@ class Command(HasParam):
                 )
             yield o
 
+    def _iter_output_validators(self):
+        """
+        Iterate through ``(name, type, validate)`` checks of the output.
+
+        Entries of `ListOfEntries` outputs are validated according to the
+        ``validate_output_entries`` option in production mode and always
+        all of them otherwise.
+        """
+        entries = 'all'
+        if self.api.is_production_mode():
+            entries = self.api.env.validate_output_entries
+        for o in self.output():
+            validate = o.validate if callable(o.validate) else None
+            if isinstance(o, ListOfEntries):
+                if entries == 'sample':
+                    validate = o.validate_sample
+                elif entries == 'none':
+                    validate = None
+            yield (o.name, o.type, validate)
+
     def get_args(self):
         """
         Iterate through parameters for ``Command.args`` namespace.
@@ -976,9 +1000,10 @@ class Command(HasParam):
             raise TypeError('%s: need a %r; got a %r: %r' % (
                 nice, dict, type(output), output)
             )
-        expected_set = set(self.output)
-        actual_set = set(output) - set(['messages'])
-        if expected_set != actual_set:
+        expected_set = self._output_names
+        if (len(output) - ('messages' in output) != len(expected_set) or
+                not all(name in output for name in expected_set)):
+            actual_set = set(output) - set(['messages'])
             missing = expected_set - actual_set
             if missing:
                 raise ValueError('%s: missing keys %r in %r' % (
@@ -989,14 +1014,14 @@ class Command(HasParam):
                 raise ValueError('%s: unexpected keys %r in %r' % (
                     nice, sorted(extra), output)
                 )
-        for o in self.output():
-            value = output[o.name]
-            if not (o.type is None or isinstance(value, o.type)):
+        for (name, types, validate) in self._output_validators:
+            value = output[name]
+            if not (types is None or isinstance(value, types)):
                 raise TypeError('%s:\n  output[%r]: need %r; got %r: %r' % (
-                    nice, o.name, o.type, type(value), value)
+                    nice, name, types, type(value), value)
                 )
-            if callable(o.validate):
-                o.validate(self, value, version)
+            if validate is not None:
+                validate(self, value, version)
 
     def get_output_params(self):
         for param in self._get_param_iterable('output_params', verb='has'):
@@ -116,9 +116,29 @@ class ListOfEntries(Output):
     type = (list, tuple)
     doc = _('A list of LDAP entries')
 
+    # Maximum number of entries checked by validate_sample()
+    sample_size = 100
+
     def validate(self, cmd, entries, version):
         assert isinstance(entries, self.type)
-        for (i, entry) in enumerate(entries):
+        self._validate_entries(cmd, entries, range(len(entries)))
+
+    def validate_sample(self, cmd, entries, version):
+        """
+        Validate about `sample_size` entries spread evenly over
+        ``entries``, including the last one.
+        """
+        assert isinstance(entries, self.type)
+        count = len(entries)
+        step = max(1, -(-count // self.sample_size))
+        indexes = list(range(0, count, step))
+        if count and indexes[-1] != count - 1:
+            indexes.append(count - 1)
+        self._validate_entries(cmd, entries, indexes)
+
+    def _validate_entries(self, cmd, entries, indexes):
+        for i in indexes:
+            entry = entries[i]
             if not isinstance(entry, dict):
                 raise TypeError(emsg % (cmd.name, self.__class__.__name__,
                     self.name, i, dict, type(entry), entry)
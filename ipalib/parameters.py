@@ -142,6 +142,25 @@ if six.PY3:
     unicode = str
 
 
+def _passthrough(convert):
+    """
+    Mark a ``_convert_scalar()`` method which returns values of one of
+    ``allowed_types`` unchanged.
+
+    `Param.convert()` returns multivalues with only such values as they are.
+    """
+    convert.passthrough = True
+    return convert
+
+
+def _overrides(cls, name):
+    """
+    Return True if ``cls`` overrides the `Param` method ``name``.
+    """
+    return (six.get_unbound_function(getattr(cls, name)) is not
+            six.get_unbound_function(getattr(Param, name)))
+
+
 class DefaultFrom(ReadOnly):
     """
     Derive a default value from other supplied values.
@@ -533,6 +552,7 @@ class Param(ReadOnly):
 
         # Add in class rules:
         class_rules = []
+        class_batch_rules = []
         for (key, kind, default) in self.kwargs:
             value = kw.get(key, default)
             if hasattr(self, key):
@@ -543,6 +563,8 @@ class Param(ReadOnly):
             rule_name = '_rule_%s' % key
             if value is not None and hasattr(self, rule_name):
                 class_rules.append(getattr(self, rule_name))
+                class_batch_rules.append(
+                    getattr(self, '_rules_%s' % key, None))
         check_name(self.cli_name)
 
         # Check that only 'include' or 'exclude' was provided:
@@ -569,6 +591,22 @@ class Param(ReadOnly):
                     '%s: rules must be callable; got %r' % (self.nice, rule)
                 )
 
+        # Fast paths for multivalues, used only where the result is the same
+        # as processing the values one by one:
+        cls = self.__class__
+        self._normalize_noop = (
+            self.normalizer is None and
+            not _overrides(cls, '_normalize_scalar')
+        )
+        self._convert_passthrough = getattr(
+            cls._convert_scalar, 'passthrough', False)
+        if self.query:
+            self._batch_rules = ()
+        elif None in class_batch_rules or _overrides(cls, '_validate_scalar'):
+            self._batch_rules = None
+        else:
+            self._batch_rules = tuple(class_batch_rules)
+
         # Check that cli_short_name is only 1 character long:
         if not (self.cli_short_name is None or len(self.cli_short_name) == 1):
             raise ValueError(
@@ -761,6 +799,8 @@ class Param(ReadOnly):
             if type(value) not in (tuple, list):
                 value = (value,)
         if self.multivalue:
+            if self._normalize_noop:
+                return tuple(value)
             return tuple(
                 self._normalize_scalar(v) for v in value
             )
@@ -839,14 +879,17 @@ class Param(ReadOnly):
         if self.multivalue:
             if type(value) not in (tuple, list):
                 value = (value,)
-            values = tuple(
-                convert(v) for v in value if not _is_null(v)
-            )
+            values = tuple(v for v in value if not _is_null(v))
             if len(values) == 0:
                 return
-            return values
+            if self._convert_passthrough:
+                types = self.allowed_types
+                if all(type(v) in types for v in values):
+                    return values
+            return tuple(convert(v) for v in values)
         return convert(value)
 
+    @_passthrough
     def _convert_scalar(self, value, index=None):
         """
         Convert a single scalar value.
@@ -878,11 +921,36 @@ class Param(ReadOnly):
                 )
             if len(value) < 1:
                 raise ValueError('value: empty tuple must be converted to None')
-            for v in value:
-                self._validate_scalar(v)
+            self._validate_values(value)
         else:
             self._validate_scalar(value)
 
+    def _validate_values(self, values):
+        """
+        Check validity of all values of a multivalue.
+
+        The types of the values and the class rules which have a
+        ``_rules_<kwarg>()`` counterpart checking all values at once are
+        checked for all values first, then the other rules value by value. If
+        any value does not pass the former, the values are checked one by
+        one, so the error is the same as from `Param._validate_scalar()`.
+        """
+        batch_rules = self._batch_rules
+        if batch_rules is not None:
+            types = self.allowed_types
+            if (all(isinstance(v, types) for v in values) and
+                    all(rule(values) for rule in batch_rules)):
+                rules = self.all_rules[len(batch_rules):]
+                for v in values:
+                    for rule in rules:
+                        error = rule(ugettext, v)
+                        if error is not None:
+                            raise ValidationError(
+                                name=self.get_param_name(), error=error)
+                return
+        for v in values:
+            self._validate_scalar(v)
+
     def _validate_scalar(self, value, index=None):
         for t in self.allowed_types:
             if isinstance(value, t):
@@ -1062,6 +1130,7 @@ class Number(Param):
     Base class for the `Int` and `Decimal` parameters.
     """
 
+    @_passthrough
     def _convert_scalar(self, value, index=None):
         """
         Convert a single scalar value.
@@ -1078,6 +1147,18 @@ class Number(Param):
                                   error=ugettext(self.scalar_error))
         raise ConversionError(name=self.name, error=ugettext(self.type_error))
 
+    def _rules_minvalue(self, values):
+        """
+        Check min constraint of all values.
+        """
+        return min(values) >= self.minvalue
+
+    def _rules_maxvalue(self, values):
+        """
+        Check max constraint of all values.
+        """
+        return max(values) <= self.maxvalue
+
 
 class Int(Number):
     """
@@ -1120,6 +1201,7 @@ class Int(Number):
                     self.nice, self.minvalue, self.maxvalue)
             )
 
+    @_passthrough
     def _convert_scalar(self, value, index=None):
         """
         Convert a single scalar value.
@@ -1353,6 +1435,31 @@ class Data(Param):
                     pattern=self.pattern,
                 )
 
+    def _rules_pattern(self, values):
+        """
+        Check pattern (regex) constraint of all values.
+        """
+        match = self.re.match
+        return all(match(v) is not None for v in values)
+
+    def _rules_minlength(self, values):
+        """
+        Check minlength constraint of all values.
+        """
+        return min(len(v) for v in values) >= self.minlength
+
+    def _rules_maxlength(self, values):
+        """
+        Check maxlength constraint of all values.
+        """
+        return max(len(v) for v in values) <= self.maxlength
+
+    def _rules_length(self, values):
+        """
+        Check length constraint of all values.
+        """
+        return all(len(v) == self.length for v in values)
+
 
 class Bytes(Data):
     """
@@ -1410,6 +1517,7 @@ class Bytes(Data):
                 length=self.length,
             )
 
+    @_passthrough
     def _convert_scalar(self, value, index=None):
         if isinstance(value, unicode):
             try:
@@ -1537,6 +1645,7 @@ class Str(Data):
         self.re_errmsg = kw.get('pattern_errmsg', None)
         super(Str, self).__init__(name, *rules, **kw)
 
+    @_passthrough
     def _convert_scalar(self, value, index=None):
         """
         Convert a single scalar value.
@@ -1560,6 +1669,14 @@ class Str(Data):
         if len(value) != len(value.strip()):
             return _('Leading and trailing spaces are not allowed')
 
+    def _rules_noextrawhitespace(self, values):
+        """
+        Check that no value has leading/trailing spaces.
+        """
+        if self.noextrawhitespace is False:
+            return True
+        return all(len(v) == len(v.strip()) for v in values)
+
     def _rule_minlength(self, _, value):
         """
         Check minlength constraint.
@@ -1659,6 +1776,12 @@ class Enum(Param):
                 values = u', '.join("'%s'" % value for value in self.values)
                 return _('must be one of %(values)s') % dict(values=values)
 
+    def _rules_values(self, values):
+        """
+        Check that all values are enumerated.
+        """
+        return all(v in self.values for v in values)
+
 class BytesEnum(Enum):
     """
     Enumerable for binary data (stored in the ``str`` type).
@@ -1694,6 +1817,7 @@ class IntEnum(Enum):
     allowed_types = six.integer_types
     type_error = Int.type_error
 
+    @_passthrough
     def _convert_scalar(self, value, index=None):
         """
         Convert a single scalar value.
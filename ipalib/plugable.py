@@ -24,6 +24,8 @@ The classes in this module make heavy use of Python container emulation. If
 you are unfamiliar with this Python feature, see
 http://docs.python.org/ref/sequence-types.html
 """
+import hashlib
+import json
 import logging
 import operator
 import re
@@ -82,6 +84,14 @@ def find_modules_in_dir(src_dir):
         yield module
 
 
+def _module_digest(filename):
+    """
+    Get a digest of the source of a plugin module.
+    """
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
 class Registry(object):
     """A decorator that makes plugins available to the API
 
@@ -282,6 +292,51 @@ class Plugin(ReadOnly):
         )
 
 
+class LazyPlugin(object):
+    """
+    Plugin registered from a plugin manifest.
+
+    The module of the plugin is imported when the plugin is instantiated or
+    when an attribute which is not stored in the manifest is requested.
+    """
+
+    def __init__(self, module_name, name, version, bases):
+        self.module_name = module_name
+        self.name = name
+        self.version = version
+        self.full_name = '{}/{}'.format(name, version)
+        self.bases = bases
+        self._class = None
+
+    @property
+    def plugin(self):
+        """
+        The plugin class, its module is imported on first access.
+        """
+        if self._class is None:
+            logger.debug("importing plugin module %s", self.module_name)
+            module = importlib.import_module(self.module_name)
+            for kwargs in module.register:
+                if kwargs['plugin'].full_name == self.full_name:
+                    self._class = kwargs['plugin']
+                    break
+            else:
+                raise errors.PluginModuleError(name=self.module_name)
+        return self._class
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.plugin, name)
+
+    def __call__(self, api):
+        return self.plugin(api)
+
+    def __repr__(self):
+        return '<%s %s.%s>' % (
+            self.__class__.__name__, self.module_name, self.full_name)
+
+
 class APINameSpace(collections.Mapping):
     def __init__(self, api, base):
         self.__api = api
@@ -574,6 +629,11 @@ class API(ReadOnly):
                 dest='fallback',
                 help='Only use the server configured in /etc/ipa/default.conf'
             )
+            parser.add_option('--output-format', type='choice',
+                choices=('text', 'jsonl', 'csv'), dest='output_format',
+                help='Output format of the command: text (default), jsonl '
+                     'or csv'
+            )
 
         return parser
 
@@ -593,7 +653,7 @@ class API(ReadOnly):
                     pass
                 overrides[str(key.strip())] = value.strip()
         for key in ('conf', 'debug', 'verbose', 'prompt_all', 'interactive',
-            'fallback', 'delegate'):
+            'fallback', 'delegate', 'output_format'):
             value = getattr(options, key, None)
             if value is not None:
                 overrides[key] = value
@@ -636,10 +696,19 @@ class API(ReadOnly):
                 name=package_name, file=package_file
             )
 
-        logger.debug("importing all plugin modules in %s...", package_name)
         modules = getattr(package, 'modules', find_modules_in_dir(package_dir))
         modules = ['.'.join((package_name, name)) for name in modules]
 
+        if self.env.plugins_on_demand and self.env.plugin_manifest:
+            manifest = self._load_plugin_manifest(package_name, package_dir,
+                                                  modules)
+            if manifest is not None:
+                logger.debug("adding plugins in %s from manifest %s",
+                             package_name, self.env.plugin_manifest)
+                self._add_plugin_manifest(manifest)
+                return
+
+        logger.debug("importing all plugin modules in %s...", package_name)
         for name in modules:
             logger.debug("importing plugin module %s", name)
             try:
@@ -657,6 +726,128 @@ class API(ReadOnly):
             except errors.PluginModuleError as e:
                 logger.debug("%s", e)
 
+    def get_plugin_manifest(self, package):
+        """
+        Get a manifest of plugins in the ``package``.
+
+        The manifest lists the plugins of each module of the package with
+        everything needed to add them to the API without importing the
+        module, and a digest of the module source to detect stale
+        manifests. It is a JSON serializable list.
+
+        :param package: A package from which to list plugins.
+        """
+        package_dir = path.dirname(path.abspath(package.__file__))
+        modules = getattr(package, 'modules', find_modules_in_dir(package_dir))
+
+        manifest = []
+        for name in modules:
+            module_name = '.'.join((package.__name__, name))
+            item = dict(
+                module=module_name,
+                digest=_module_digest(path.join(package_dir, name + '.py')),
+            )
+            try:
+                module = importlib.import_module(module_name)
+            except errors.SkipPluginModule as e:
+                item['skip'] = unicode(e.reason)
+                manifest.append(item)
+                continue
+
+            register = getattr(module, 'register', None)
+            item['plugins'] = plugins = []
+            if not isinstance(register, Registry):
+                manifest.append(item)
+                continue
+
+            for kwargs in register:
+                kwargs = dict(kwargs)
+                plugin = kwargs.pop('plugin')
+                plugins.append(dict(
+                    kwargs,
+                    name=plugin.name,
+                    version=plugin.version,
+                    bases=[b.__name__ for b in self.bases
+                           if issubclass(plugin, b)],
+                ))
+            manifest.append(item)
+
+        return manifest
+
+    def write_plugin_manifest(self, filename):
+        """
+        Write manifests of all plugin packages of the API to ``filename``.
+
+        Some plugin modules register plugins depending on the context, so
+        the manifest is only used by APIs with the same context.
+        """
+        manifest = dict(
+            context=self.env.context,
+            packages=dict(
+                (package.__name__, self.get_plugin_manifest(package))
+                for package in self.packages
+            ),
+        )
+        tmpname = filename + '.tmp'
+        with open(tmpname, 'w') as f:
+            os.fchmod(f.fileno(), 0o644)
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.rename(tmpname, filename)
+
+    def _load_plugin_manifest(self, package_name, package_dir, modules):
+        """
+        Load the manifest of ``package_name`` from the plugin manifest file.
+
+        Returns None if there is no manifest for the package or if it does
+        not match the context of the API or the modules of the package.
+        """
+        try:
+            with open(self.env.plugin_manifest) as f:
+                manifest = json.load(f)
+            if manifest['context'] != self.env.context:
+                raise ValueError("context %s" % manifest['context'])
+            manifest = manifest['packages'][package_name]
+        except (IOError, OSError, ValueError, KeyError) as e:
+            logger.debug("cannot use plugin manifest %s for %s: %s",
+                         self.env.plugin_manifest, package_name, e)
+            return None
+
+        if [item['module'] for item in manifest] != modules:
+            logger.debug("plugin manifest of %s is stale: modules differ",
+                         package_name)
+            return None
+
+        for item in manifest:
+            filename = path.join(package_dir,
+                                 item['module'].rpartition('.')[2] + '.py')
+            try:
+                digest = _module_digest(filename)
+            except (IOError, OSError):
+                digest = None
+            if digest != item['digest']:
+                logger.debug("plugin manifest of %s is stale: %s changed",
+                             package_name, item['module'])
+                return None
+
+        return manifest
+
+    def _add_plugin_manifest(self, manifest):
+        bases = dict((b.__name__, b) for b in self.bases)
+        for item in manifest:
+            if 'skip' in item:
+                logger.debug("skipping plugin module %s: %s",
+                             item['module'], item['skip'])
+                continue
+            for kwargs in item.get('plugins', []):
+                kwargs = dict((str(k), v) for k, v in kwargs.items())
+                plugin = LazyPlugin(
+                    str(item['module']),
+                    str(kwargs.pop('name')),
+                    str(kwargs.pop('version')),
+                    tuple(bases[b] for b in kwargs.pop('bases')),
+                )
+                self.add_plugin(plugin, **kwargs)
+
     def add_module(self, module):
         """
         Add plugins from the ``module``.
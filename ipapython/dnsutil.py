@@ -18,10 +18,13 @@
 #
 
 import logging
+import re
 
 import dns.name
 import dns.exception
+import dns.rdatatype
 import dns.resolver
+import dns.zone
 import copy
 
 import six
@@ -373,3 +376,38 @@ def check_zone_overlap(zone, raise_on_error=True):
         if ns:
             msg += u" and is handled by server(s): {0}".format(', '.join(ns))
         raise ValueError(msg)
+
+
+_zonefile_ttl_re = re.compile(r'^\$TTL\s', re.IGNORECASE | re.MULTILINE)
+
+# $TTL marking records without TTL, the maximal TTL allowed by RFC 2181
+_ZONEFILE_NO_TTL = 2 ** 31 - 1
+
+
+def iter_zonefile_records(zonedata, origin):
+    """
+    Iterate through ``(name, ttl, rrtype, data)`` records of ``zonedata`` in
+    zone file format, records of an owner name one after another. Names are
+    relative to ``origin``. The TTL of records without TTL is None unless
+    the data set it with $TTL. $INCLUDE directives are not allowed.
+
+    :raises: ValueError if the data are not valid
+    """
+    has_default_ttl = _zonefile_ttl_re.search(zonedata) is not None
+    if not has_default_ttl:
+        zonedata = u'$TTL %d\n%s' % (_ZONEFILE_NO_TTL, zonedata)
+    try:
+        parsed = dns.zone.from_text(zonedata, origin=origin, relativize=True,
+                                    check_origin=False)
+    except dns.exception.DNSException as e:
+        raise ValueError(e)
+    for name, node in sorted(parsed.nodes.items()):
+        for rdataset in node.rdatasets:
+            ttl = rdataset.ttl
+            if ttl == _ZONEFILE_NO_TTL and not has_default_ttl:
+                ttl = None
+            rrtype = unicode(dns.rdatatype.to_text(rdataset.rdtype))
+            for rdata in rdataset:
+                yield (DNSName(name), ttl, rrtype,
+                       unicode(rdata.to_text(origin=origin,
+                                             relativize=False)))
@@ -86,3 +86,105 @@ class Graph(object):
                 visited.add(vertex)
                 queue.extend(set(self._adj.get(vertex, [])) - visited)
         return visited
+
+    def strongly_connected_components(self, exclude=()):
+        """
+        Find strongly connected components of the graph (Tarjan's algorithm)
+
+        Vertices in `exclude` are treated as if they were removed from the
+        graph together with their edges, so what-if analysis does not need
+        a modified copy of the graph.
+
+        Return a list of frozensets of vertices. The components are listed
+        in reverse topological order of the condensation, i.e. a component
+        is always listed after every component reachable from it.
+        """
+        exclude = frozenset(exclude)
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        components = []
+
+        for root in self.vertices:
+            if root in exclude or root in index:
+                continue
+
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self._adj[root]))]
+
+            while work:
+                vertex, heads = work[-1]
+                for head in heads:
+                    if head in exclude:
+                        continue
+                    if head not in index:
+                        index[head] = lowlink[head] = len(index)
+                        stack.append(head)
+                        on_stack.add(head)
+                        work.append((head, iter(self._adj[head])))
+                        break
+                    elif head in on_stack:
+                        lowlink[vertex] = min(lowlink[vertex], index[head])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent],
+                                              lowlink[vertex])
+
+                    if lowlink[vertex] == index[vertex]:
+                        component = set()
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.add(member)
+                            if member == vertex:
+                                break
+                        components.append(frozenset(component))
+
+        return components
+
+    def is_strongly_connected(self, exclude=()):
+        """
+        Return True if every vertex can reach every other vertex
+        """
+        return len(self.strongly_connected_components(exclude)) <= 1
+
+    def reachability(self, components=None, exclude=()):
+        """
+        Get a set of vertices reachable from each vertex of the graph
+
+        The sets are computed once per strongly connected component by
+        walking the condensation of the graph, so all members of
+        a component share the same frozenset.
+
+        :param components: output of `strongly_connected_components`, it is
+                           computed when not given
+        :param exclude: vertices to treat as removed, used only when
+                        `components` are not given
+        :returns: dict mapping vertex to a frozenset of reachable vertices
+                  (including the vertex itself)
+        """
+        if components is None:
+            components = self.strongly_connected_components(exclude)
+
+        component_of = {}
+        for component in components:
+            for vertex in component:
+                component_of[vertex] = component
+
+        reachable = {}
+        for component in components:
+            reach = set(component)
+            for vertex in component:
+                for head in self._adj[vertex]:
+                    head_component = component_of.get(head)
+                    if (head_component is not None and
+                            head_component is not component):
+                        reach.update(reachable[head_component])
+            reachable[component] = frozenset(reach)
+
+        return {v: reachable[c] for c in components for v in c}
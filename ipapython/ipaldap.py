@@ -19,6 +19,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import base64
 import binascii
 import logging
 import time
@@ -73,6 +74,9 @@ TRUNCATED_SIZE_LIMIT = object()
 TRUNCATED_TIME_LIMIT = object()
 TRUNCATED_ADMIN_LIMIT = object()
 
+# Maximal number of searches in progress in LDAPClient.get_entries_multi
+MULTI_SEARCH_WINDOW = 100
+
 DIRMAN_DN = DN(('cn', 'directory manager'))
 
 
@@ -586,6 +590,159 @@ class SingleValueLDAPEntryView(LDAPEntryView):
             self._entry[name] = [value]
 
 
+_LDIF_MODOPS = {
+    'add': ldap.MOD_ADD,
+    'delete': ldap.MOD_DELETE,
+    'replace': ldap.MOD_REPLACE,
+}
+
+
+def _parse_ldif_line(line):
+    """
+    Parse a single unfolded LDIF line into attribute name and bytes value
+    """
+    attr, sep, value = line.partition(':')
+    if not sep:
+        raise ValueError("Invalid LDIF line: %r" % line)
+    attr = attr.strip()
+    if value.startswith(':'):
+        try:
+            return attr, base64.b64decode(value[1:].strip())
+        except (TypeError, binascii.Error):
+            raise ValueError("Invalid base64 value of '%s'" % attr)
+    elif value.startswith('<'):
+        raise ValueError("URL values are not supported: '%s'" % attr)
+    return attr, value.lstrip().encode('utf-8')
+
+
+def _parse_ldif_record(lines):
+    dn = None
+    changetype = None
+    changes = []
+    modop = None
+
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        elif line.rstrip() == '-':
+            attr, value = '-', None
+        else:
+            attr, value = _parse_ldif_line(line)
+        lattr = attr.lower()
+        if dn is None:
+            if lattr == 'version':
+                continue
+            elif lattr != 'dn':
+                raise ValueError("LDIF record does not start with dn")
+            dn = DN(value.decode('utf-8'))
+        elif lattr == 'changetype' and changetype is None and not changes:
+            changetype = value.decode('utf-8').lower()
+            if changetype == 'moddn':
+                changetype = 'modrdn'
+            if changetype not in ('add', 'modify', 'delete', 'modrdn'):
+                raise ValueError("%s: unknown changetype '%s'" %
+                                 (dn, changetype))
+        elif changetype == 'modify':
+            if lattr == '-':
+                if modop is None:
+                    raise ValueError("%s: unexpected '-'" % dn)
+                changes.append(modop)
+                modop = None
+            elif modop is None:
+                if lattr not in _LDIF_MODOPS:
+                    raise ValueError("%s: unknown modify operation '%s'" %
+                                     (dn, attr))
+                modop = (_LDIF_MODOPS[lattr], value.decode('utf-8'), [])
+            elif lattr == modop[1].lower():
+                modop[2].append(value)
+            else:
+                raise ValueError("%s: attribute '%s' in '%s' operation" %
+                                 (dn, attr, modop[1]))
+        elif lattr == '-':
+            raise ValueError("%s: unexpected '-'" % dn)
+        else:
+            changes.append((attr, value))
+
+    if dn is None:
+        return None
+
+    if changetype == 'modify':
+        if modop is not None:
+            changes.append(modop)
+        changes = [(op, attr, values or None) for op, attr, values in changes]
+    elif changetype in ('add', None):
+        attrs = CIDict()
+        for attr, value in changes:
+            attrs.setdefault(attr, []).append(value)
+        if changetype is None:
+            # ldapmodify replaces values of records without changetype
+            changetype = 'modify'
+            changes = [(ldap.MOD_REPLACE, attr, values)
+                       for attr, values in attrs.items()]
+        else:
+            changes = list(attrs.items())
+    elif changetype == 'modrdn':
+        params = dict((attr.lower(), value.decode('utf-8'))
+                      for attr, value in changes)
+        try:
+            newrdn = params['newrdn']
+        except KeyError:
+            raise ValueError("%s: newrdn is missing" % dn)
+        newsuperior = params.get('newsuperior')
+        changes = dict(
+            newrdn=newrdn,
+            deleteoldrdn=params.get('deleteoldrdn', '1') == '1',
+            newsuperior=DN(newsuperior) if newsuperior else None,
+        )
+    elif changes:
+        raise ValueError("%s: delete record has attributes" % dn)
+    else:
+        changes = None
+
+    return dn, changetype, changes
+
+
+def parse_ldif_changes(data):
+    """
+    Parse LDIF change records.
+
+    Records without changetype replace the given attribute values, the same
+    way ldapmodify treats them.
+
+    :param data: LDIF as text
+    :returns: list of ``(dn, changetype, changes)`` tuples, where changes
+        are a list of ``(attr, values)`` for add, a python-ldap modlist
+        for modify, a dict with newrdn, deleteoldrdn and newsuperior for
+        modrdn and None for delete
+    :raises: ValueError when the LDIF is malformed
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    records = []
+    lines = []
+
+    def flush():
+        record = _parse_ldif_record(lines)
+        if record is not None:
+            records.append(record)
+        del lines[:]
+
+    for line in data.splitlines():
+        line = line.rstrip('\r')
+        if line.startswith(' '):
+            if not lines:
+                raise ValueError("Unexpected continuation line: %r" % line)
+            lines[-1] += line[1:]
+        elif not line.strip():
+            flush()
+        else:
+            lines.append(line)
+    flush()
+
+    return records
+
+
 class LDAPClient(object):
     """LDAP backend class
 
@@ -1337,33 +1494,123 @@ class LDAPClient(object):
 
         return entries
 
-    def find_entries(self, filter=None, attrs_list=None, base_dn=None,
-                     scope=ldap.SCOPE_SUBTREE, time_limit=None,
-                     size_limit=None, paged_search=False):
-        """
-        Return a list of entries and indication of whether the results were
-        truncated ([(dn, entry_attrs)], truncated) matching specified search
-        parameters followed by truncated flag. If the truncated flag is True,
-        search hit a server limit and its results are incomplete.
+    def get_entries_multi(self, searches, time_limit=None, size_limit=None,
+                          window=MULTI_SEARCH_WINDOW):
+        """Run independent searches pipelined on the connection.
 
-        Keyword arguments:
-        attrs_list -- list of attributes to return, all if None (default None)
-        base_dn -- dn of the entry at which to start the search (default '')
-        scope -- search scope, see LDAP docs (default ldap2.SCOPE_SUBTREE)
-        time_limit -- time limit in seconds (default unlimited)
-        size_limit -- size (number of entries returned) limit
+        Up to ``window`` searches are sent before their results are read, so
+        that the server processes them while results of earlier searches are
+        received, instead of one round trip per search. The searches do not
+        use the paged results control, they are meant for lookups with small
+        results, like reading or resolving many entries.
+
+        :raises: errors.LimitsExceeded if a result is truncated by the server
+
+        :param searches: iterable of (base_dn, scope, filter, attrs_list)
+        :param time_limit: time limit in seconds of each search
             (default unlimited)
-        paged_search -- search using paged results control
+        :param size_limit: size limit of each search (default unlimited)
+        :param window: maximal number of searches in progress
+        :return: list of lists of entries, in the order of ``searches``;
+            the list is empty if no entry matches or base_dn doesn't exist
+        """
+        if time_limit is None:
+            time_limit = self.time_limit
+        if time_limit == 0:
+            time_limit = -1.0
+        time_limit = float(time_limit)
 
-        :raises: errors.NotFound if result set is empty
-                                 or base_dn doesn't exist
+        if size_limit is None:
+            size_limit = self.size_limit
+        size_limit = int(size_limit)
+
+        results = []
+        pending = collections.deque()
+        truncated = False
+
+        def submit(base_dn, scope, filter, attrs_list):
+            assert isinstance(base_dn, DN)
+            if not filter:
+                filter = '(objectClass=*)'
+            if attrs_list:
+                attrs_list = [a.lower() for a in set(attrs_list)]
+            if six.PY2:
+                filter = self.encode(filter)
+                attrs_list = self.encode(attrs_list)
+            msgid = self.conn.search_ext(
+                str(base_dn), scope, filter, attrs_list,
+                timeout=time_limit, sizelimit=size_limit)
+            entries = []
+            results.append(entries)
+            pending.append((msgid, entries))
+
+        def collect():
+            msgid, entries = pending.popleft()
+            try:
+                while True:
+                    objtype, res_list, _res_id, _res_ctrls = (
+                        self.conn.result3(msgid, 0))
+                    if objtype == ldap.RES_SEARCH_RESULT:
+                        break
+                    res_list = self._convert_result(res_list)
+                    if res_list:
+                        entries.append(res_list[0])
+            except ldap.NO_SUCH_OBJECT:
+                pass
+            except ldap.ADMINLIMIT_EXCEEDED:
+                return TRUNCATED_ADMIN_LIMIT
+            except ldap.SIZELIMIT_EXCEEDED:
+                return TRUNCATED_SIZE_LIMIT
+            except ldap.TIMELIMIT_EXCEEDED:
+                return TRUNCATED_TIME_LIMIT
+            return False
+
+        with self.error_handler():
+            try:
+                for search in searches:
+                    if len(pending) >= window:
+                        truncated = collect() or truncated
+                    submit(*search)
+                while pending:
+                    truncated = collect() or truncated
+            finally:
+                # do not leave results of failed searches on the connection
+                for msgid, _entries in pending:
+                    try:
+                        self.conn.abandon_ext(msgid)
+                    except ldap.LDAPError as e:
+                        logger.warning("Error abandoning search: %s", e)
+
+        self.handle_truncated_result(truncated)
+
+        return results
+
+    def iter_entries(self, base_dn, scope=ldap.SCOPE_SUBTREE, filter=None,
+                     attrs_list=None, time_limit=None, size_limit=None,
+                     paged_search=True):
+        """Iterate over matching entries as they are received.
+
+        Unlike get_entries, only the entries of the page being received are
+        held in memory. When the iteration is stopped early, the search in
+        progress is abandoned, so that the server does not keep the state of
+        the paged search.
+
+        :raises: errors.LimitsExceeded if the results are truncated by the
+                 server, after all entries received were yielded
+        :raises: errors.NotFound if base_dn doesn't exist
+
+        :param base_dn: dn of the entry at which to start the search
+        :param scope: search scope, see LDAP docs (default ldap2.SCOPE_SUBTREE)
+        :param filter: LDAP filter to apply
+        :param attrs_list: list of attributes to return, all if None (default)
+        :param time_limit: time limit in seconds (default unlimited)
+        :param size_limit: size (number of entries returned) limit
+            (default unlimited)
+        :param paged_search: search using paged results control (default True)
         """
-        if base_dn is None:
-            base_dn = DN()
         assert isinstance(base_dn, DN)
         if not filter:
             filter = '(objectClass=*)'
-        res = []
         truncated = False
 
         if time_limit is None:
@@ -1388,6 +1635,18 @@ class LDAPClient(object):
         if page_size == 0:
             paged_search = False
 
+        def cancel_paged_search():
+            # RFC 2696: a search with page size 0 and the cookie releases
+            # the state of the paged search on the server
+            sctrls = [SimplePagedResultsControl(0, 0, cookie)]
+            try:
+                self.conn.search_ext_s(
+                    str(base_dn), scope, filter, attrs_list,
+                    serverctrls=sctrls, timeout=time_limit,
+                    sizelimit=size_limit)
+            except ldap.LDAPError as e:
+                logger.warning("Error cancelling paged search: %s", e)
+
         # pass arguments to python-ldap
         with self.error_handler():
             if six.PY2:
@@ -1404,14 +1663,26 @@ class LDAPClient(object):
                         serverctrls=sctrls, timeout=time_limit,
                         sizelimit=size_limit
                     )
-                    while True:
-                        result = self.conn.result3(id, 0)
-                        objtype, res_list, _res_id, res_ctrls = result
-                        if objtype == ldap.RES_SEARCH_RESULT:
-                            break
-                        res_list = self._convert_result(res_list)
-                        if res_list:
-                            res.append(res_list[0])
+                    try:
+                        while True:
+                            result = self.conn.result3(id, 0)
+                            objtype, res_list, _res_id, res_ctrls = result
+                            if objtype == ldap.RES_SEARCH_RESULT:
+                                break
+                            res_list = self._convert_result(res_list)
+                            if res_list:
+                                yield res_list[0]
+                    except GeneratorExit:
+                        # The consumer stopped the iteration, abandon the
+                        # page being received and cancel the paged search
+                        try:
+                            self.conn.abandon_ext(id)
+                        except ldap.LDAPError as e:
+                            logger.warning(
+                                "Error abandoning search: %s", e)
+                        if paged_search and cookie:
+                            cancel_paged_search()
+                        raise
 
                     if paged_search:
                         # Get cookie for the next page
@@ -1433,15 +1704,7 @@ class LDAPClient(object):
                 except ldap.LDAPError as e:
                     # If paged search is in progress, try to cancel it
                     if paged_search and cookie:
-                        sctrls = [SimplePagedResultsControl(0, 0, cookie)]
-                        try:
-                            self.conn.search_ext_s(
-                                str(base_dn), scope, filter, attrs_list,
-                                serverctrls=sctrls, timeout=time_limit,
-                                sizelimit=size_limit)
-                        except ldap.LDAPError as e:
-                            logger.warning(
-                                "Error cancelling paged search: %s", e)
+                        cancel_paged_search()
                         cookie = ''
 
                     try:
@@ -1454,6 +1717,48 @@ class LDAPClient(object):
                 if not paged_search or not cookie:
                     break
 
+        self.handle_truncated_result(truncated)
+
+    def find_entries(self, filter=None, attrs_list=None, base_dn=None,
+                     scope=ldap.SCOPE_SUBTREE, time_limit=None,
+                     size_limit=None, paged_search=False):
+        """
+        Return a list of entries and indication of whether the results were
+        truncated ([(dn, entry_attrs)], truncated) matching specified search
+        parameters followed by truncated flag. If the truncated flag is True,
+        search hit a server limit and its results are incomplete.
+
+        Keyword arguments:
+        attrs_list -- list of attributes to return, all if None (default None)
+        base_dn -- dn of the entry at which to start the search (default '')
+        scope -- search scope, see LDAP docs (default ldap2.SCOPE_SUBTREE)
+        time_limit -- time limit in seconds (default unlimited)
+        size_limit -- size (number of entries returned) limit
+            (default unlimited)
+        paged_search -- search using paged results control
+
+        :raises: errors.NotFound if result set is empty
+                                 or base_dn doesn't exist
+        """
+        if base_dn is None:
+            base_dn = DN()
+        res = []
+        truncated = False
+
+        try:
+            for entry in self.iter_entries(
+                    base_dn, scope, filter, attrs_list, time_limit=time_limit,
+                    size_limit=size_limit, paged_search=paged_search):
+                res.append(entry)
+        except errors.AdminLimitExceeded:
+            truncated = TRUNCATED_ADMIN_LIMIT
+        except errors.SizeLimitExceeded:
+            truncated = TRUNCATED_SIZE_LIMIT
+        except errors.TimeLimitExceeded:
+            truncated = TRUNCATED_TIME_LIMIT
+        except errors.LimitsExceeded:
+            truncated = True
+
         if not res and not truncated:
             raise errors.EmptyResult(reason='no matching entry found')
 
@@ -1574,6 +1879,47 @@ class LDAPClient(object):
         with self.error_handler():
             self.conn.delete_s(str(dn))
 
+    def apply_ldif_changes(self, records):
+        """
+        Apply LDIF change records returned by `parse_ldif_changes` over this
+        connection.
+
+        Records are applied in order and the first failing record stops
+        processing, like ldapmodify without the -c option does.
+
+        :raises: errors.PublicError subclass of the failing record
+        """
+        for dn, changetype, changes in records:
+            if changetype == 'add':
+                logger.debug("adding new entry \"%s\"", dn)
+            elif changetype == 'delete':
+                logger.debug("deleting entry \"%s\"", dn)
+            elif changetype == 'modrdn':
+                logger.debug("modifying rdn of entry \"%s\"", dn)
+            else:
+                logger.debug("modifying entry \"%s\"", dn)
+
+            try:
+                with self.error_handler():
+                    if changetype == 'add':
+                        self.conn.add_s(str(dn), changes)
+                    elif changetype == 'delete':
+                        self.conn.delete_s(str(dn))
+                    elif changetype == 'modrdn':
+                        newsuperior = changes['newsuperior']
+                        self.conn.rename_s(
+                            str(dn), changes['newrdn'],
+                            newsuperior=(str(newsuperior)
+                                         if newsuperior is not None
+                                         else None),
+                            delold=int(changes['deleteoldrdn']))
+                    else:
+                        self.conn.modify_s(str(dn), changes)
+            except errors.PublicError as e:
+                logger.error("%s of entry \"%s\" failed: %s",
+                             changetype, dn, e)
+                raise
+
     def entry_exists(self, dn):
         """
         Test whether the given object exists in LDAP.
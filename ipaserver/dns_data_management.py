@@ -20,7 +20,8 @@ from dns.exception import DNSException
 from time import sleep, time
 
 from ipalib import errors
-from ipalib.dns import record_name_format
+from ipalib.dns import get_record_rrtype, record_name_format
+from ipapython.dn import DN
 from ipapython.dnsutil import DNSName, resolve_rrsets
 
 if six.PY3:
@@ -57,6 +58,8 @@ IPA_DEFAULT_NTP_SRV_REC = (
 
 CA_RECORDS_DNS_TIMEOUT = 30  # timeout in seconds
 
+CNAME_TEMPLATE_ATTR = 'idnsTemplateAttribute;cnamerecord'
+
 
 class IPADomainIsNotManagedByIPAError(Exception):
     pass
@@ -268,44 +271,125 @@ class IPASystemRecords(object):
                 update_dict[option_name].append(unicode(rdata.to_text()))
         return update_dict
 
-    def __update_dns_records(
-            self, record_name, nodes, set_cname_template=True
-    ):
-        update_dict = self.__prepare_records_update_dict(nodes)
-        cname_template = {
-            'addattr': [u'objectclass=idnsTemplateObject'],
-            'setattr': [
-                u'idnsTemplateAttribute;cnamerecord=%s'
-                u'.\{substitutionvariable_ipalocation\}._locations' %
-                record_name.relativize(self.domain_abs)
-            ]
+    def __get_zone_records(self):
+        """
+        Read all records of the IPA domain zone, including location records,
+        with a single search
+        :return: (DN of the zone, {absolute record name: entry})
+        """
+        ldap = self.api_instance.Backend.ldap2
+        zone_dn = self.api_instance.Object.dnszone.get_dn(self.domain_abs)
+        try:
+            entries = ldap.find_entries(
+                base_dn=zone_dn,
+                scope=ldap.SCOPE_ONELEVEL,
+                filter='(objectclass=idnsrecord)',
+                attrs_list=['*'],
+                size_limit=0,
+                time_limit=0,
+                paged_search=True,
+            )[0]
+        except errors.EmptyResult:
+            entries = []
+        return zone_dn, {
+            entry.single_value['idnsname'].derelativize(self.domain_abs):
+                entry
+            for entry in entries
         }
+
+    @staticmethod
+    def __same_records(attr, old_values, new_values):
+        rdtype = rdatatype.from_text(get_record_rrtype(attr))
         try:
-            if set_cname_template:
-                # only srv records should have configured cname templates
-                update_dict.update(cname_template)
-            self.api_instance.Command.dnsrecord_mod(
-                self.domain_abs, record_name,
-                **update_dict
+            old = set(rdata.from_text(rdataclass.IN, rdtype, v)
+                      for v in old_values)
+            new = set(rdata.from_text(rdataclass.IN, rdtype, v)
+                      for v in new_values)
+        except DNSException:
+            return False
+        return old == new
+
+    def __get_records_changes(
+            self, record_name, nodes, entry, set_cname_template=True
+    ):
+        """
+        Compute changes of the record entry needed to contain the records
+        :return: dict of changed attributes, empty when the entry is up to
+        date
+        """
+        update_dict = self.__prepare_records_update_dict(nodes)
+        changes = {}
+        for attr, values in update_dict.items():
+            old_values = entry.get(attr, []) if entry is not None else []
+            if not self.__same_records(attr, old_values, values):
+                changes[attr] = values
+
+        if set_cname_template:
+            # only srv records should have configured cname templates
+            template = (
+                u'%s.\{substitutionvariable_ipalocation\}._locations' %
+                record_name.relativize(self.domain_abs))
+            objectclasses = entry.get('objectclass', []) if entry else []
+            if 'idnstemplateobject' not in [
+                    oc.lower() for oc in objectclasses]:
+                changes['objectclass'] = (
+                    list(objectclasses) + [u'idnsTemplateObject'])
+            if entry is None or entry.get(CNAME_TEMPLATE_ATTR) != [template]:
+                changes[CNAME_TEMPLATE_ATTR] = [template]
+        return changes
+
+    def __update_dns_records(
+            self, zone_dn, zone_records, record_name, nodes,
+            set_cname_template=True
+    ):
+        """
+        Write records with a single add or modify of the record entry, only
+        if they differ from the existing records
+        :return: True if the entry was written
+        """
+        entry = zone_records.get(record_name)
+        changes = self.__get_records_changes(
+            record_name, nodes, entry, set_cname_template)
+        if not changes:
+            return False
+
+        ldap = self.api_instance.Backend.ldap2
+        if entry is None:
+            relative_name = record_name.relativize(self.domain_abs)
+            entry = ldap.make_entry(
+                DN(('idnsname', relative_name.ToASCII()), zone_dn),
+                objectclass=(
+                    list(self.api_instance.Object.dnsrecord.object_class) +
+                    changes.pop('objectclass', [])),
+                idnsname=[relative_name],
+                **changes
             )
-        except errors.NotFound:
-            # because internal API magic, addattr and setattr doesn't work with
-            # dnsrecord-add well, use dnsrecord-mod instead later
-            update_dict.pop('addattr', None)
-            update_dict.pop('setattr', None)
-
-            self.api_instance.Command.dnsrecord_add(
-                self.domain_abs, record_name, **update_dict)
-
-            if set_cname_template:
-                try:
-                    self.api_instance.Command.dnsrecord_mod(
-                        self.domain_abs,
-                        record_name, **cname_template)
-                except errors.EmptyModlist:
-                    pass
-        except errors.EmptyModlist:
-            pass
+            ldap.add_entry(entry)
+            zone_records[record_name] = entry
+        else:
+            entry.update(changes)
+            ldap.update_entry(entry)
+        return True
+
+    def __update_records(self, zone_dn, zone_records, zone_obj,
+                         names_requiring_cname_templates=()):
+        fail = []
+        success = []
+        updated = 0
+        for record_name, node in zone_obj.items():
+            set_cname_template = record_name in names_requiring_cname_templates
+            try:
+                if self.__update_dns_records(
+                        zone_dn, zone_records, record_name, node,
+                        set_cname_template):
+                    updated += 1
+            except errors.PublicError as e:
+                fail.append((record_name, node, e))
+            else:
+                success.append((record_name, node))
+        logger.debug("%d of %d DNS records updated", updated,
+                     len(zone_obj.nodes))
+        return success, fail
 
     def get_base_records(
             self, servers=None, roles=None, include_master_role=True,
@@ -361,15 +445,14 @@ class IPASystemRecords(object):
                 include_master_role=include_master_role)
         return zone_obj
 
-    def update_base_records(self):
+    def update_base_records(self, zone_records=None):
         """
         Update base DNS records for IPA services
+        :param zone_records: result of __get_zone_records(), read when None
         :return: [(record_name, node), ...], [(record_name, node, error), ...]
         where the first list contains successfully updated records, and the
         second list contains failed updates with particular exceptions
         """
-        fail = []
-        success = []
         names_requiring_cname_templates = set(
             rec[0].derelativize(self.domain_abs) for rec in (
                 IPA_DEFAULT_MASTER_SRV_REC +
@@ -377,44 +460,35 @@ class IPASystemRecords(object):
                 IPA_DEFAULT_NTP_SRV_REC
             )
         )
+        if zone_records is None:
+            zone_records = self.__get_zone_records()
 
         base_zone = self.get_base_records()
-        for record_name, node in base_zone.items():
-            set_cname_template = record_name in names_requiring_cname_templates
-            try:
-                self.__update_dns_records(
-                    record_name, node, set_cname_template)
-            except errors.PublicError as e:
-                fail.append((record_name, node, e))
-            else:
-                success.append((record_name, node))
-        return success, fail
+        return self.__update_records(
+            zone_records[0], zone_records[1], base_zone,
+            names_requiring_cname_templates)
 
-    def update_locations_records(self):
+    def update_locations_records(self, zone_records=None):
         """
         Update locations DNS records for IPA services
+        :param zone_records: result of __get_zone_records(), read when None
         :return: [(record_name, node), ...], [(record_name, node, error), ...]
         where the first list contains successfully updated records, and the
         second list contains failed updates with particular exceptions
         """
-        fail = []
-        success = []
+        if zone_records is None:
+            zone_records = self.__get_zone_records()
 
         location_zone = self.get_locations_records()
-        for record_name, nodes in location_zone.items():
-            try:
-                self.__update_dns_records(
-                    record_name, nodes,
-                    set_cname_template=False)
-            except errors.PublicError as e:
-                fail.append((record_name, nodes, e))
-            else:
-                success.append((record_name, nodes))
-        return success, fail
+        return self.__update_records(
+            zone_records[0], zone_records[1], location_zone)
 
     def update_dns_records(self):
         """
         Update all IPA DNS records
+
+        Existing records of the IPA domain are read with a single search and
+        only records which differ from the generated ones are written.
         :return: (sucessfully_updated_base_records, failed_base_records,
         sucessfully_updated_locations_records, failed_locations_records)
         For format see update_base_records or update_locations_method
@@ -426,9 +500,10 @@ class IPASystemRecords(object):
         except errors.NotFound:
             raise IPADomainIsNotManagedByIPAError()
 
+        zone_records = self.__get_zone_records()
         return (
-            self.update_base_records(),
-            self.update_locations_records()
+            self.update_base_records(zone_records),
+            self.update_locations_records(zone_records)
         )
 
     def remove_location_records(self, location):
@@ -3,6 +3,7 @@
 #
 
 from datetime import datetime
+import hashlib
 import logging
 
 import dns.name
@@ -10,6 +11,10 @@ import errno
 import os
 import shutil
 import stat
+import sys
+import threading
+
+import six
 
 import ipalib.constants
 from ipapython.dn import DN
@@ -27,6 +32,12 @@ time_bindfmt = '%Y%m%d%H%M%S'
 FILE_PERM = (stat.S_IRUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IWUSR)
 DIR_PERM = (stat.S_IRWXU | stat.S_IRWXG)
 
+# files written for every key by install_key()
+KEY_FILE_SUFFIXES = ('.key', '.private', '.uuid', '.dn')
+
+# maximal number of zones synchronized concurrently
+SYNC_WORKERS = 4
+
 class BINDMgr(object):
     """BIND key manager. It does LDAP->BIND key files synchronization.
 
@@ -37,6 +48,9 @@ class BINDMgr(object):
         self.api = api
         self.ldap_keys = {}
         self.modified_zones = set()
+        # {zone: {uuid: (metadata digest, key file basename)}} of keys
+        # present in BIND key directories
+        self.installed_keys = {}
 
     def notify_zone(self, zone):
         cmd = ['rndc', 'sign', zone.to_text()]
@@ -126,6 +140,49 @@ class BINDMgr(object):
             uuid_file.write(uuid)
         with open("%s/%s.dn" % (workdir, basename), 'w') as dn_file:
             dn_file.write(attrs['dn'])
+        return basename
+
+    def key_digest(self, attrs):
+        """Compute digest of key metadata to detect changed keys."""
+        items = sorted((attr.lower(), attrs[attr]) for attr in attrs)
+        return hashlib.sha256(repr(items).encode('utf-8')).hexdigest()
+
+    def get_key_changes(self, zone):
+        """Compare key metadata of zone in LDAP with installed keys.
+
+        :returns: tuple (list of (uuid, attrs) of added and modified keys,
+                  list of uuids of removed keys)"""
+        ldap_keys = self.ldap_keys.get(zone, {})
+        installed = self.installed_keys.get(zone, {})
+        changed = [(uuid, attrs) for uuid, attrs in ldap_keys.items()
+                   if installed.get(uuid, (None,))[0] !=
+                   self.key_digest(attrs)]
+        removed = [uuid for uuid in installed if uuid not in ldap_keys]
+        return changed, removed
+
+    def fix_mode(self, path, mode):
+        if stat.S_IMODE(os.stat(path).st_mode) != mode:
+            logger.debug('Fixing permissions: %s', path)
+            os.chmod(path, mode)
+
+    def fix_hsm_permissions(self):
+        """Make keys in local HSM readable by ODS & named.
+
+        Only files and directories with wrong permissions are changed."""
+        for prefix, dirs, files in os.walk(paths.DNSSEC_TOKENS_DIR, topdown=True):
+            for name in dirs:
+                self.fix_mode(os.path.join(prefix, name),
+                              DIR_PERM | stat.S_ISGID)
+            for name in files:
+                self.fix_mode(os.path.join(prefix, name), FILE_PERM)
+
+    def remove_key_files(self, keys_dir, basename):
+        for suffix in KEY_FILE_SUFFIXES:
+            try:
+                os.unlink(os.path.join(keys_dir, basename + suffix))
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise e
 
     def get_zone_dir_name(self, zone):
         """Escape zone name to form suitable for file-system.
@@ -158,7 +215,6 @@ class BINDMgr(object):
         return escaped[:-1]
 
     def sync_zone(self, zone):
-        logger.info('Synchronizing zone %s', zone)
         zone_path = os.path.join(paths.BIND_LDAP_DNS_ZONE_WORKDIR,
                 self.get_zone_dir_name(zone))
         try:
@@ -167,24 +223,24 @@ class BINDMgr(object):
             if e.errno != errno.EEXIST:
                 raise e
 
-        # fix HSM permissions
-        # TODO: move out
-        for prefix, dirs, files in os.walk(paths.DNSSEC_TOKENS_DIR, topdown=True):
-            for name in dirs:
-                fpath = os.path.join(prefix, name)
-                logger.debug('Fixing directory permissions: %s', fpath)
-                os.chmod(fpath, DIR_PERM | stat.S_ISGID)
-            for name in files:
-                fpath = os.path.join(prefix, name)
-                logger.debug('Fixing file permissions: %s', fpath)
-                os.chmod(fpath, FILE_PERM)
-        # TODO: move out
+        target_dir = "%s/keys" % zone_path
+        if zone not in self.installed_keys or not os.path.isdir(target_dir):
+            self.install_zone_keys(zone, zone_path, target_dir)
+        elif not self.update_zone_keys(zone, zone_path, target_dir):
+            logger.debug('Keys of zone %s are up to date', zone)
+            return
+
+        self.notify_zone(zone)
 
+    def install_zone_keys(self, zone, zone_path, target_dir):
+        """Install all keys of zone into a new key directory."""
+        logger.info('Synchronizing zone %s', zone)
+        installed = {}
         with TemporaryDirectory(zone_path) as tempdir:
-            for uuid, attrs in self.ldap_keys[zone].items():
-                self.install_key(zone, uuid, attrs, tempdir)
+            for uuid, attrs in self.ldap_keys.get(zone, {}).items():
+                basename = self.install_key(zone, uuid, attrs, tempdir)
+                installed[uuid] = (self.key_digest(attrs), basename)
             # keys were generated in a temporary directory, swap directories
-            target_dir = "%s/keys" % zone_path
             try:
                 shutil.rmtree(target_dir)
             except OSError as e:
@@ -192,8 +248,74 @@ class BINDMgr(object):
                     raise e
             shutil.move(tempdir, target_dir)
             os.chmod(target_dir, DIR_PERM)
+        self.installed_keys[zone] = installed
 
-        self.notify_zone(zone)
+    def update_zone_keys(self, zone, zone_path, target_dir):
+        """Install added and modified keys of zone and remove deleted keys.
+
+        Keys are generated in a temporary directory and moved to the key
+        directory one by one, other keys are left untouched.
+
+        :returns: True if any key was changed"""
+        changed, removed = self.get_key_changes(zone)
+        if not changed and not removed:
+            return False
+        logger.info('Synchronizing zone %s: %d keys changed, %d removed',
+                    zone, len(changed), len(removed))
+
+        installed = self.installed_keys[zone]
+        for uuid in removed:
+            self.remove_key_files(target_dir, installed.pop(uuid)[1])
+
+        with TemporaryDirectory(zone_path) as tempdir:
+            for uuid, attrs in changed:
+                basename = self.install_key(zone, uuid, attrs, tempdir)
+                if uuid in installed:
+                    self.remove_key_files(target_dir, installed.pop(uuid)[1])
+                for suffix in KEY_FILE_SUFFIXES:
+                    os.rename(os.path.join(tempdir, basename + suffix),
+                              os.path.join(target_dir, basename + suffix))
+                installed[uuid] = (self.key_digest(attrs), basename)
+        return True
+
+    def sync_zones(self, zones):
+        """Synchronize zones using at most SYNC_WORKERS threads.
+
+        The first error is re-raised after all threads are finished, zones
+        which were not started yet are not synchronized."""
+        zones = list(zones)
+        if len(zones) <= 1:
+            for zone in zones:
+                self.sync_zone(zone)
+            return
+
+        lock = threading.Lock()
+        failures = []
+
+        def worker():
+            while True:
+                with lock:
+                    if not zones or failures:
+                        return
+                    zone = zones.pop(0)
+                try:
+                    self.sync_zone(zone)
+                except Exception as e:
+                    logger.error('Synchronization of zone %s failed: %s',
+                                 zone, e)
+                    with lock:
+                        failures.append(sys.exc_info())
+
+        threads = [threading.Thread(target=worker)
+                   for _i in range(min(SYNC_WORKERS, len(zones)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if failures:
+            six.reraise(*failures[0])
 
     def sync(self, dnssec_zones):
         """Synchronize list of zones in LDAP with BIND.
@@ -204,12 +326,19 @@ class BINDMgr(object):
         This filter is useful in cases where LDAP contains DNS zones which
         have old metadata objects and DNSSEC disabled. Such zones must be
         ignored to prevent errors while calling dnssec-keyfromlabel or rndc.
+
+        Only keys which were added, modified or deleted since the previous
+        synchronization of a zone are processed.
         """
         logger.debug('Key metadata in LDAP: %s', self.ldap_keys)
         logger.debug('Zones modified but skipped during bindmgr.sync: %s',
                      self.modified_zones - dnssec_zones)
-        for zone in self.modified_zones.intersection(dnssec_zones):
-            self.sync_zone(zone)
+        zones = self.modified_zones.intersection(dnssec_zones)
+        if any(self.get_key_changes(zone)[0] for zone in zones):
+            # keys of new key metadata have to be readable by
+            # dnssec-keyfromlabel & named
+            self.fix_hsm_permissions()
+        self.sync_zones(zones)
 
         self.modified_zones = set()
 
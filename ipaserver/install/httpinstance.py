@@ -28,6 +28,7 @@ import dbus
 import shlex
 import pipes
 import locale
+import sys
 
 import six
 from augeas import Augeas
@@ -73,6 +74,13 @@ OCSP_DIRECTIVE = 'NSSOCSP'
 
 NSS_OCSP_ENABLED = 'nss_ocsp_enabled'
 
+PLUGIN_MANIFEST_SCRIPT = '''
+from ipalib import api
+from ipaplatform.paths import paths
+api.bootstrap(context='server', confdir=paths.ETC_IPA, log=None)
+api.write_plugin_manifest(paths.IPA_PLUGIN_MANIFEST)
+'''
+
 
 def httpd_443_configured():
     """
@@ -179,6 +187,8 @@ class HTTPInstance(service.Service):
         if not self.is_kdcproxy_configured():
             self.step("create KDC proxy config", self.create_kdcproxy_conf)
             self.step("enable KDC proxy", self.enable_kdcproxy)
+        self.step("writing server plugin manifest",
+                  self.update_plugin_manifest)
         self.step("starting httpd", self.start)
         self.step("configuring httpd to start on boot", self.__enable)
         self.step("enabling oddjobd", self.enable_and_start_oddjobd)
@@ -508,6 +518,17 @@ class HTTPInstance(service.Service):
     def update_httpd_service_ipa_conf(self):
         tasks.configure_httpd_service_ipa_conf()
 
+    def update_plugin_manifest(self):
+        """
+        Write the manifest used by the WSGI application to import server
+        plugins on demand.
+
+        Some plugin modules register different plugins in different
+        contexts, so the manifest is written by a new process with the
+        server context.
+        """
+        ipautil.run([sys.executable, '-c', PLUGIN_MANIFEST_SCRIPT])
+
     def uninstall(self):
         if self.is_configured():
             self.print_msg("Unconfiguring web server")
@@ -559,6 +580,7 @@ class HTTPInstance(service.Service):
         installutils.remove_file(paths.HTTP_CCACHE)
 
         # Remove the configuration files we create
+        installutils.remove_file(paths.IPA_PLUGIN_MANIFEST)
         installutils.remove_file(paths.HTTPD_IPA_REWRITE_CONF)
         installutils.remove_file(paths.HTTPD_IPA_CONF)
         installutils.remove_file(paths.HTTPD_IPA_PKI_PROXY_CONF)
@@ -57,6 +57,9 @@ class LDAPUpdater(admintool.AdminTool):
         parser.add_option("-S", '--schema-file', action="append",
             dest="schema_files",
             help="custom schema ldif file to use (implies -s)")
+        parser.add_option("--dry-run", action="store_true",
+            dest="dry_run", default=False,
+            help="only print the changes the update files would make")
 
     @classmethod
     def get_command_class(cls, options, args):
@@ -77,6 +80,10 @@ class LDAPUpdater(admintool.AdminTool):
             raise admintool.ScriptError("No update files or schema file were "
                                         "specified")
 
+        if options.dry_run and (options.upgrade or options.schema_files):
+            raise admintool.ScriptError(
+                "--dry-run cannot be used with --upgrade or --schema-file")
+
         for filename in self.files:
             if not os.path.exists(filename):
                 raise admintool.ScriptError("%s: file not found" % filename)
@@ -144,14 +151,18 @@ class LDAPUpdater_NonUpgrade(LDAPUpdater):
 
         ld = LDAPUpdate(
             sub_dict={},
-            ldapi=True)
+            ldapi=True,
+            dry_run=options.dry_run)
 
         if not self.files:
             self.files = ld.get_all_files(UPDATES_DIR)
 
         modified = ld.update(self.files) or modified
 
-        if modified:
+        if options.dry_run:
+            logger.info('Dry run complete, %d operation(s) planned',
+                        len(ld.plan))
+        elif modified:
             logger.info('Update complete')
         else:
             logger.info('Update complete, no data were modified')
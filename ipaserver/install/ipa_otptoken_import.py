@@ -19,8 +19,12 @@
 
 import abc
 import base64
+import copy
 import datetime
+import io
+import itertools
 import logging
+import multiprocessing
 import os
 import uuid
 
@@ -48,6 +52,8 @@ if six.PY3:
 
 logger = logging.getLogger(__name__)
 
+PSKC_NS = "urn:ietf:params:xml:ns:keyprov:pskc"
+
 
 class ValidationError(Exception):
     pass
@@ -56,7 +62,7 @@ class ValidationError(Exception):
 def fetchAll(element, xpath, conv=lambda x: x):
     return [conv(e) for e in element.xpath(xpath, namespaces={
         "pkcs5": "http://www.rsasecurity.com/rsalabs/pkcs/schemas/pkcs-5v2-0#",
-        "pskc": "urn:ietf:params:xml:ns:keyprov:pskc",
+        "pskc": PSKC_NS,
         "xenc11": "http://www.w3.org/2009/xmlenc11#",
         "xenc": "http://www.w3.org/2001/04/xmlenc#",
         "ds": "http://www.w3.org/2000/09/xmldsig#",
@@ -346,12 +352,20 @@ class PSKCKeyPackage(object):
         ('offset',      'ipatokentotpclockoffset', lambda v, o: o.get('ipatokentotptimestep', 30) * v),
     )
 
-    def __init__(self, element, decryptor):
+    def __init__(self, element, decryptor, index=None, document=None):
         self.__element = element
         self.__decryptor = decryptor
+        self.__index = index
+        self.__document = document
         self.__id = None
         self.__options = None
 
+    @property
+    def index(self):
+        "Position of the key package in the document."
+
+        return self.__index
+
     @property
     def id(self):
         if self.__id is None:
@@ -367,7 +381,7 @@ class PSKCKeyPackage(object):
         return self.__options
 
     def remove(self):
-        self.__element.getparent().remove(self.__element)
+        self.__document.removeKeyPackage(self.__index)
 
     def __process(self):
         # Parse and validate.
@@ -450,22 +464,40 @@ class PSKCKeyPackage(object):
 
 
 class PSKCDocument(object):
+    """PSKC document read incrementally.
+
+    Only the header of the document is kept in memory, key packages are
+    parsed one by one and have to be processed while they are iterated.
+    Removed key packages are left out when the document is saved."""
+
     @property
     def keyname(self):
         return self.__keyname
 
     def __init__(self, filename):
+        self.__filename = filename
         self.__keyname = None
         self.__decryptor = None
-        self.__doc = etree.parse(filename)
-        self.__mkey = fetch(self.__doc, "./pskc:MACMethod/pskc:MACKey")
-        self.__algo = fetch(self.__doc, "./pskc:MACMethod/@Algorithm", convertHMACType)
-
-        self.__keypackages = fetchAll(self.__doc, "./pskc:KeyPackage")
-        if not self.__keypackages:
+        self.__removed = set()
+        self.__mkey = None
+        self.__algo = None
+        self.__enckey = None
+
+        # The header precedes the key packages.
+        has_keypackages = False
+        for _root, index, child in self.__children():
+            if index is not None:
+                has_keypackages = True
+                break
+            if child.tag == "{%s}MACMethod" % PSKC_NS:
+                self.__mkey = copy.deepcopy(fetch(child, "./pskc:MACKey"))
+                self.__algo = fetch(child, "./@Algorithm", convertHMACType)
+            elif child.tag == "{%s}EncryptionKey" % PSKC_NS:
+                self.__enckey = copy.deepcopy(child)
+
+        if not has_keypackages:
             raise ValueError("PSKC file is invalid!")
 
-        self.__enckey = fetch(self.__doc, "./pskc:EncryptionKey")
         if self.__enckey is not None:
             # Check for x509 key.
             x509key = fetch(self.__enckey, "./ds:X509Data")
@@ -478,6 +510,37 @@ class PSKCDocument(object):
                 self.__keyname = fetch(self.__enckey,
                                        "./xenc11:DerivedKey/xenc11:MasterKeyName/text()")
 
+    def __children(self):
+        """Iterate through (root, key package index or None, element) of
+        children of the root element. Elements are released after use."""
+        try:
+            context = etree.iterparse(self.__filename, events=('start', 'end'))
+            root = None
+            depth = 0
+            index = 0
+            for event, element in context:
+                if event == 'start':
+                    if root is None:
+                        root = element
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth != 1:
+                    continue
+
+                if element.tag == "{%s}KeyPackage" % PSKC_NS:
+                    yield root, index, element
+                    index += 1
+                else:
+                    yield root, None, element
+
+                element.clear()
+                while element.getprevious() is not None:
+                    del root[0]
+        except etree.XMLSyntaxError as e:
+            raise ValueError("PSKC file is invalid: %s" % e)
+
     def setKey(self, key):
         # Derive the enckey if required.
         kd = fetch(self.__enckey,
@@ -496,12 +559,60 @@ class PSKCDocument(object):
             )
             self.__decryptor = XMLDecryptor(key, tmp)
 
+    def getKeyPackageElements(self):
+        "Iterate through (index, element) of key packages."
+
+        for _root, index, child in self.__children():
+            if index is not None:
+                yield index, child
+
     def getKeyPackages(self):
-        for kp in self.__keypackages:
-            yield PSKCKeyPackage(kp, self.__decryptor)
+        for index, kp in self.getKeyPackageElements():
+            yield PSKCKeyPackage(kp, self.__decryptor, index, self)
+
+    def loadKeyPackage(self, index, data):
+        "Load a key package serialized by etree.tostring()."
+
+        return PSKCKeyPackage(etree.fromstring(data), self.__decryptor,
+                              index, self)
+
+    def removeKeyPackage(self, index):
+        self.__removed.add(index)
 
     def save(self, dest):
-        self.__doc.write(dest)
+        children = self.__children()
+        root, index, child = next(children)
+        with etree.xmlfile(dest, encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element(root.tag, dict(root.attrib), nsmap=root.nsmap):
+                for root, index, child in itertools.chain(
+                        [(root, index, child)], children):
+                    if index is None or index not in self.__removed:
+                        xf.write(child)
+
+
+# PSKC document of a worker process decrypting key packages
+_worker_document = None
+
+
+def _init_worker(filename, key):
+    global _worker_document  # pylint: disable=global-statement
+
+    _worker_document = PSKCDocument(filename)
+    if key is not None:
+        _worker_document.setKey(key)
+
+
+def _process_key_package(item):
+    """Parse, decrypt and validate a serialized key package.
+
+    :returns: (index, token id, options, error message)"""
+    index, data = item
+    try:
+        keypkg = _worker_document.loadKeyPackage(index, data)
+        return index, keypkg.id, keypkg.options, None
+    except Exception as e:
+        return index, None, None, unicode(e)
 
 
 class OTPTokenImport(admintool.AdminTool):
@@ -509,12 +620,20 @@ class OTPTokenImport(admintool.AdminTool):
     description = "Import OTP tokens."
     usage = "%prog [options] <PSKC file> <output file>"
 
+    # number of tokens decrypted and written between progress reports
+    chunk_size = 500
+
     @classmethod
     def add_options(cls, parser):
         super(OTPTokenImport, cls).add_options(parser)
 
         parser.add_option("-k", "--keyfile", dest="keyfile",
                           help="File containing the key used to decrypt token secrets")
+        parser.add_option("-j", "--jobs", dest="jobs", type="int",
+                          default=multiprocessing.cpu_count(),
+                          help="Number of processes decrypting tokens")
+        parser.add_option("--report", dest="report",
+                          help="File to write the import result of every token to")
 
     def validate_options(self):
         super(OTPTokenImport, self).validate_options()
@@ -531,7 +650,11 @@ class OTPTokenImport(admintool.AdminTool):
         if os.path.exists(self.output):
             raise admintool.ScriptError("Output file already exists!")
 
+        if self.safe_options.jobs < 1:  # pylint: disable=no-member
+            raise admintool.ScriptError("Number of jobs must be positive!")
+
         # Verify a key is provided if one is needed.
+        self.key = None
         if self.doc.keyname is not None:
             if self.safe_options.keyfile is None:  # pylint: disable=no-member
                 raise admintool.ScriptError("Encryption key required: %s!" % self.doc.keyname)
@@ -539,30 +662,164 @@ class OTPTokenImport(admintool.AdminTool):
             # Load the keyfile.
             keyfile = self.safe_options.keyfile  # pylint: disable=no-member
             with open(keyfile) as f:
-                self.doc.setKey(f.read())
+                self.key = f.read()
+            self.doc.setKey(self.key)
+
+    def iter_chunks(self):
+        "Iterate through lists of (index, token label, serialized element)."
+
+        chunk = []
+        for index, element in self.doc.getKeyPackageElements():
+            label = fetch(element, "./pskc:Key/@Id", unicode,
+                          u"#%d" % (index + 1))
+            chunk.append((index, label, etree.tostring(element)))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def process_chunk(self, pool, chunk):
+        """Decrypt and validate key packages of a chunk, in worker processes
+        if available.
+
+        :returns: list of (index, token id, options, error message)"""
+        items = [(index, data) for (index, _label, data) in chunk]
+        if pool is not None:
+            return pool.map(_process_key_package, items)
+
+        results = []
+        for index, data in items:
+            try:
+                keypkg = self.doc.loadKeyPackage(index, data)
+                results.append((index, keypkg.id, keypkg.options, None))
+            except Exception as e:
+                results.append((index, None, None, unicode(e)))
+        return results
+
+    def get_owner(self):
+        """Get the DN of the default owner and manager of the tokens, the user
+        running the import. It is looked up only once."""
+        if not hasattr(self, '_owner_dn'):
+            result = api.Command.user_find(whoami=True)['result']
+            self._owner_dn = result[0]['dn'] if result else None
+        return self._owner_dn
+
+    def make_entry(self, token_id, options):
+        """Convert token options to an LDAP entry the way otptoken_add does.
+
+        The options are checked by the parameters of otptoken_add, the token
+        is owned and managed by the user running the import."""
+        # the plugin module can be imported only after the API is finalized
+        from ipaserver.plugins.otptoken import TOKEN_TYPES
+
+        ldap = api.Backend.ldap2
+        cmd = api.Command.otptoken_add
+        params = cmd.args_options_2_params(unicode(token_id), **options)
+        params.update(cmd.get_default(**params))
+        params = cmd.normalize(**params)
+        params = cmd.convert(**params)
+        cmd.validate(**params)
+        args, options = cmd.params_2_args_options(**params)
+
+        notbefore = options.get('ipatokennotbefore')
+        notafter = options.get('ipatokennotafter')
+        if notbefore and notafter and notbefore > notafter:
+            raise errors.ValidationError(name='not_after',
+                                         error='is before the validity start')
+
+        entry = ldap.make_entry(cmd.obj.get_dn(*args),
+                                cmd.args_options_2_entry(*args, **options))
+        token_type = options['type'].lower()
+        entry['objectclass'] = cmd.obj.object_class + ['ipatoken' + token_type]
+        for ttype, tattrs in TOKEN_TYPES.items():
+            if ttype != token_type:
+                for tattr in tattrs:
+                    entry.pop(tattr, None)
+
+        owner_dn = self.get_owner()
+        if owner_dn is not None:
+            entry['ipatokenowner'] = owner_dn
+            entry['managedby'] = owner_dn
+        return entry
+
+    def add_token(self, token_id, options):
+        entry = self.make_entry(token_id, options)
+        try:
+            api.Backend.ldap2.add_entry(entry)
+        except errors.DuplicateEntry:
+            api.Object.otptoken.handle_duplicate_entry(unicode(token_id))
+
+    def import_tokens(self, pool, report):
+        added = failed = 0
+        for chunk in self.iter_chunks():
+            labels = dict((index, label) for (index, label, _data) in chunk)
+            for index, token_id, options, error in self.process_chunk(
+                    pool, chunk):
+                if error is None:
+                    try:
+                        self.add_token(token_id, options)
+                    except Exception as e:
+                        error = unicode(e)
+                    else:
+                        self.doc.removeKeyPackage(index)
+
+                label = token_id if token_id is not None else labels[index]
+                if error is None:
+                    added += 1
+                    logger.info("Added token: %s", label)
+                else:
+                    failed += 1
+                    logger.warning("Error adding token %s: %s", label, error)
+
+                if report is not None:
+                    report.write(u"%s\t%s\t%s\n" % (
+                        label, u"added" if error is None else u"failed",
+                        error or u""))
+
+            if report is not None:
+                report.flush()
+            logger.info("Processed %d tokens: %d added, %d failed",
+                        added + failed, added, failed)
+
+        return added, failed
 
     def run(self):
-        api.bootstrap(in_server=True, confdir=paths.ETC_IPA)
-        api.finalize()
+        # Worker processes are started before connecting to LDAP, so that
+        # they do not share the connection.
+        jobs = self.safe_options.jobs  # pylint: disable=no-member
+        pool = None
+        if jobs > 1:
+            pool = multiprocessing.Pool(jobs, _init_worker,
+                                        (self.args[0], self.key))
+
+        report = None
+        report_file = self.safe_options.report  # pylint: disable=no-member
+        if report_file is not None:
+            report = io.open(report_file, 'w', encoding='utf-8')
 
         try:
-            api.Backend.ldap2.connect(ccache=os.environ.get('KRB5CCNAME'),
-                                      autobind=AUTOBIND_DISABLED)
-        except (gssapi.exceptions.GSSError, errors.ACIError):
-            raise admintool.ScriptError("Unable to connect to LDAP! Did you kinit?")
+            api.bootstrap(in_server=True, confdir=paths.ETC_IPA)
+            api.finalize()
 
-        try:
-            # Parse tokens
-            for keypkg in self.doc.getKeyPackages():
-                try:
-                    api.Command.otptoken_add(keypkg.id, no_qrcode=True, **keypkg.options)
-                except Exception as e:
-                    logger.warning("Error adding token: %s", e)
-                else:
-                    logger.info("Added token: %s", keypkg.id)
-                    keypkg.remove()
-        finally:
-            api.Backend.ldap2.disconnect()
+            try:
+                api.Backend.ldap2.connect(ccache=os.environ.get('KRB5CCNAME'),
+                                          autobind=AUTOBIND_DISABLED)
+            except (gssapi.exceptions.GSSError, errors.ACIError):
+                raise admintool.ScriptError("Unable to connect to LDAP! Did you kinit?")
 
-        # Write out the XML file without the tokens that succeeded.
-        self.doc.save(self.output)
+            try:
+                self.import_tokens(pool, report)
+            finally:
+                api.Backend.ldap2.disconnect()
+
+                # Write out the XML file without the tokens that succeeded,
+                # including the tokens which were not processed when the
+                # import was interrupted, so that it can be resumed.
+                self.doc.save(self.output)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+            if report is not None:
+                report.close()
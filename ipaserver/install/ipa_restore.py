@@ -35,7 +35,8 @@ from ipapython import version, ipautil
 from ipapython.ipautil import run, user_input
 from ipapython import admintool, certdb
 from ipapython.dn import DN
-from ipaserver.install.replication import (wait_for_task, ReplicationManager,
+from ipaserver.install.replication import (wait_for_task, wait_for_tasks,
+                                           ReplicationManager,
                                            get_cs_replication_manager)
 from ipaserver.install import installutils
 from ipaserver.install import dsinstance, httpinstance, cainstance, krbinstance
@@ -398,8 +399,7 @@ class Restore(admintool.AdminTool):
 
             # Always restore the data from ldif
             # We need to restore both userRoot and ipaca.
-            for instance, backend in databases:
-                self.ldif2db(instance, backend, online=options.online)
+            self.restore_ldifs(databases, online=options.online)
 
             if restore_type != 'FULL':
                 if not options.online:
@@ -532,17 +532,38 @@ class Restore(admintool.AdminTool):
                     repl.disable_agreement(host)
 
 
-    def ldif2db(self, instance, backend, online=True):
+    def restore_ldifs(self, databases, online=True):
         '''
-        Restore a LDIF backup of the data in this instance.
+        Restore LDIF backups of all the databases.
 
-        If executed online create a task and wait for it to complete.
+        Online, the import task of a backend is created as soon as its LDIF
+        is filtered, so Directory Server imports it while the LDIF of the
+        next backend is being processed, and all the tasks are waited for
+        together. Offline, ldif2db needs exclusive access to the instance
+        and the backends are imported one after another.
         '''
-        logger.info('Restoring from %s in %s', backend, instance)
+        task_dns = []
+        for instance, backend in databases:
+            dn = self.ldif2db(instance, backend, online=online, wait=False)
+            if dn is not None:
+                task_dns.append(dn)
+
+        if task_dns:
+            logger.info("Waiting for LDIF to finish")
+            exit_codes = wait_for_tasks(self.get_connection(), task_dns)
+            for dn, exit_code in zip(task_dns, exit_codes):
+                if exit_code != 0:
+                    logger.critical("Import task %s failed with code %d",
+                                    dn[0].value, exit_code)
 
-        cn = time.strftime('import_%Y_%m_%d_%H_%M_%S')
-        dn = DN(('cn', cn), ('cn', 'import'), ('cn', 'tasks'), ('cn', 'config'))
 
+    def prepare_ldif(self, instance, backend):
+        '''
+        Copy the LDIF backup of a backend to the instance LDIF directory,
+        stripping the RUV entry on the fly.
+
+        :return: path to the filtered LDIF file
+        '''
         ldifdir = paths.SLAPD_INSTANCE_LDIF_DIR_TEMPLATE % instance
         ldifname = '%s-%s.ldif' % (instance, backend)
         ldiffile = os.path.join(ldifdir, ldifname)
@@ -565,6 +586,27 @@ class Restore(admintool.AdminTool):
         pent = pwd.getpwnam(constants.DS_USER)
         os.chown(ldiffile, pent.pw_uid, pent.pw_gid)
 
+        return ldiffile
+
+
+    def ldif2db(self, instance, backend, online=True, wait=True):
+        '''
+        Restore a LDIF backup of the data in this instance.
+
+        If executed online create a task and, unless wait is False, wait for
+        it to complete.
+
+        :return: DN of the import task when executed online without waiting
+        '''
+        logger.info('Restoring from %s in %s', backend, instance)
+
+        # the backend is part of the name so that tasks of several backends
+        # can be created within the same second
+        cn = time.strftime('import_%Y_%m_%d_%H_%M_%S') + '_' + backend
+        dn = DN(('cn', cn), ('cn', 'import'), ('cn', 'tasks'), ('cn', 'config'))
+
+        ldiffile = self.prepare_ldif(instance, backend)
+
         if online:
             conn = self.get_connection()
             ent = conn.make_entry(
@@ -582,7 +624,10 @@ class Restore(admintool.AdminTool):
                 conn.add_entry(ent)
             except Exception as e:
                 logger.error("Unable to bind to LDAP server: %s", e)
-                return
+                return None
+
+            if not wait:
+                return dn
 
             logger.info("Waiting for LDIF to finish")
             wait_for_task(conn, dn)
@@ -600,6 +645,8 @@ class Restore(admintool.AdminTool):
             if result.returncode != 0:
                 logger.critical("ldif2db failed: %s", result.error_log)
 
+        return None
+
 
     def bak2db(self, instance, backend, online=True):
         '''
@@ -31,6 +31,7 @@ import time
 import os
 import pwd
 import fnmatch
+import itertools
 
 import ldap
 import six
@@ -50,6 +51,11 @@ logger = logging.getLogger(__name__)
 
 UPDATES_DIR=paths.UPDATES_DIR
 UPDATE_SEARCH_TIME_LIMIT = 30  # seconds
+# bounds of the interval between index task status checks
+INDEX_TASK_POLL_INTERVAL_MIN = 1  # seconds
+INDEX_TASK_POLL_INTERVAL_MAX = 10  # seconds
+# maximum number of RDNs in a single filter when prefetching entries
+PREFETCH_CHUNK_SIZE = 100
 
 
 def connect(ldapi=False, realm=None, fqdn=None, dm_password=None):
@@ -137,7 +143,7 @@ class LDAPUpdate(object):
     action_keywords = ["default", "add", "remove", "only", "onlyifexist", "deleteentry", "replace", "addifnew", "addifexist"]
 
     def __init__(self, dm_password=None, sub_dict={},
-                 online=True, ldapi=False):
+                 online=True, ldapi=False, dry_run=False):
         '''
         :parameters:
             dm_password
@@ -148,6 +154,9 @@ class LDAPUpdate(object):
                 Do an online LDAP update or use an experimental LDIF updater
             ldapi
                 Bind using ldapi. This assumes autobind is enabled.
+            dry_run
+                Only log the changes the updates would make, do not apply
+                them and do not run update plugins
 
         Data Structure Example:
         -----------------------
@@ -257,6 +266,10 @@ class LDAPUpdate(object):
         self.conn = None
         self.modified = False
         self.online = online
+        self.dry_run = dry_run
+        self.plan = []
+        self._prefetched = {}
+        self._pending_index_attrs = []
         self.ldapi = ldapi
         self.pw_name = pwd.getpwuid(os.geteuid()).pw_name
         self.realm = None
@@ -528,8 +541,8 @@ class LDAPUpdate(object):
 
         return all_updates
 
-    def create_index_task(self, attribute):
-        """Create a task to update an index for an attribute"""
+    def create_index_task(self, *attributes):
+        """Create a task to update indexes of one or more attributes"""
 
         # Sleep a bit to ensure previous operations are complete
         time.sleep(5)
@@ -538,7 +551,8 @@ class LDAPUpdate(object):
         # cn_uuid.time is in nanoseconds, but other users of LDAPUpdate expect
         # seconds in 'TIME' so scale the value down
         self.sub_dict['TIME'] = int(cn_uuid.time/1e9)
-        cn = "indextask_%s_%s_%s" % (attribute, cn_uuid.time, cn_uuid.clock_seq)
+        cn = "indextask_%s_%s_%s" % ('_'.join(attributes), cn_uuid.time,
+                                     cn_uuid.clock_seq)
         dn = DN(('cn', cn), ('cn', 'index'), ('cn', 'tasks'), ('cn', 'config'))
 
         e = self.conn.make_entry(
@@ -546,10 +560,11 @@ class LDAPUpdate(object):
             objectClass=['top', 'extensibleObject'],
             cn=[cn],
             nsInstance=['userRoot'],
-            nsIndexAttribute=[attribute],
+            nsIndexAttribute=list(attributes),
         )
 
-        logger.debug("Creating task to index attribute: %s", attribute)
+        logger.debug("Creating task to index attributes: %s",
+                     ', '.join(attributes))
         logger.debug("Task id: %s", dn)
 
         self.conn.add_entry(e)
@@ -558,6 +573,10 @@ class LDAPUpdate(object):
 
     def monitor_index_task(self, dn):
         """Give a task DN monitor it and wait until it has completed (or failed)
+
+        The status is checked with an exponentially growing interval and
+        the progress of the task is logged with an estimate of the remaining
+        time when Directory Server reports the number of processed entries.
         """
 
         assert isinstance(dn, DN)
@@ -565,8 +584,11 @@ class LDAPUpdate(object):
         # Pause for a moment to give the task time to be created
         time.sleep(1)
 
-        attrlist = ['nstaskstatus', 'nstaskexitcode']
+        attrlist = ['nstaskstatus', 'nstaskexitcode', 'nstaskcurrentitem',
+                    'nstasktotalitems']
         entry = None
+        start = time.time()
+        interval = INDEX_TASK_POLL_INTERVAL_MIN
 
         while True:
             try:
@@ -579,20 +601,48 @@ class LDAPUpdate(object):
                 return
 
             status = entry.single_value.get('nstaskstatus')
-            if status is None:
-                # task doesn't have a status yet
-                time.sleep(1)
-                continue
+            if status is not None:
+                if status.lower().find("finished") > -1:
+                    logger.debug("Indexing finished")
+                    break
 
-            if status.lower().find("finished") > -1:
-                logger.debug("Indexing finished")
-                break
+                self._log_index_progress(entry, time.time() - start)
 
-            logger.debug("Indexing in progress")
-            time.sleep(1)
+            time.sleep(interval)
+            interval = min(interval * 2, INDEX_TASK_POLL_INTERVAL_MAX)
 
         return
 
+    def _log_index_progress(self, entry, elapsed):
+        try:
+            current = int(entry.single_value.get('nstaskcurrentitem', 0))
+            total = int(entry.single_value.get('nstasktotalitems', 0))
+        except ValueError:
+            current = total = 0
+
+        if current <= 0 or total <= 0:
+            logger.debug("Indexing in progress")
+            return
+
+        remaining = elapsed * max(total - current, 0) / current
+        logger.info("Indexing in progress: %d of %d entries processed "
+                    "(%d%%), about %d seconds remaining",
+                    current, total, current * 100 // total, remaining)
+
+    def _run_index_tasks(self):
+        """Reindex all attributes whose index definition was changed
+
+        A single task is created for all the attributes, so Directory Server
+        reads the database once instead of once per attribute.
+        """
+        attributes = self._pending_index_attrs
+        self._pending_index_attrs = []
+        if not attributes:
+            return
+
+        taskid = self.create_index_task(*attributes)
+        self.monitor_index_task(taskid)
+
     def _create_default_entry(self, dn, default):
         """Create the default entry from the values provided.
 
@@ -626,15 +676,78 @@ class LDAPUpdate(object):
     def _get_entry(self, dn):
         """Retrieve an object from LDAP.
 
+           A prefetched entry is used at most once, later updates of the same
+           DN read the entry again. Prefetched entries are discarded once an
+           update writes, see _discard_prefetched.
+
            The return type is ipaldap.LDAPEntry
         """
         assert isinstance(dn, DN)
+        entry = self._prefetched.pop(dn, None)
+        if entry is not None:
+            return [entry]
+
         searchfilter="objectclass=*"
         sattrs = ["*", "aci", "attributeTypes", "objectClasses"]
         scope = ldap.SCOPE_BASE
 
         return self.conn.get_entries(dn, scope, searchfilter, sattrs)
 
+    def _prefetch_entries(self, updates):
+        """Read entries targeted by the updates in bulk.
+
+           Entries are searched for with one one-level search per parent DN
+           and chunk of RDNs instead of one base search per entry. Entries
+           which are not found this way (new entries, LDAP subentries, ...)
+           are looked up individually by _get_entry.
+        """
+        self._prefetched = {}
+        sattrs = ["*", "aci", "attributeTypes", "objectClasses"]
+
+        by_parent = {}
+        for update in updates:
+            dn = update.get('dn')
+            if (dn is None or 'deleteentry' in update or len(dn) < 2 or
+                    len(dn[0]) != 1):
+                continue
+            dns = by_parent.setdefault(dn[1:], [])
+            if dn not in dns:
+                dns.append(dn)
+
+        for parent, dns in by_parent.items():
+            if len(dns) < 2:
+                # a base search is just as expensive
+                continue
+            for i in range(0, len(dns), PREFETCH_CHUNK_SIZE):
+                chunk = dns[i:i + PREFETCH_CHUNK_SIZE]
+                searchfilter = self.conn.combine_filters(
+                    [self.conn.make_filter_from_attr(dn[0].attr, dn[0].value)
+                     for dn in chunk],
+                    self.conn.MATCH_ANY)
+                try:
+                    entries = self.conn.get_entries(
+                        parent, ldap.SCOPE_ONELEVEL, searchfilter, sattrs)
+                except (errors.NotFound, errors.DatabaseError,
+                        errors.LimitsExceeded):
+                    continue
+                for entry in entries:
+                    if entry.dn in chunk:
+                        self._prefetched[entry.dn] = entry
+
+        logger.debug("Prefetched %d entries", len(self._prefetched))
+
+    def _discard_prefetched(self):
+        """Discard prefetched entries after a write.
+
+           DS plugins (memberOf, referential integrity, ...) may change
+           other entries than the written one, so none of the prefetched
+           entries can be trusted to be current.
+        """
+        if self._prefetched:
+            logger.debug("Discarding %d prefetched entries",
+                         len(self._prefetched))
+            self._prefetched = {}
+
     def _apply_update_disposition(self, updates, entry):
         """
         updates is a list of changes to apply
@@ -809,6 +922,10 @@ class LDAPUpdate(object):
 
         self.print_entity(entry, "Final value after applying updates")
 
+        if self.dry_run:
+            self._plan_record(entry, found)
+            return
+
         added = False
         updated = False
         if not found:
@@ -856,19 +973,54 @@ class LDAPUpdate(object):
             if updated:
                 self.modified = True
 
+        if added or updated:
+            self._discard_prefetched()
+
         if entry.dn.endswith(DN(('cn', 'index'), ('cn', 'userRoot'),
                                 ('cn', 'ldbm database'), ('cn', 'plugins'),
                                 ('cn', 'config'))) and (added or updated):
-            taskid = self.create_index_task(entry.single_value['cn'])
-            self.monitor_index_task(taskid)
+            attribute = entry.single_value['cn']
+            if attribute.lower() not in (
+                    a.lower() for a in self._pending_index_attrs):
+                self._pending_index_attrs.append(attribute)
         return
 
+    def _plan_record(self, entry, found):
+        """
+        Record and log the change of an entry instead of applying it
+        """
+        if not found:
+            if not len(entry):
+                return
+            changes = [(attr, safe_output(attr, values))
+                       for attr, values in entry.raw.items()]
+            action = 'add'
+        else:
+            changes = [(type, attr, safe_output(attr, values))
+                       for (type, attr, values) in entry.generate_modlist()]
+            if not changes:
+                logger.debug("Entry already up-to-date: %s", entry.dn)
+                return
+            action = 'modify'
+
+        logger.info("Would %s entry %s: %s", action, entry.dn, changes)
+        self.plan.append((action, entry.dn, changes))
+        self.modified = True
+
     def _delete_record(self, updates):
         """
         Delete record
         """
 
         dn = updates['dn']
+        self._prefetched.pop(dn, None)
+        if self.dry_run:
+            logger.info("Would delete entry %s", dn)
+            self.plan.append(('delete', dn, None))
+            self.modified = True
+            return
+
+        self._discard_prefetched()
         try:
             logger.debug("Deleting entry %s", dn)
             self.conn.delete_entry(dn)
@@ -892,6 +1044,11 @@ class LDAPUpdate(object):
         return f
 
     def _run_update_plugin(self, plugin_name):
+        if self.dry_run:
+            logger.info("Would execute upgrade plugin: %s", plugin_name)
+            self.plan.append(('plugin', plugin_name, None))
+            return
+
         logger.debug("Executing upgrade plugin: %s", plugin_name)
         restart_ds, updates = self.api.Updater[plugin_name]()
         if updates:
@@ -913,13 +1070,30 @@ class LDAPUpdate(object):
             raise RuntimeError("Offline updates are not supported.")
 
     def _run_updates(self, all_updates):
-        for update in all_updates:
-            if 'deleteentry' in update:
-                self._delete_record(update)
-            elif 'plugin' in update:
-                self._run_update_plugin(update['plugin'])
-            else:
-                self._update_record(update)
+        # update plugins may change the data directly, so entries are
+        # prefetched separately for each run of updates between plugins
+        prefetch = True
+        try:
+            for i, update in enumerate(all_updates):
+                if prefetch:
+                    self._prefetch_entries(
+                        itertools.takewhile(lambda u: 'plugin' not in u,
+                                            all_updates[i:]))
+                    prefetch = False
+
+                if 'deleteentry' in update:
+                    self._delete_record(update)
+                elif 'plugin' in update:
+                    # plugins may rely on the indexes defined before them
+                    self._run_index_tasks()
+                    self._run_update_plugin(update['plugin'])
+                    prefetch = True
+                else:
+                    self._update_record(update)
+        finally:
+            self._prefetched = {}
+            # indexes changed before a failure are not left unindexed
+            self._run_index_tasks()
 
     def update(self, files, ordered=True):
         """Execute the update. files is a list of the update files to use.
@@ -928,6 +1102,7 @@ class LDAPUpdate(object):
         returns True if anything was changed, otherwise False
         """
         self.modified = False
+        self.plan = []
         all_updates = []
         try:
             self.create_connection()
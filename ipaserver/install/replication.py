@@ -43,6 +43,11 @@ if six.PY3:
 
 logger = logging.getLogger(__name__)
 
+# bounds and growth of the interval between checks in poll_until()
+POLL_INTERVAL_MIN = 0.25  # seconds
+POLL_INTERVAL_MAX = 5  # seconds
+POLL_BACKOFF = 1.5
+
 # the default container used by AD for user entries
 WIN_USER_CONTAINER = DN(('cn', 'Users'))
 # the default container used by IPA for user entries
@@ -138,7 +143,42 @@ def enable_replication_version_checking(realm, dirman_passwd):
         conn.unbind()
 
 
-def wait_for_task(conn, dn):
+def poll_until(check, timeout=None):
+    """Call check until it reports completion or the timeout expires
+
+    ``check`` returns a tuple ``(done, state)``. While ``state`` stays the
+    same, the interval between calls grows from POLL_INTERVAL_MIN up to
+    POLL_INTERVAL_MAX; a change of ``state`` resets it. Operations which make
+    progress are followed closely and stalled ones are not polled needlessly.
+
+    :param timeout: maximum time to wait in seconds, no limit if None
+    :return: the ``(done, state)`` tuple returned by the last call of check
+    """
+    if timeout is not None:
+        deadline = time.time() + timeout
+    interval = POLL_INTERVAL_MIN
+    # no state returned by check equals this, the first call is progress
+    last_state = object()
+    while True:
+        done, state = check()
+        if done:
+            return done, state
+
+        if state != last_state:
+            interval = POLL_INTERVAL_MIN
+        else:
+            interval = min(interval * POLL_BACKOFF, POLL_INTERVAL_MAX)
+        last_state = state
+
+        if timeout is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return done, state
+            interval = min(interval, remaining)
+        time.sleep(interval)
+
+
+def wait_for_task(conn, dn, timeout=None):
     """Check task status
 
     Task is complete when the nsTaskExitCode attr is set.
@@ -146,16 +186,52 @@ def wait_for_task(conn, dn):
     :return: the task's return code
     """
     assert isinstance(dn, DN)
+    return wait_for_tasks(conn, [dn], timeout=timeout,
+                          log_level=logging.DEBUG)[0]
+
+
+def wait_for_tasks(conn, dns, timeout=None, log_level=logging.INFO):
+    """Wait for several tasks running concurrently to complete
+
+    The status of each task is logged whenever Directory Server updates it,
+    together with the percentage of processed items if the task reports it.
+
+    :param timeout: maximum time to wait in seconds, no limit if None
+    :param log_level: level of the task status messages
+    :return: list of the tasks' return codes in the order of ``dns``
+    """
     attrlist = [
         'nsTaskLog', 'nsTaskStatus', 'nsTaskExitCode', 'nsTaskCurrentItem',
         'nsTaskTotalItems']
-    while True:
-        entry = conn.get_entry(dn, attrlist)
-        if entry.single_value.get('nsTaskExitCode'):
-            exit_code = int(entry.single_value['nsTaskExitCode'])
-            break
-        time.sleep(1)
-    return exit_code
+    pending = list(dns)
+    exit_codes = {}
+    progress = {}
+
+    def check():
+        for dn in list(pending):
+            assert isinstance(dn, DN)
+            entry = conn.get_entry(dn, attrlist)
+            status = entry.single_value.get('nsTaskStatus')
+            current = entry.single_value.get('nsTaskCurrentItem')
+            if status and (status, current) != progress.get(dn):
+                progress[dn] = (status, current)
+                total = entry.single_value.get('nsTaskTotalItems')
+                if current and total and int(total) > 0:
+                    logger.log(log_level, "%s (%d%%): %s", dn[0].value,
+                               int(current) * 100 // int(total), status)
+                else:
+                    logger.log(log_level, "%s: %s", dn[0].value, status)
+            if entry.single_value.get('nsTaskExitCode'):
+                exit_codes[dn] = int(entry.single_value['nsTaskExitCode'])
+                pending.remove(dn)
+        return not pending, dict(progress)
+
+    done, _progress = poll_until(check, timeout)
+    if not done:
+        raise RuntimeError(
+            "Timeout waiting for tasks %s" %
+            ', '.join(str(dn[0].value) for dn in pending))
+    return [exit_codes[dn] for dn in dns]
 
 
 def wait_for_entry(connection, dn, timeout=7200, attr='', quiet=True):
@@ -166,31 +242,32 @@ def wait_for_entry(connection, dn, timeout=7200, attr='', quiet=True):
     if attr:
         filter = "(%s=*)" % attr
         attrlist.append(attr)
-    timeout += int(time.time())
 
     if not quiet:
         sys.stdout.write("Waiting for %s %s:%s " % (connection, dn, attr))
         sys.stdout.flush()
-    entry = None
-    while not entry and int(time.time()) < timeout:
+
+    def check():
         try:
             [entry] = connection.get_entries(
                 dn, ldap.SCOPE_BASE, filter, attrlist)
         except errors.NotFound:
-            pass  # no entry yet
-        except Exception as e:  # badness
-            logger.error("Error reading entry %s: %s", dn, e)
-            raise
-        if not entry:
+            # no entry yet
             if not quiet:
                 sys.stdout.write(".")
                 sys.stdout.flush()
-            time.sleep(1)
+            return False, None
+        except Exception as e:  # badness
+            logger.error("Error reading entry %s: %s", dn, e)
+            raise
+        return True, entry
 
-    if not entry and int(time.time()) > timeout:
+    done, entry = poll_until(check, timeout)
+
+    if not done:
         raise errors.NotFound(
             reason="wait_for_entry timeout for %s for %s" % (connection, dn))
-    elif entry and not quiet:
+    elif not quiet:
         logger.error("The waited for entry is: %s", entry)
 
 
@@ -780,19 +857,23 @@ class ReplicationManager(object):
                 break
 
             # One or both is missing, force sync again
+            agreements = []
             if not a_entry:
                 logger.debug('Unable to find entry for %s on %s',
                              filter_a, str(b))
                 self.force_sync(a, b.host)
                 _cn, dn = self.agreement_dn(b.host)
-                _haserror, error_message = self.wait_for_repl_update(a, dn, 60)
+                agreements.append((a, dn))
 
             if not b_entry:
                 logger.debug('Unable to find entry for %s on %s',
                              filter_b, str(a))
                 self.force_sync(b, a.host)
                 _cn, dn = self.agreement_dn(a.host)
-                _haserror, error_message = self.wait_for_repl_update(b, dn, 60)
+                agreements.append((b, dn))
+
+            results = self.wait_for_repl_updates(agreements, 60)
+            _haserror, error_message = results[-1]
 
             retries -= 1
 
@@ -977,27 +1058,48 @@ class ReplicationManager(object):
         return done, hasError, error_message
 
     def wait_for_repl_init(self, conn, agmtdn):
-        done = False
-        haserror = 0
         start = datetime.datetime.now()
-        while not done and not haserror:
-            time.sleep(1)  # give it a few seconds to get going
+
+        def check():
             done, haserror = self.check_repl_init(conn, agmtdn, start)
+            return done or bool(haserror), haserror
+
+        time.sleep(1)  # give it a few seconds to get going
+        _done, haserror = poll_until(check)
         print("")
         return haserror
 
     def wait_for_repl_update(self, conn, agmtdn, maxtries=600):
-        done = False
-        haserror = 0
-        error_message = ''
-        while not done and not haserror and maxtries > 0:
-            time.sleep(1)  # give it a few seconds to get going
-            done, haserror, error_message = self.check_repl_update(conn, agmtdn)
-            maxtries -= 1
-        if maxtries == 0: # too many tries
-            print("Error: timeout: could not determine agreement status: please check your directory server logs for possible errors")
-            haserror = 1
-        return haserror, error_message
+        return self.wait_for_repl_updates([(conn, agmtdn)], maxtries)[0]
+
+    def wait_for_repl_updates(self, agreements, maxtries=600):
+        """Wait for incremental updates of several agreements at once
+
+        :param agreements: list of (connection, agreement DN) tuples
+        :param maxtries: timeout in seconds
+        :return: list of (haserror, error_message) tuples in the order of
+                 agreements
+        """
+        results = [None] * len(agreements)
+
+        def check():
+            for i, (conn, agmtdn) in enumerate(agreements):
+                if results[i] is not None:
+                    continue
+                done, haserror, error_message = self.check_repl_update(
+                    conn, agmtdn)
+                if done or haserror:
+                    results[i] = (haserror, error_message)
+            return None not in results, list(results)
+
+        time.sleep(1)  # give it a few seconds to get going
+        poll_until(check, timeout=maxtries)
+
+        for i, result in enumerate(results):
+            if result is None:  # too many tries
+                print("Error: timeout: could not determine agreement status: please check your directory server logs for possible errors")
+                results[i] = (1, '')
+        return results
 
     def start_replication(self, conn, hostname=None, master=None):
         print("Starting replication, please wait until this has completed.")
@@ -1152,12 +1254,11 @@ class ReplicationManager(object):
         # the right tickets. We do this by force pushing all our changes
         self.force_sync(self.conn, r_hostname)
         _cn, dn = self.agreement_dn(r_hostname)
-        self.wait_for_repl_update(self.conn, dn, 300)
 
-        # now in the opposite direction
+        # and the changes in the opposite direction at the same time
         self.force_sync(r_conn, self.hostname)
-        _cn, dn = self.agreement_dn(self.hostname)
-        self.wait_for_repl_update(r_conn, dn, 300)
+        _cn, r_dn = self.agreement_dn(self.hostname)
+        self.wait_for_repl_updates([(self.conn, dn), (r_conn, r_dn)], 300)
 
         # now that directories are in sync,
         # change the agreements to use GSSAPI
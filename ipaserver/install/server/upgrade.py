@@ -1464,6 +1464,14 @@ def update_ipa_httpd_service_conf(http):
     http.update_httpd_service_ipa_conf()
 
 
+def update_plugin_manifest(http):
+    logger.info('[Updating server plugin manifest]')
+    try:
+        http.update_plugin_manifest()
+    except ipautil.CalledProcessError as e:
+        logger.error('Failed to update server plugin manifest: %s', e)
+
+
 def update_http_keytab(http):
     logger.info('[Moving HTTPD service keytab to gssproxy]')
     if os.path.exists(paths.OLD_IPA_KEYTAB):
@@ -1771,6 +1779,7 @@ def upgrade_configuration():
     fix_trust_flags()
     update_http_keytab(http)
     http.configure_gssproxy()
+    update_plugin_manifest(http)
     http.start()
 
     uninstall_selfsign(ds, http)
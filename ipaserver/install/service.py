@@ -17,19 +17,19 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import json
 import logging
 import sys
 import os
 import pwd
 import socket
-import datetime
+import time
 import traceback
-import tempfile
 
 import six
 
 from ipalib.install import certstore, sysrestore
-from ipapython import ipautil
+from ipapython import ipaldap, ipautil
 from ipapython.dn import DN
 from ipapython import kerberos
 from ipalib import api, errors
@@ -264,56 +264,54 @@ class Service(object):
 
     def _ldap_mod(self, ldif, sub_dict=None, raise_on_err=True,
                   ldap_uri=None, dm_password=None):
-        pw_name = None
-        fd = None
+        """
+        Apply changes from a LDIF file in USR_SHARE_IPA_DIR.
+
+        The LDIF is templated with sub_dict and applied in-process. The
+        connected ldap2 backend is reused unless a different URI or the
+        Directory Manager password is given.
+        """
         path = os.path.join(paths.USR_SHARE_IPA_DIR, ldif)
-        nologlist = []
 
         if sub_dict is not None:
             txt = ipautil.template_file(path, sub_dict)
-            fd = ipautil.write_tmp_file(txt)
-            path = fd.name
-
-            # do not log passwords
-            if 'PASSWORD' in sub_dict:
-                nologlist.append(sub_dict['PASSWORD'])
-            if 'RANDOM_PASSWORD' in sub_dict:
-                nologlist.append(sub_dict['RANDOM_PASSWORD'])
-
-        args = [paths.LDAPMODIFY, "-v", "-f", path]
-
-        # As we always connect to the local host,
-        # use URI of admin connection
-        if not ldap_uri:
-            ldap_uri = api.Backend.ldap2.ldap_uri
-
-        args += ["-H", ldap_uri]
-
-        if dm_password:
-            with tempfile.NamedTemporaryFile(
-                    mode='w', delete=False) as pw_file:
-                pw_file.write(dm_password)
-                pw_name = pw_file.name
-            auth_parms = ["-x", "-D", "cn=Directory Manager", "-y", pw_name]
-        # Use GSSAPI auth when not using DM password or not being root
-        elif os.getegid() != 0:
-            auth_parms = ["-Y", "GSSAPI"]
-        # Default to EXTERNAL auth mechanism
         else:
-            auth_parms = ["-Y", "EXTERNAL"]
-
-        args += auth_parms
+            with open(path) as f:
+                txt = f.read()
 
+        ldap2 = api.Backend.ldap2
+        conn = None
         try:
             try:
-                ipautil.run(args, nolog=nologlist)
-            except ipautil.CalledProcessError as e:
+                records = ipaldap.parse_ldif_changes(txt)
+
+                # As we always connect to the local host,
+                # use URI of admin connection
+                if not ldap_uri:
+                    ldap_uri = ldap2.ldap_uri
+
+                if (not dm_password and ldap_uri == ldap2.ldap_uri and
+                        ldap2.isconnected()):
+                    ldap2.apply_ldif_changes(records)
+                else:
+                    conn = ipaldap.LDAPClient(ldap_uri)
+                    if dm_password:
+                        conn.simple_bind(ipaldap.DIRMAN_DN, dm_password)
+                    # Use GSSAPI auth when not using DM password or not
+                    # being root
+                    elif os.getegid() != 0:
+                        conn.gssapi_bind()
+                    # Default to EXTERNAL auth mechanism
+                    else:
+                        conn.external_bind()
+                    conn.apply_ldif_changes(records)
+            except (ValueError, errors.PublicError) as e:
                 logger.critical("Failed to load %s: %s", ldif, str(e))
                 if raise_on_err:
                     raise
         finally:
-            if pw_name:
-                os.remove(pw_name)
+            if conn is not None:
+                conn.unbind()
 
     def move_service(self, principal):
         """
@@ -458,6 +456,8 @@ class Service(object):
         not been provided).
 
         Use show_service_name to include service name in generated descriptions.
+
+        The time spent in each step is written to the log as a JSON timeline.
         """
 
         if start_message is None:
@@ -490,13 +490,24 @@ class Service(object):
         else:
             self.print_msg(start_message)
 
-        def run_step(message, method):
+        timeline = []
+
+        def run_step(message, method, kind='step'):
             self.print_msg(message)
-            s = datetime.datetime.now()
-            method()
-            e = datetime.datetime.now()
-            d = e - s
-            logger.debug("  duration: %d seconds", d.seconds)
+            record = dict(service=self.service_name, step=message.strip(),
+                          kind=kind, start=time.time())
+            try:
+                method()
+            except BaseException:
+                record['status'] = 'error'
+                raise
+            else:
+                record['status'] = 'ok'
+            finally:
+                record['end'] = time.time()
+                record['duration'] = round(record['end'] - record['start'], 3)
+                timeline.append(record)
+                logger.debug("  duration: %d seconds", record['duration'])
 
         step = 0
         steps_iter = iter(self.steps)
@@ -515,9 +526,13 @@ class Service(object):
                 # run through remaining methods marked run_after_failure
                 for message, method, run_after_failure in steps_iter:
                     if run_after_failure:
-                        run_step("  [cleanup]: %s" % message, method)
+                        run_step("  [cleanup]: %s" % message, method,
+                                 kind='cleanup')
 
             raise
+        finally:
+            logger.debug("Installation step timeline: %s",
+                         json.dumps(timeline, sort_keys=True))
 
         self.print_msg(end_message)
 
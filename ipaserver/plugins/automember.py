@@ -16,6 +16,8 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import logging
+import re
 import uuid
 import time
 
@@ -40,6 +42,8 @@ from ipapython.dn import DN
 if six.PY3:
     unicode = str
 
+logger = logging.getLogger(__name__)
+
 __doc__ = _("""
 Auto Membership Rule.
 """) + _("""
@@ -136,6 +140,12 @@ EXAMPLES:
 """) + _("""
  Rebuild membership for specified hosts:
     ipa automember-rebuild --hosts=web1.example.com --hosts=web2.example.com
+""") + _("""
+ Show memberships which the rule of a group would add:
+    ipa automember-rebuild --type=group --rules=devel --dry-run
+""") + _("""
+ Add memberships of the rule of a group without running a task:
+    ipa automember-rebuild --type=group --rules=devel
 """)
 
 register = Registry()
@@ -148,6 +158,9 @@ REBUILD_TASK_CONTAINER = DN(('cn', 'automember rebuild membership'),
                             ('cn', 'tasks'),
                             ('cn', 'config'))
 
+# Maximal number of members added to a group by one modification
+REBUILD_CHUNK_SIZE = 1000
+
 
 regex_attrs = (
     Str('automemberinclusiveregex*',
@@ -183,6 +196,122 @@ group_type = (
 )
 
 
+class AutomemberDefinition(object):
+    """
+    Automember rules of a grouping type compiled for evaluation.
+
+    Conditions are evaluated the way the Auto Membership plug-in of 389-ds
+    does: an entry is added to the target group of every rule whose
+    exclusive conditions do not match it and some of whose inclusive
+    conditions match it. An entry matching no rule is added to the default
+    group.
+    """
+    def __init__(self, ldap, gtype, rules=None):
+        self.definition_dn = DN(
+            ('cn', gtype), api.env.container_automember, api.env.basedn)
+        definition = ldap.get_entry(self.definition_dn, [
+            'automemberscope', 'automemberfilter', 'automembergroupingattr',
+            'automemberdefaultgroup'])
+
+        self.scope = DN(definition.single_value['automemberscope'])
+        self.filter = definition.single_value['automemberfilter']
+        if not self.filter.startswith('('):
+            self.filter = '(%s)' % self.filter
+        group_attr, member_attr = definition.single_value[
+            'automembergroupingattr'].split(':', 1)
+        self.group_attr = group_attr.lower()
+        self.member_attr = member_attr.lower()
+        # entries matching none of a subset of rules may match other rules
+        self.default_group = None
+        if rules is None:
+            self.default_group = definition.single_value.get(
+                'automemberdefaultgroup')
+        self.rules = self._compile_rules(ldap, rules)
+
+    def _compile_rules(self, ldap, names):
+        """
+        Read and compile regex rules, all of them or only those named.
+
+        :return: list of (target group DN, inclusive conditions, exclusive
+                 conditions) where conditions are (attribute, regex) pairs
+        """
+        try:
+            entries = ldap.get_entries(
+                self.definition_dn, ldap.SCOPE_ONELEVEL,
+                '(objectclass=automemberregexrule)',
+                ['cn', 'automembertargetgroup', INCLUDE_RE, EXCLUDE_RE])
+        except errors.EmptyResult:
+            entries = []
+        by_name = dict((e.single_value['cn'].lower(), e) for e in entries)
+
+        if names is not None:
+            for name in names:
+                if name.lower() not in by_name:
+                    raise errors.NotFound(
+                        reason=_(u'Auto member rule: %s not found!') % name)
+            entries = [by_name[name.lower()] for name in names]
+
+        rules = []
+        for entry in entries:
+            rules.append((
+                entry.single_value['automembertargetgroup'],
+                self._compile_conditions(entry, INCLUDE_RE),
+                self._compile_conditions(entry, EXCLUDE_RE),
+            ))
+        return rules
+
+    def _compile_conditions(self, entry, attr):
+        conditions = []
+        for value in entry.get(attr, []):
+            key, _sep, regex = value.partition('=')
+            try:
+                conditions.append((key.lower(), re.compile(regex)))
+            except re.error as e:
+                logger.warning("Ignoring condition %s of %s: %s",
+                               value, entry.dn, e)
+        return conditions
+
+    @property
+    def attributes(self):
+        """Attributes of entries needed to evaluate the rules."""
+        attrs = set()
+        for _target, inclusive, exclusive in self.rules:
+            attrs.update(key for (key, _regex) in inclusive + exclusive)
+        if self.member_attr != 'dn':
+            attrs.add(self.member_attr)
+        return list(attrs)
+
+    def _matches(self, values, conditions):
+        for key, regex in conditions:
+            for value in values.get(key, ()):
+                if regex.search(value):
+                    return True
+        return False
+
+    def targets(self, entry):
+        """Get DNs of groups the entry belongs to according to the rules."""
+        values = dict(
+            (attr.lower(), [v.decode('utf-8') for v in raw_values])
+            for attr, raw_values in entry.raw.items())
+        targets = [target for (target, inclusive, exclusive) in self.rules
+                   if not self._matches(values, exclusive) and
+                   self._matches(values, inclusive)]
+        if not targets and self.default_group is not None:
+            targets = [self.default_group]
+        return targets
+
+    def member_value(self, entry):
+        if self.member_attr == 'dn':
+            return entry.dn
+        return entry.single_value[self.member_attr]
+
+    def normalize(self, value):
+        """Make member values comparable, DNs compare case-insensitively."""
+        if isinstance(value, DN):
+            return value
+        return unicode(value).lower()
+
+
 @register()
 class automember(LDAPObject):
 
@@ -683,8 +812,6 @@ class automember_rebuild(Method):
     obj_name = 'automember_task'
     attr_name = 'rebuild'
 
-    # TODO: Add a --dry-run option:
-    # https://fedorahosted.org/freeipa/ticket/3936
     takes_options = (
         group_type[0].clone(
             required=False,
@@ -706,6 +833,19 @@ class automember_rebuild(Method):
             label=_('No wait'),
             doc=_("Don't wait for rebuilding membership"),
         ),
+        Str(
+            'rules*',
+            label=_('Rules'),
+            doc=_('Rebuild membership only for target groups of specified '
+                  'rules, without running a task'),
+        ),
+        Flag(
+            'dry_run?',
+            default=False,
+            label=_('Dry run'),
+            doc=_("Only show memberships which would be added, without "
+                  "running a task"),
+        ),
     )
     has_output = output.standard_entry
 
@@ -716,6 +856,7 @@ class automember_rebuild(Method):
         - 'users' and 'hosts' cannot be combined together
         - if 'users' and 'type' are specified, 'type' must be 'group'
         - if 'hosts' and 'type' are specified, 'type' must be 'hostgroup'
+        - 'no_wait' cannot be combined with 'dry_run' or 'rules'
         """
         super(automember_rebuild, self).validate(**kw)
         users, hosts, gtype = kw.get('users'), kw.get('hosts'), kw.get('type')
@@ -738,6 +879,114 @@ class automember_rebuild(Method):
             raise errors.MutuallyExclusiveError(
                 reason=_("users cannot be set when type is 'hostgroup'")
             )
+        if kw.get('no_wait') and (kw.get('dry_run') or kw.get('rules')):
+            raise errors.MutuallyExclusiveError(
+                reason=_("no_wait cannot be set with dry_run or rules")
+            )
+
+    def evaluate(self, definition, obj, names):
+        """
+        Compute memberships the rules would add.
+
+        Entries in scope of the definition, or the named entries only, are
+        read with one paged search and current members of the target groups
+        are read once per group.
+
+        :return: dict {group DN: list of (entry DN, member value)} with
+                 memberships which do not exist yet
+        """
+        ldap = self.api.Backend.ldap2
+
+        search_filter = definition.filter
+        if names:
+            search_filter = ldap.combine_filters(
+                [search_filter, ldap.make_filter_from_attr(
+                    obj.primary_key.name, names, rules=ldap.MATCH_ANY)],
+                rules=ldap.MATCH_ALL)
+        try:
+            entries = ldap.get_entries(
+                definition.scope, ldap.SCOPE_SUBTREE, search_filter,
+                definition.attributes or [''], paged_search=True)
+        except errors.EmptyResult:
+            entries = []
+
+        members = {}
+        additions = {}
+        for entry in entries:
+            for target in definition.targets(entry):
+                if target not in members:
+                    group = ldap.get_entry(target, [definition.group_attr])
+                    members[target] = set(
+                        definition.normalize(v) for v in
+                        group.get(definition.group_attr, []))
+                value = definition.member_value(entry)
+                if definition.normalize(value) in members[target]:
+                    continue
+                additions.setdefault(target, []).append((entry.dn, value))
+        return additions
+
+    def apply(self, definition, additions):
+        """
+        Add new members to each group in chunks of REBUILD_CHUNK_SIZE.
+
+        When a chunk contains a value which became a member since the group
+        was read, the values of the chunk are added one by one, skipping
+        the existing members.
+        """
+        ldap = self.api.Backend.ldap2
+        for target, new_members in additions.items():
+            values = [value for (_dn, value) in new_members]
+            for i in range(0, len(values), REBUILD_CHUNK_SIZE):
+                chunk = values[i:i + REBUILD_CHUNK_SIZE]
+                try:
+                    ldap.add_entries_to_group(chunk, target,
+                                              definition.group_attr)
+                except errors.AlreadyGroupMember:
+                    for value in chunk:
+                        try:
+                            ldap.add_entries_to_group(
+                                [value], target, definition.group_attr)
+                        except errors.AlreadyGroupMember:
+                            pass
+
+    def rebuild(self, gtype, obj, names, **options):
+        """
+        Evaluate automember rules in the server instead of a 389-ds task.
+
+        Only memberships which do not exist yet are added, like the rebuild
+        task does.
+        """
+        ldap = self.api.Backend.ldap2
+        definition = AutomemberDefinition(ldap, gtype, options.get('rules'))
+        additions = self.evaluate(definition, obj, names)
+
+        member_obj = self.api.Object['group' if gtype == 'group'
+                                     else 'hostgroup']
+        result = {}
+        for target, new_members in additions.items():
+            group = member_obj.get_primary_key_from_dn(target)
+            result[group] = sorted(
+                obj.get_primary_key_from_dn(dn) for (dn, _value)
+                in new_members)
+        count = sum(len(v) for v in additions.values())
+
+        if options.get('dry_run'):
+            summary = ngettext(
+                '%(count)d membership would be added',
+                '%(count)d memberships would be added', count) % dict(
+                    count=count)
+        else:
+            self.apply(definition, additions)
+            summary = ngettext(
+                'Automember rebuild membership completed, %(count)d '
+                'membership added',
+                'Automember rebuild membership completed, %(count)d '
+                'memberships added', count) % dict(count=count)
+
+        return dict(
+            result=result,
+            summary=unicode(summary),
+            value=pkey_to_value(None, options))
 
     def execute(self, *keys, **options):
         ldap = self.api.Backend.ldap2
@@ -770,6 +1019,11 @@ class automember_rebuild(Method):
                     obj.get_dn_if_exists(name)
                 except errors.NotFound:
                     obj.handle_not_found(name)
+
+        if options.get('dry_run') or options.get('rules'):
+            return self.rebuild(gtype, obj, names, **options)
+
+        if names:
             search_filter = ldap.make_filter_from_attr(
                 obj.primary_key.name,
                 names,
@@ -20,6 +20,7 @@
 Base classes for LDAP plugins.
 """
 
+import collections
 import re
 import time
 from copy import deepcopy
@@ -44,6 +45,9 @@ if six.PY3:
 
 DNA_MAGIC = -1
 
+# Maximal number of keys looked up by one search in get_dns_if_exist
+DN_LOOKUP_CHUNK_SIZE = 100
+
 global_output_params = (
     Flag('has_password',
         label=_('Password'),
@@ -210,6 +214,23 @@ def get_effective_rights(ldap, dn, attrs=None):
     if attrs is None:
         attrs = ['*', 'nsaccountlock', 'cospriority']
     rights = ldap.get_effective_rights(dn, attrs)
+    return _parse_attribute_rights(rights)
+
+
+def get_effective_rights_multi(ldap, dns, attrs=None):
+    """
+    Get attribute level rights of multiple entries at once.
+
+    Returns a list of rights in the order of dns, rights of entries which
+    don't exist are empty.
+    """
+    if attrs is None:
+        attrs = ['*', 'nsaccountlock', 'cospriority']
+    return [_parse_attribute_rights(rights) if rights is not None else {}
+            for rights in ldap.get_effective_rights_multi(dns, attrs)]
+
+
+def _parse_attribute_rights(rights):
     rdict = {}
     if 'attributelevelrights' in rights:
         rights = rights['attributelevelrights']
@@ -600,6 +621,94 @@ class LDAPObject(Object):
         entry = self.backend.get_entry(dn, [''])
         return entry.dn
 
+    def _search_chunks(self, base_dn, scope, search_filter, attr, values,
+                       attrs_list):
+        """
+        Search for entries with any of values of attr, one search per chunk.
+        """
+        ldap = self.backend
+        searches = []
+        for i in range(0, len(values), DN_LOOKUP_CHUNK_SIZE):
+            chunk_filter = ldap.make_filter_from_attr(
+                attr, values[i:i + DN_LOOKUP_CHUNK_SIZE], rules=ldap.MATCH_ANY)
+            if search_filter:
+                chunk_filter = ldap.combine_filters(
+                    [search_filter, chunk_filter], rules=ldap.MATCH_ALL)
+            searches.append((base_dn, scope, chunk_filter, attrs_list))
+        results = ldap.get_entries_multi(searches)
+        return [entry for entries in results for entry in entries]
+
+    def get_dns_if_exist(self, keys):
+        """
+        Get DNs of existing entries from their primary keys.
+
+        Existence is checked with one search per parent entry and chunk of
+        DN_LOOKUP_CHUNK_SIZE keys, the searches are pipelined.
+
+        :return: tuple (dns, failed) of dict {key: DN} of existing entries
+                 and list of (key, exception) of the other keys
+        """
+        dns = {}
+        failed = []
+        ldap = self.backend
+
+        if self.rdn_attribute:
+            # the primary key is not in the DN, search for it
+            pkey = self.primary_key.name
+            found = {}
+            found_nocase = {}
+            entries = self._search_chunks(
+                DN(self.container_dn, self.api.env.basedn),
+                ldap.SCOPE_SUBTREE,
+                ldap.make_filter_from_attr(
+                    'objectclass', self.object_class, rules=ldap.MATCH_ALL),
+                pkey, list(keys), [pkey])
+            for entry in entries:
+                for value in entry.get(pkey, []):
+                    value = unicode(value)
+                    found.setdefault(value, []).append(entry.dn)
+                    found_nocase.setdefault(value.lower(), []).append(
+                        entry.dn)
+            for key in keys:
+                # the server matched the values using the matching rule of
+                # the attribute, prefer exact matches for case-exact ones
+                key_dns = found.get(unicode(key))
+                if not key_dns:
+                    key_dns = found_nocase.get(unicode(key).lower(), [])
+                if len(key_dns) == 1:
+                    dns[key] = key_dns[0]
+                elif key_dns:
+                    failed.append(
+                        (key, errors.SingleMatchExpected(found=len(key_dns))))
+                else:
+                    failed.append(
+                        (key, errors.NotFound(reason=u'no such entry')))
+            return (dns, failed)
+
+        # group keys by parent entry and RDN attribute of their DN
+        candidates = collections.OrderedDict()
+        for key in keys:
+            try:
+                dn = self.get_dn(key)
+            except errors.PublicError as e:
+                failed.append((key, e))
+                continue
+            candidates.setdefault(
+                (dn[1:], dn[0].attr), []).append((key, dn))
+
+        for (parent_dn, attr), items in candidates.items():
+            entries = self._search_chunks(
+                parent_dn, ldap.SCOPE_ONELEVEL, None, attr,
+                [dn[0].value for (_key, dn) in items], [''])
+            found = dict((entry.dn, entry.dn) for entry in entries)
+            for key, dn in items:
+                if dn in found:
+                    dns[key] = found[dn]
+                else:
+                    failed.append(
+                        (key, errors.NotFound(reason=u'no such entry')))
+        return (dns, failed)
+
     def get_primary_key_from_dn(self, dn):
         assert isinstance(dn, DN)
         try:
@@ -623,6 +732,32 @@ class LDAPObject(Object):
             # doesn't exist
             return unicode(dn)
 
+    def get_primary_keys_from_dns(self, dns):
+        """
+        Get primary keys of multiple entries.
+
+        Entries are read with pipelined searches when the primary key is not
+        part of the DN, so that many members cost one round trip rather than
+        one per member.
+        """
+        if not self.rdn_attribute:
+            return [self.get_primary_key_from_dn(dn) for dn in dns]
+
+        pkey = self.primary_key.name
+        results = self.backend.get_entries_multi(
+            (dn, self.backend.SCOPE_BASE, None, [pkey]) for dn in dns)
+
+        pkeys = []
+        for dn, entries in zip(dns, results):
+            if entries:
+                pkeys.append(entries[0].get(pkey, [''])[0])
+            else:
+                try:
+                    pkeys.append(dn[pkey])
+                except KeyError:
+                    pkeys.append(unicode(dn))
+        return pkeys
+
     def get_ancestor_primary_keys(self):
         if self.parent_object:
             parent_obj = self.api.Object[self.parent_object]
@@ -645,6 +780,7 @@ class LDAPObject(Object):
 
         container_dns = {}
         new_attrs = {}
+        members = collections.OrderedDict()
 
         for attr in self.attribute_members:
             try:
@@ -664,16 +800,25 @@ class LDAPObject(Object):
                         container_dns[ldap_obj_name] = container_dn
 
                     if memberdn.endswith(container_dn):
-                        new_value = ldap_obj.get_primary_key_from_dn(memberdn)
                         new_attr_name = '%s_%s' % (attr, ldap_obj.name)
                         try:
                             new_attr = new_attrs[new_attr_name]
                         except KeyError:
                             new_attr = entry_attrs.setdefault(new_attr_name, [])
                             new_attrs[new_attr_name] = new_attr
-                        new_attr.append(new_value)
+                        members.setdefault(ldap_obj_name, []).append(
+                            (new_attr, memberdn))
                         break
 
+        # resolve primary keys of members of each object type at once
+        for ldap_obj_name, obj_members in members.items():
+            ldap_obj = self.api.Object[ldap_obj_name]
+            new_values = ldap_obj.get_primary_keys_from_dns(
+                [memberdn for (_new_attr, memberdn) in obj_members])
+            for (new_attr, _memberdn), new_value in zip(obj_members,
+                                                         new_values):
+                new_attr.append(new_value)
+
     def get_indirect_members(self, entry_attrs, attrs_list):
         if 'memberindirect' in attrs_list:
             self.get_memberindirect(entry_attrs)
@@ -688,15 +833,11 @@ class LDAPObject(Object):
         mo_filter = self.backend.make_filter({'memberof': group_entry.dn})
         filter = self.backend.combine_filters(
             ('(member=*)', mo_filter), self.backend.MATCH_ALL)
-        try:
-            result = self.backend.get_entries(
-                self.api.env.basedn,
-                filter=filter,
-                attrs_list=['member'],
-                size_limit=-1, # paged search will get everything anyway
-                paged_search=True)
-        except errors.NotFound:
-            result = []
+        result = self.backend.iter_entries(
+            self.api.env.basedn,
+            filter=filter,
+            attrs_list=['member'],
+            size_limit=-1)  # paged search will get everything anyway
 
         indirect = set()
         for entry in result:
@@ -711,15 +852,11 @@ class LDAPObject(Object):
         dn = entry.dn
         filter = self.backend.make_filter(
             {'member': dn, 'memberuser': dn, 'memberhost': dn})
-        try:
-            result = self.backend.get_entries(
-                self.api.env.basedn,
-                filter=filter,
-                attrs_list=[''],
-                size_limit=-1,  # paged search will get everything anyway
-                paged_search=True)
-        except errors.NotFound:
-            result = []
+        result = self.backend.iter_entries(
+            self.api.env.basedn,
+            filter=filter,
+            attrs_list=[''],
+            size_limit=-1)  # paged search will get everything anyway
 
         direct = set()
         indirect = set(entry.raw.get('memberof', []))
@@ -1610,6 +1747,9 @@ class LDAPModMember(LDAPQuery):
     member_param_doc = _('%s')
     member_param_label = _('member %s')
     member_count_out = ('%i member processed.', '%i members processed.')
+    # whether members must exist; references to removed entries can still
+    # be removed from member attributes
+    member_must_exist = True
 
     def get_options(self):
         for option in super(LDAPModMember, self).get_options():
@@ -1632,17 +1772,20 @@ class LDAPModMember(LDAPQuery):
             for ldap_obj_name in self.obj.attribute_members[attr]:
                 dns[attr][ldap_obj_name] = []
                 failed[attr][ldap_obj_name] = []
-                names = options.get(to_cli(ldap_obj_name), [])
+                names = [name for name in
+                         options.get(to_cli(ldap_obj_name), []) if name]
                 if not names:
                     continue
-                for name in names:
-                    if not name:
-                        continue
-                    ldap_obj = self.api.Object[ldap_obj_name]
-                    try:
-                        dns[attr][ldap_obj_name].append(ldap_obj.get_dn(name))
-                    except errors.PublicError as e:
+                ldap_obj = self.api.Object[ldap_obj_name]
+                (found, not_found) = ldap_obj.get_dns_if_exist(names)
+                for name, e in not_found:
+                    if (isinstance(e, errors.NotFound) and
+                            not self.member_must_exist):
+                        found[name] = ldap_obj.get_dn(name)
+                    else:
                         failed[attr][ldap_obj_name].append((name, unicode(e)))
+                dns[attr][ldap_obj_name].extend(
+                    found[name] for name in names if name in found)
         return (dns, failed)
 
 
@@ -1672,6 +1815,10 @@ class LDAPAddMember(LDAPModMember):
         ldap = self.obj.backend
 
         (member_dns, failed) = self.get_member_dns(**options)
+        # get_member_dns() found these entries, callbacks may add others
+        verified_dns = set(
+            m_dn for objs in member_dns.values()
+            for obj_dns in objs.values() for m_dn in obj_dns)
 
         dn = self.obj.get_dn(*keys, **options)
         assert isinstance(dn, DN)
@@ -1688,7 +1835,9 @@ class LDAPAddMember(LDAPModMember):
                     if not m_dn:
                         continue
                     try:
-                        ldap.add_entry_to_group(m_dn, dn, attr, allow_same=self.allow_same)
+                        ldap.add_entry_to_group(
+                            m_dn, dn, attr, allow_same=self.allow_same,
+                            check_exists=m_dn not in verified_dns)
                     except errors.PublicError as e:
                         ldap_obj = self.api.Object[ldap_obj_name]
                         failed[attr][ldap_obj_name].append((
@@ -1751,6 +1900,7 @@ class LDAPRemoveMember(LDAPModMember):
     """
     member_param_doc = _('%s to remove')
     member_count_out = ('%i member removed.', '%i members removed.')
+    member_must_exist = False
 
     has_output = (
         output.Entry('result'),
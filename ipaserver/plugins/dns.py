@@ -20,9 +20,12 @@
 
 from __future__ import absolute_import
 
+import collections
+import json
 import logging
 
 import netaddr
+import threading
 import time
 import re
 import binascii
@@ -81,6 +84,7 @@ from ipapython.dn import DN
 from ipapython.ipautil import CheckedIPAddress
 from ipapython.dnsutil import check_zone_overlap
 from ipapython.dnsutil import DNSName
+from ipapython.dnsutil import iter_zonefile_records
 from ipapython.dnsutil import related_to_auto_empty_zone
 from ipaserver.dns_data_management import (
     IPASystemRecords,
@@ -242,6 +246,12 @@ EXAMPLES:
  Delegate zone sub.example to another nameserver:
    ipa dnsrecord-add example.com ns.sub --a-rec=203.0.113.1
    ipa dnsrecord-add example.com sub --ns-rec=ns.sub.example.com.
+""") + _("""
+ Import resource records of zone example.com from a zone file:
+   ipa dnszone-import example.com --file=example.com.zone
+""") + _("""
+ Export resource records of zone example.com to a zone file:
+   ipa dnszone-export example.com --out=example.com.zone
 """) + _("""
  Delete zone example.com with all resource records:
    ipa dnszone-del example.com
@@ -342,6 +352,20 @@ _IN = dns.rdataclass.IN
 # NS record type
 _NS = dns.rdatatype.from_text('NS')
 
+# DNS propagation checks: the wait_for_dns option gives the overall deadline
+# in seconds, checks are repeated with exponential backoff from the minimal
+# to the maximal period (seconds) and at most _DNS_QUERY_WORKERS queries run
+# at once
+_DNS_WAIT_MIN_PERIOD = 0.1
+_DNS_WAIT_MAX_PERIOD = 2
+_DNS_QUERY_WORKERS = 16
+
+# resolver errors which are retried until the deadline
+_DNS_RETRY_ERRORS = (dns.resolver.NXDOMAIN,
+                     dns.resolver.YXDOMAIN,
+                     dns.resolver.NoNameservers,
+                     dns.resolver.Timeout)
+
 _output_permissions = (
     output.summary,
     output.Output('result', bool, _('True means the operation was successful')),
@@ -2990,6 +3014,351 @@ class dnszone_remove_permission(DNSZoneBase_remove_permission):
     __doc__ = _('Remove a permission for per-zone access delegation.')
 
 
+def _zone_name(name, zone):
+    """
+    Convert owner name ``name`` to a name relative to ``zone``.
+    """
+    if name in (u'', u'@'):
+        return _dns_zone_record
+    name = DNSName(name)
+    if name.is_absolute():
+        if not name.is_subdomain(zone):
+            raise ValueError(
+                _('%(name)s is not in zone %(zone)s') %
+                dict(name=name, zone=zone))
+        name = name.relativize(zone)
+    return name
+
+
+def _iter_json_records(zonedata, zone):
+    """
+    Iterate through ``(name, ttl, rrtype, data)`` records of ``zonedata`` in
+    JSON Lines format, one ``{"name", "ttl", "type", "data"}`` object per
+    line. The ``ttl`` is optional.
+    """
+    for line in zonedata.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        ttl = record.get('ttl')
+        yield (_zone_name(record['name'], zone),
+               int(ttl) if ttl is not None else None,
+               unicode(record['type']).upper(),
+               unicode(record['data']))
+
+
+@register()
+class dnszone_import(LDAPQuery):
+    __doc__ = _('Import resource records into a DNS zone.')
+
+    msg_summary = _('Imported resource records into zone "%(value)s"')
+
+    has_output = (
+        output.summary,
+        output.Output('result', dict,
+                      _('Number of imported names and records')),
+        output.value,
+    )
+
+    takes_options = (
+        Str('zonedata?',
+            label=_('Zone data'),
+            doc=_('Resource records in zone file or JSON Lines format'),
+        ),
+        StrEnum('format?',
+            label=_('Format'),
+            doc=_('Format of zone data: zonefile (default) or json'),
+            values=(u'zonefile', u'json'),
+            default=u'zonefile',
+            autofill=True,
+        ),
+    )
+
+    def _parse(self, zone, zonedata, data_format):
+        """
+        Group records of ``zonedata`` by owner name.
+
+        Returns a tuple of an ordered dictionary ``{name: {attr: values}}``,
+        a dictionary ``{name: ttl}`` of names with records with TTL and the
+        number of skipped SOA records.
+        """
+        if data_format == u'json':
+            records = _iter_json_records(zonedata, zone)
+        else:
+            records = iter_zonefile_records(zonedata, zone)
+
+        names = collections.OrderedDict()
+        ttls = {}
+        skipped = 0
+        try:
+            for (name, ttl, rrtype, data) in records:
+                if rrtype == u'SOA':
+                    # the SOA record is a part of the zone entry
+                    skipped += 1
+                    continue
+                if rrtype not in _record_types:
+                    raise ValueError(
+                        _('%(name)s: unsupported record type %(type)s') %
+                        dict(name=name, type=rrtype))
+                attr = record_name_format % rrtype.lower()
+                if ttls.setdefault(name, ttl) != ttl:
+                    # the TTL is an attribute of the entry of the name
+                    raise ValueError(
+                        _('%(name)s: records of a name must have the same '
+                          'TTL') % dict(name=name))
+                names.setdefault(name, {}).setdefault(attr, []).append(data)
+        except (ValueError, KeyError, TypeError) as e:
+            raise errors.ValidationError(name='zonedata', error=unicode(e))
+        ttls = {name: ttl for name, ttl in ttls.items() if ttl is not None}
+        return names, ttls, skipped
+
+    def _convert(self, names):
+        """
+        Normalize, convert and validate record values of all names.
+
+        Values of each record type are checked together. Only when they do
+        not pass, they are checked name by name to report the name.
+        """
+        params = self.api.Object.dnsrecord.params
+        by_attr = collections.OrderedDict()
+        for name, rrattrs in names.items():
+            for attr, values in rrattrs.items():
+                by_attr.setdefault(attr, []).append((name, values))
+
+        for attr, items in by_attr.items():
+            param = params[attr]
+            values = tuple(v for (_name, vs) in items for v in vs)
+            try:
+                values = param.convert(param.normalize(values))
+                param.validate(values)
+            except (errors.ValidationError, errors.ConversionError):
+                values = None
+            if values is not None and len(values) == sum(
+                    len(vs) for (_name, vs) in items):
+                i = 0
+                for (name, vs) in items:
+                    names[name][attr] = list(values[i:i + len(vs)])
+                    i += len(vs)
+                continue
+
+            for (name, vs) in items:
+                try:
+                    vs = param.convert(param.normalize(tuple(vs)))
+                    param.validate(vs)
+                except (errors.ValidationError,
+                        errors.ConversionError) as e:
+                    raise errors.ValidationError(
+                        name=param.cli_name,
+                        error=u'%s: %s' % (name, e.error))
+                names[name][attr] = list(vs)
+
+    def execute(self, *keys, **options):
+        ldap = self.obj.backend
+        zone = keys[-1]
+
+        zonedata = options.get('zonedata')
+        if not zonedata:
+            raise errors.RequirementError(name='zonedata')
+
+        zone_dn = self.obj.get_dn(*keys, **options)
+        try:
+            zone_entry = ldap.get_entry(
+                zone_dn,
+                ['objectclass', 'dnsdefaultttl', 'dnsttl'] +
+                _record_attributes)
+        except errors.NotFound:
+            self.obj.handle_not_found(*keys)
+        if 'idnszone' not in [oc.lower() for oc in zone_entry['objectclass']]:
+            raise errors.ValidationError(
+                name='dnszoneidnsname',
+                error=_(u'only master zones can contain records')
+            )
+
+        default_ttl = zone_entry.single_value.get('dnsdefaultttl')
+        if default_ttl is not None:
+            default_ttl = int(default_ttl)
+
+        names, ttls, skipped = self._parse(
+            zone, zonedata, options.get('format', u'zonefile'))
+        self._convert(names)
+
+        existing = {_dns_zone_record: zone_entry}
+        try:
+            entries = ldap.find_entries(
+                base_dn=zone_dn,
+                scope=ldap.SCOPE_ONELEVEL,
+                filter='(objectclass=idnsrecord)',
+                attrs_list=['idnsname', 'dnsttl'] + _record_attributes,
+                size_limit=0,
+                time_limit=0,
+                paged_search=True,
+            )[0]
+        except errors.EmptyResult:
+            entries = []
+        for entry in entries:
+            existing[entry.single_value['idnsname']] = entry
+
+        dnsrecord = self.api.Object.dnsrecord
+        added = updated = records = 0
+        for name, rrattrs in names.items():
+            entry = existing.get(name)
+            ttl = ttls.get(name)
+            if entry is None:
+                dnsrecord.check_record_type_collisions((zone, name), rrattrs)
+                dnsrecord.check_record_type_dependencies((zone, name),
+                                                         rrattrs)
+                entry = ldap.make_entry(
+                    DN(('idnsname', name.ToASCII()), zone_dn),
+                    objectclass=dnsrecord.object_class,
+                    idnsname=[name],
+                    **rrattrs
+                )
+                if ttl is not None and ttl != default_ttl:
+                    entry['dnsttl'] = [ttl]
+                ldap.add_entry(entry)
+                added += 1
+                records += sum(len(vs) for vs in rrattrs.values())
+            else:
+                merged = dnsrecord.updated_rrattrs(entry, {})
+                new = 0
+                for attr, values in rrattrs.items():
+                    old = list(entry.get(attr, []))
+                    values = [v for v in values if v not in old]
+                    if values:
+                        merged[attr] = entry[attr] = old + values
+                        new += len(values)
+                old_ttl = entry.single_value.get('dnsttl')
+                if old_ttl is not None:
+                    old_ttl = int(old_ttl)
+                ttl_changed = ttl is not None and ttl != old_ttl and not (
+                    old_ttl is None and ttl == default_ttl)
+                if ttl_changed:
+                    entry['dnsttl'] = [ttl]
+                if not new and not ttl_changed:
+                    continue
+                dnsrecord.check_record_type_collisions((zone, name), merged)
+                dnsrecord.check_record_type_dependencies((zone, name),
+                                                         merged)
+                ldap.update_entry(entry)
+                updated += 1
+                records += new
+
+        return dict(
+            result=dict(
+                added=added,
+                updated=updated,
+                records=records,
+                skipped=skipped,
+            ),
+            value=pkey_to_value(zone, options),
+        )
+
+
+@register()
+class dnszone_export(LDAPQuery):
+    __doc__ = _('Export resource records of a DNS zone.')
+
+    msg_summary = _('Exported resource records of zone "%(value)s"')
+
+    has_output = (
+        output.summary,
+        output.Output('result', unicode, _('Zone data')),
+        output.value,
+    )
+
+    takes_options = (
+        StrEnum('format?',
+            label=_('Format'),
+            doc=_('Format of zone data: zonefile (default) or json'),
+            values=(u'zonefile', u'json'),
+            default=u'zonefile',
+            autofill=True,
+        ),
+    )
+
+    def _iter_records(self, zone_dn, zone_entry):
+        """
+        Iterate through ``(name, ttl, rrtype, data)`` records of the zone,
+        zone apex first, then names in DNS order.
+        """
+        ldap = self.obj.backend
+        try:
+            entries = ldap.find_entries(
+                base_dn=zone_dn,
+                scope=ldap.SCOPE_ONELEVEL,
+                filter='(objectclass=idnsrecord)',
+                attrs_list=['idnsname', 'dnsttl'] + _record_attributes,
+                size_limit=0,
+                time_limit=0,
+                paged_search=True,
+            )[0]
+        except errors.EmptyResult:
+            entries = []
+        entries.sort(key=lambda e: e.single_value['idnsname'])
+
+        for entry in [zone_entry] + entries:
+            name = entry.single_value['idnsname']
+            if entry is zone_entry:
+                name = _dns_zone_record
+            ttl = entry.single_value.get('dnsttl')
+            for attr in _record_attributes:
+                for data in entry.get(attr, []):
+                    yield (name, ttl, get_record_rrtype(attr), data)
+
+    def _iter_zonefile(self, zone, zone_entry, records):
+        soa = zone_entry.single_value
+        mname = soa.get('idnssoamname')
+        if mname is None:
+            mname = DNSName(self.api.env.host).make_absolute()
+        yield u'$ORIGIN %s' % zone.ToASCII()
+        yield u'$TTL %s' % soa.get('dnsdefaultttl', soa['idnssoaminimum'])
+        yield u'@ IN SOA %s %s %s %s %s %s %s' % (
+            mname.ToASCII(), soa['idnssoarname'].ToASCII(),
+            soa['idnssoaserial'], soa['idnssoarefresh'],
+            soa['idnssoaretry'], soa['idnssoaexpire'],
+            soa['idnssoaminimum'])
+        for name, ttl, rrtype, data in records:
+            owner = u'@' if name.is_empty() else name.ToASCII()
+            if ttl is None:
+                yield u'%s IN %s %s' % (owner, rrtype, data)
+            else:
+                yield u'%s %s IN %s %s' % (owner, ttl, rrtype, data)
+
+    def _iter_json(self, records):
+        for name, ttl, rrtype, data in records:
+            record = dict(
+                name=u'@' if name.is_empty() else name.ToASCII(),
+                type=rrtype,
+                data=data,
+            )
+            if ttl is not None:
+                record['ttl'] = int(ttl)
+            yield json.dumps(record, sort_keys=True)
+
+    def execute(self, *keys, **options):
+        ldap = self.obj.backend
+        zone = keys[-1]
+
+        zone_dn = self.obj.get_dn(*keys, **options)
+        try:
+            zone_entry = ldap.get_entry(zone_dn, ['*'])
+        except errors.NotFound:
+            self.obj.handle_not_found(*keys)
+        if 'idnszone' not in [oc.lower() for oc in zone_entry['objectclass']]:
+            self.obj.handle_not_found(*keys)
+
+        records = self._iter_records(zone_dn, zone_entry)
+        if options.get('format') == u'json':
+            lines = self._iter_json(records)
+        else:
+            lines = self._iter_zonefile(zone, zone_entry, records)
+
+        return dict(
+            result=u''.join(u'%s\n' % line for line in lines),
+            value=pkey_to_value(zone, options),
+        )
+
+
 @register()
 class dnsrecord(LDAPObject):
     """
@@ -3359,10 +3728,142 @@ class dnsrecord(LDAPObject):
 
         return ldap_rrsets
 
+    def _query_rrset(self, resolver, rdtype, dns_name):
+        """Query DNS server for one RRset.
+
+        :return: tuple (RRset or None, DNS response)
+        """
+        dns_answer = resolver.query(dns_name, rdtype,
+                                    dns.rdataclass.IN,
+                                    raise_on_no_answer=False)
+        dns_rrset = None
+        if rdtype == _NS:
+            # NS records can be in Authority section (sometimes)
+            dns_rrset = dns_answer.response.get_rrset(
+                dns_answer.response.authority, dns_name, _IN, rdtype)
+
+        if not dns_rrset:
+            # Look for NS and other data in Answer section
+            dns_rrset = dns_answer.rrset
+
+        return dns_rrset, dns_answer.response
+
+    def _query_rrsets(self, resolvers, checks, indexes):
+        """Query DNS server for RRsets of given checks concurrently.
+
+        :return: dict {index: (RRset, response) or raised exception}
+        """
+        results = {}
+        lock = threading.Lock()
+        queue = list(indexes)
+
+        def worker():
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    i = queue.pop(0)
+                _ldap_rrset, rdtype, dns_name = checks[i]
+                try:
+                    result = self._query_rrset(resolvers[i], rdtype, dns_name)
+                except Exception as e:
+                    result = e
+                with lock:
+                    results[i] = result
+
+        if len(queue) == 1:
+            worker()
+            return results
+
+        threads = [threading.Thread(target=worker)
+                   for _i in range(min(_DNS_QUERY_WORKERS, len(queue)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def wait_for_rrsets(self, checks):
+        '''Wait until DNS resolver returns up-to-date answers for given RRsets
+            or until the deadline is reached.
+            Deadline in seconds is controlled by self.api.env['wait_for_dns'].
+
+        All pending RRsets are queried concurrently in each round, rounds
+        are separated by exponentially growing periods.
+
+        :param checks:
+            list of tuples (ldap_rrset, rdtype, dns_name), see
+            wait_for_modified_attr
+        :return: list with None for every RRset which matches data in DNS,
+            otherwise with the dns.exception.DNSException raised by the last
+            query or errors.DNSDataMismatch
+        '''
+        # recursion is disabled for NS RR checks, resolvers are not shared
+        # between threads
+        resolvers = []
+        for _check in checks:
+            resolver = dns.resolver.Resolver()
+            resolver.set_flags(0)
+            resolvers.append(resolver)
+
+        start = time.time()
+        timeout = float(self.api.env['wait_for_dns'])
+        deadline = start + timeout
+        period = _DNS_WAIT_MIN_PERIOD
+        attempt = 0
+        results = [None] * len(checks)
+        pending = list(range(len(checks)))
+        wait_template = 'waiting for DNS answer {%s}: got {%s} (attempt %s); '\
+                        'waiting %s seconds before next try'
+        for ldap_rrset, _rdtype, _dns_name in checks:
+            logger.debug('querying DNS server: expecting answer {%s}',
+                         ldap_rrset)
+
+        while pending:
+            attempt += 1
+            log_fn = logger.debug
+            if time.time() - start >= timeout / 2:
+                log_fn = logger.warning
+
+            answers = self._query_rrsets(resolvers, checks, pending)
+            remaining = deadline - time.time()
+            still_pending = []
+            for i in pending:
+                ldap_rrset = checks[i][0]
+                answer = answers[i]
+                if isinstance(answer, Exception):
+                    results[i] = answer
+                    if not isinstance(answer, _DNS_RETRY_ERRORS):
+                        continue
+                    got = type(answer)
+                else:
+                    dns_rrset, response = answer
+                    if dns_rrset == ldap_rrset:
+                        log_fn('DNS answer matches expectations {%s} '
+                               '(attempt %s)', ldap_rrset, attempt)
+                        results[i] = None
+                        continue
+                    results[i] = errors.DNSDataMismatch(expected=ldap_rrset,
+                                                        got=dns_rrset)
+                    got = response
+                still_pending.append(i)
+                if remaining > 0:
+                    log_fn(wait_template, ldap_rrset, got, attempt,
+                           min(period, remaining))
+
+            pending = still_pending
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(period, remaining))
+            period = min(period * 2, _DNS_WAIT_MAX_PERIOD)
+
+        return results
+
     def wait_for_modified_attr(self, ldap_rrset, rdtype, dns_name):
         '''Wait until DNS resolver returns up-to-date answer for given RRset
-            or until the maximum number of attempts is reached.
-            Number of attempts is controlled by self.api.env['wait_for_dns'].
+            or until the deadline is reached.
+            Deadline in seconds is controlled by self.api.env['wait_for_dns'].
 
         :param ldap_rrset:
             None if given rdtype should not exist or
@@ -3373,63 +3874,60 @@ class dnsrecord(LDAPObject):
         :raises errors.DNSDataMismatch: if data in DNS and LDAP doesn't match
         :raises dns.exception.DNSException: if DNS resolution failed
         '''
-        resolver = dns.resolver.Resolver()
-        resolver.set_flags(0)  # disable recursion (for NS RR checks)
-        max_attempts = int(self.api.env['wait_for_dns'])
-        warn_attempts = max_attempts // 2
-        period = 1  # second
-        attempt = 0
-        log_fn = logger.debug
-        log_fn('querying DNS server: expecting answer {%s}', ldap_rrset)
-        wait_template = 'waiting for DNS answer {%s}: got {%s} (attempt %s); '\
-                        'waiting %s seconds before next try'
+        result = self.wait_for_rrsets([(ldap_rrset, rdtype, dns_name)])[0]
+        if result is not None:
+            raise result
 
-        while attempt < max_attempts:
-            if attempt >= warn_attempts:
-                log_fn = logger.warning
-            attempt += 1
-            try:
-                dns_answer = resolver.query(dns_name, rdtype,
-                                            dns.rdataclass.IN,
-                                            raise_on_no_answer=False)
-                dns_rrset = None
-                if rdtype == _NS:
-                    # NS records can be in Authority section (sometimes)
-                    dns_rrset = dns_answer.response.get_rrset(
-                        dns_answer.response.authority, dns_name, _IN, rdtype)
-
-                if not dns_rrset:
-                    # Look for NS and other data in Answer section
-                    dns_rrset = dns_answer.rrset
-
-                if dns_rrset == ldap_rrset:
-                    log_fn('DNS answer matches expectations (attempt %s)',
-                           attempt)
-                    return
-
-                log_msg = wait_template % (ldap_rrset, dns_answer.response,
-                                           attempt, period)
-
-            except (dns.resolver.NXDOMAIN,
-                    dns.resolver.YXDOMAIN,
-                    dns.resolver.NoNameservers,
-                    dns.resolver.Timeout) as e:
-                if attempt >= max_attempts:
-                    raise
-                else:
-                    log_msg = wait_template % (ldap_rrset, type(e), attempt,
-                                               period)
+    def _modified_attrs_checks(self, entry_attrs, dns_name, dns_domain):
+        """Get RRsets to check for given entry.
 
-            log_fn(log_msg)
-            time.sleep(period)
+        :return: tuple (list of checks for wait_for_rrsets, True if the name
+            should not exist)
+        """
+        # represent data in LDAP as dictionary rdtype => rrset
+        ldap_rrsets = self._entry2rrsets(entry_attrs, dns_name, dns_domain)
+        nxdomain = ldap_rrsets is None
+        if nxdomain:
+            # name should not exist => ask for A record and check result
+            ldap_rrsets = {dns.rdatatype.from_text('A'): None}
 
-        # Maximum number of attempts was reached
-        else:
-            raise errors.DNSDataMismatch(expected=ldap_rrset, got=dns_rrset)
+        checks = [(ldap_rrset, rdtype, dns_name)
+                  for rdtype, ldap_rrset in ldap_rrsets.items()]
+        return checks, nxdomain
+
+    def _check_modified_attr_result(self, ldap_rrset, nxdomain, result):
+        """Raise an error if result of wait_for_rrsets is not acceptable."""
+        if result is None:
+            return
+
+        if isinstance(result, dns.resolver.NXDOMAIN):
+            if nxdomain:
+                return
+            e = errors.DNSDataMismatch(expected=ldap_rrset, got="NXDOMAIN")
+            logger.error('%s', e)
+            raise e
+
+        if isinstance(result, dns.resolver.NoNameservers):
+            # Do not raise exception if we have got SERVFAILs.
+            # Maybe the user has created an invalid zone intentionally.
+            logger.warning('waiting for DNS answer {%s}: got {%s}; '
+                           'ignoring', ldap_rrset, type(result))
+            return
+
+        if isinstance(result, dns.exception.DNSException):
+            err_desc = str(type(result))
+            err_str = str(result)
+            if err_str:
+                err_desc += ": %s" % err_str
+            e = errors.DNSDataMismatch(expected=ldap_rrset, got=err_desc)
+            logger.error('%s', e)
+            raise e
+
+        raise result
 
     def wait_for_modified_attrs(self, entry_attrs, dns_name, dns_domain):
         '''Wait until DNS resolver returns up-to-date answer for given entry
-            or until the maximum number of attempts is reached.
+            or until the deadline is reached.
 
         :param entry_attrs:
             None if the entry was deleted from LDAP or
@@ -3438,53 +3936,33 @@ class dnsrecord(LDAPObject):
         :type dns_name: dns.name.Name
         :raises errors.DNSDataMismatch: if data in DNS and LDAP doesn't match
         '''
-
-        # represent data in LDAP as dictionary rdtype => rrset
-        ldap_rrsets = self._entry2rrsets(entry_attrs, dns_name, dns_domain)
-        nxdomain = ldap_rrsets is None
-        if nxdomain:
-            # name should not exist => ask for A record and check result
-            ldap_rrsets = {dns.rdatatype.from_text('A'): None}
-
-        for rdtype, ldap_rrset in ldap_rrsets.items():
-            try:
-                self.wait_for_modified_attr(ldap_rrset, rdtype, dns_name)
-
-            except dns.resolver.NXDOMAIN as e:
-                if nxdomain:
-                    continue
-                else:
-                    e = errors.DNSDataMismatch(expected=ldap_rrset,
-                                               got="NXDOMAIN")
-                    logger.error('%s', e)
-                    raise e
-
-            except dns.resolver.NoNameservers as e:
-                # Do not raise exception if we have got SERVFAILs.
-                # Maybe the user has created an invalid zone intentionally.
-                logger.warning('waiting for DNS answer {%s}: got {%s}; '
-                               'ignoring', ldap_rrset, type(e))
-                continue
-
-            except dns.exception.DNSException as e:
-                err_desc = str(type(e))
-                err_str = str(e)
-                if err_str:
-                    err_desc += ": %s" % err_str
-                e = errors.DNSDataMismatch(expected=ldap_rrset, got=err_desc)
-                logger.error('%s', e)
-                raise e
+        checks, nxdomain = self._modified_attrs_checks(
+            entry_attrs, dns_name, dns_domain)
+        results = self.wait_for_rrsets(checks)
+        for (ldap_rrset, _rdtype, _dns_name), result in zip(checks, results):
+            self._check_modified_attr_result(ldap_rrset, nxdomain, result)
 
     def wait_for_modified_entries(self, entries):
-        '''Call wait_for_modified_attrs for all entries in given dict.
+        '''Wait for all entries in given dict like wait_for_modified_attrs.
+
+        RRsets of all entries are checked at once.
 
         :param entries:
             Dict {(dns_domain, dns_name): entry_for_wait_for_modified_attrs}
         '''
+        checks = []
+        nxdomains = []
         for entry_name, entry in entries.items():
             dns_domain = entry_name[0]
             dns_name = entry_name[1].derelativize(dns_domain)
-            self.wait_for_modified_attrs(entry, dns_name, dns_domain)
+            entry_checks, nxdomain = self._modified_attrs_checks(
+                entry, dns_name, dns_domain)
+            checks.extend(entry_checks)
+            nxdomains.extend([nxdomain] * len(entry_checks))
+
+        results = self.wait_for_rrsets(checks)
+        for check, nxdomain, result in zip(checks, nxdomains, results):
+            self._check_modified_attr_result(check[0], nxdomain, result)
 
     def warning_if_ns_change_cause_fwzone_ineffective(self, result, *keys,
                                                       **options):
@@ -246,6 +246,7 @@ import logging
 from lxml import etree
 import time
 import contextlib
+import threading
 
 import six
 
@@ -256,6 +257,7 @@ from ipapython import dogtag, ipautil, certdb
 
 if api.env.in_server:
     import pki
+    import pki.account
     from pki.client import PKIConnection
     import pki.crypto as cryptoutil
     from pki.kra import KRAClient
@@ -265,6 +267,9 @@ if six.PY3:
 
 logger = logging.getLogger(__name__)
 
+# KRA sessions are reused for this long, well below the Dogtag session timeout
+KRA_SESSION_LIFETIME = 300  # seconds
+
 # These are general status return values used when
 # CMSServlet.outputError() is invoked.
 CMS_SUCCESS      = 0
@@ -1980,6 +1985,7 @@ class kra(Backend):
     def __init__(self, api, kra_port=443):
 
         self.kra_port = kra_port
+        self._session = threading.local()
 
         super(kra, self).__init__(api)
 
@@ -2003,12 +2009,9 @@ class kra(Backend):
         else:
             return api.env.ca_host
 
-    @contextlib.contextmanager
-    def get_client(self):
+    def _create_client(self):
         """
-        Returns an authenticated KRA client to access KRA services.
-
-        Raises a generic exception if KRA is not enabled.
+        Returns a KRA client and the temporary NSS database it uses.
         """
 
         if not self.api.Command.kra_is_enabled()['result']:
@@ -2035,11 +2038,79 @@ class kra(Backend):
         # connection.set_authentication_cert(paths.RA_AGENT_PEM,
         #                                    paths.RA_AGENT_KEY)
 
+        return KRAClient(connection, crypto), tempdb
+
+    @contextlib.contextmanager
+    def get_client(self):
+        """
+        Returns an authenticated KRA client to access KRA services.
+
+        Raises a generic exception if KRA is not enabled.
+        """
+
+        kra_client, tempdb = self._create_client()
         try:
-            yield KRAClient(connection, crypto)
+            yield kra_client
         finally:
             tempdb.close()
 
+    @contextlib.contextmanager
+    def get_session(self):
+        """
+        Returns a KRA client logged in to KRA.
+
+        The client and its session are kept and reused by the following
+        requests handled by the same thread, until the session is older than
+        KRA_SESSION_LIFETIME or an unexpected error occurs while it is used.
+
+        Raises a generic exception if KRA is not enabled.
+        """
+
+        session = self._session
+        if (getattr(session, 'client', None) is not None and
+                time.time() - session.started > KRA_SESSION_LIFETIME):
+            self.close_session()
+
+        if getattr(session, 'client', None) is None:
+            kra_client, tempdb = self._create_client()
+            try:
+                account = pki.account.AccountClient(kra_client.connection)
+                account.login()
+            except Exception:
+                tempdb.close()
+                raise
+            session.client = kra_client
+            session.account = account
+            session.tempdb = tempdb
+            session.started = time.time()
+
+        try:
+            yield session.client
+        except errors.PublicError:
+            raise
+        except Exception:
+            self.close_session()
+            raise
+
+    def close_session(self):
+        """
+        Logs out of the KRA session kept by the current thread, if any.
+        """
+
+        session = self._session
+        if getattr(session, 'client', None) is None:
+            return
+
+        try:
+            session.account.logout()
+        except Exception as e:
+            logger.debug("Failed to log out of KRA session: %s", e)
+        finally:
+            session.tempdb.close()
+            session.client = None
+            session.account = None
+            session.tempdb = None
+
 
 @register()
 class ra_certprofile(RestClient):
@@ -26,6 +26,7 @@ from ipalib.constants import PATTERN_GROUPUSER_NAME
 from ipalib.plugable import Registry
 from .baseldap import (
     add_external_post_callback,
+    get_effective_rights_multi,
     pkey_to_value,
     remove_external_post_callback,
     LDAPObject,
@@ -660,15 +661,20 @@ class group_detach(LDAPQuery):
             user_attrs = ldap.get_entry(user_dn)
         except errors.NotFound:
             self.obj.handle_not_found(*keys)
+        group_attrs = ldap.get_entry(group_dn)
+
+        user_rights, group_rights = get_effective_rights_multi(
+            ldap, [user_dn, group_dn],
+            ['objectclass', 'mepmanagedentry', 'mepmanagedby'])
+
         is_managed = self.obj.has_objectclass(user_attrs['objectclass'], 'mepmanagedentry')
-        if (not ldap.can_write(user_dn, "objectclass") or
-            not (ldap.can_write(user_dn, "mepManagedEntry")) and is_managed):
+        if ('w' not in user_rights.get('objectclass', '') or
+            'w' not in user_rights.get('mepmanagedentry', '') and is_managed):
             raise errors.ACIError(info=_('not allowed to modify user entries'))
 
-        group_attrs = ldap.get_entry(group_dn)
         is_managed = self.obj.has_objectclass(group_attrs['objectclass'], 'mepmanagedby')
-        if (not ldap.can_write(group_dn, "objectclass") or
-            not (ldap.can_write(group_dn, "mepManagedBy")) and is_managed):
+        if ('w' not in group_rights.get('objectclass', '') or
+            'w' not in group_rights.get('mepmanagedby', '') and is_managed):
             raise errors.ACIError(info=_('not allowed to modify group entries'))
 
         objectclasses = user_attrs['objectclass']
@@ -592,6 +592,43 @@ class host(LDAPObject):
                 pass
         return dn
 
+    def get_dns_if_exist(self, keys):
+        # get_dn() looks up every host, look hosts up by FQDN and then by
+        # short name in bulk instead
+        ldap = self.backend
+        base_dn = DN(self.container_dn, self.api.env.basedn)
+        oc_filter = ldap.make_filter_from_attr(
+            'objectclass', self.object_class, rules=ldap.MATCH_ALL)
+
+        dns = {}
+        failed = []
+        missing = list(keys)
+        for attr in ('fqdn', 'serverhostname'):
+            if not missing:
+                break
+            found = {}
+            entries = self._search_chunks(
+                base_dn, ldap.SCOPE_SUBTREE, oc_filter, attr, missing, [attr])
+            for entry in entries:
+                for value in entry.get(attr, []):
+                    found.setdefault(value.lower(), []).append(entry.dn)
+
+            not_found = []
+            for key in missing:
+                host_dns = found.get(key.lower(), [])
+                if len(host_dns) == 1:
+                    dns[key] = host_dns[0]
+                elif host_dns:
+                    failed.append(
+                        (key, errors.SingleMatchExpected(found=len(host_dns))))
+                else:
+                    not_found.append(key)
+            missing = not_found
+
+        failed.extend(
+            (key, errors.NotFound(reason=u'no such entry')) for key in missing)
+        return (dns, failed)
+
     def get_managed_hosts(self, dn):
         host_filter = 'managedBy=%s' % dn
         host_attrs = ['fqdn']
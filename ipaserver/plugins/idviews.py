@@ -269,18 +269,21 @@ class idview_show(LDAPRetrieve):
             'objectClass': 'ipaHost',
         }
 
+        hosts = ldap.iter_entries(
+            api.env.container_host + api.env.basedn,
+            scope=ldap.SCOPE_ONELEVEL,
+            filter=ldap.make_filter(filter_params, rules=ldap.MATCH_ALL),
+            attrs_list=['cn'])
+
+        applied_to = []
         try:
-            hosts, _truncated = ldap.find_entries(
-                filter=ldap.make_filter(filter_params, rules=ldap.MATCH_ALL),
-                attrs_list=['cn'],
-                base_dn=api.env.container_host + api.env.basedn,
-                scope=ldap.SCOPE_ONELEVEL,
-                paged_search=True)
-
-            entry_attrs['appliedtohosts'] = [host.single_value['cn']
-                                             for host in hosts]
-        except errors.NotFound:
+            for host in hosts:
+                applied_to.append(host.single_value['cn'])
+        except errors.LimitsExceeded:
+            # the list of hosts is informative, show the hosts found
             pass
+        if applied_to:
+            entry_attrs['appliedtohosts'] = applied_to
 
     def post_callback(self, ldap, dn, entry_attrs, *keys, **options):
         self.show_id_overrides(dn, entry_attrs)
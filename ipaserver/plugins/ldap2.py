@@ -290,19 +290,43 @@ class ldap2(CrudBackend, LDAPClient):
 
         assert isinstance(dn, DN)
 
+        entry = self.get_effective_rights_multi([dn], attrs_list)[0]
+        if entry is None:
+            raise errors.NotFound(reason='no such entry')
+        return entry
+
+    def get_effective_rights_multi(self, dns, attrs_list):
+        """Returns the rights the currently bound user has for given DNs.
+
+           The rights are retrieved with pipelined searches. Returns a list of
+           entries in the order of dns, None for entries which don't exist.
+        """
+        for dn in dns:
+            assert isinstance(dn, DN)
+
+        if not dns:
+            return []
+
         bind_dn = self.conn.whoami_s()[4:]
 
+        # resolve the limits before the control is set, they may need to read
+        # the IPA configuration
+        time_limit = self.time_limit
+        size_limit = self.size_limit
         sctrl = [
             GetEffectiveRightsControl(
                 True, "dn: {0}".format(bind_dn).encode('utf-8'))
         ]
         self.conn.set_option(_ldap.OPT_SERVER_CONTROLS, sctrl)
         try:
-            entry = self.get_entry(dn, attrs_list)
+            results = self.get_entries_multi(
+                [(dn, self.SCOPE_BASE, None, attrs_list) for dn in dns],
+                time_limit=time_limit, size_limit=size_limit)
         finally:
             # remove the control so subsequent operations don't include GER
             self.conn.set_option(_ldap.OPT_SERVER_CONTROLS, [])
-        return entry
+
+        return [found[0] if found else None for found in results]
 
     def can_write(self, dn, attr):
         """Returns True/False if the currently bound user has write permissions
@@ -393,13 +417,15 @@ class ldap2(CrudBackend, LDAPClient):
             new_pass = self.encode(new_pass)
             self.conn.passwd_s(str(dn), old_pass, new_pass)
 
-    def add_entry_to_group(self, dn, group_dn, member_attr='member', allow_same=False):
+    def add_entry_to_group(self, dn, group_dn, member_attr='member',
+                           allow_same=False, check_exists=True):
         """
         Add entry designaed by dn to group group_dn in the member attribute
         member_attr.
 
         Adding a group as a member of itself is not allowed unless allow_same
-        is True.
+        is True. The entry is read to check it exists unless check_exists is
+        False, when the caller already found dn in the directory.
         """
 
         assert isinstance(dn, DN)
@@ -410,8 +436,9 @@ class ldap2(CrudBackend, LDAPClient):
             dn, group_dn, member_attr)
 
         # check if the entry exists
-        entry = self.get_entry(dn, [''])
-        dn = entry.dn
+        if check_exists:
+            entry = self.get_entry(dn, [''])
+            dn = entry.dn
 
         # check if we're not trying to add group into itself
         if dn == group_dn and not allow_same:
@@ -429,6 +456,27 @@ class ldap2(CrudBackend, LDAPClient):
         except errors.DatabaseError:
             raise errors.AlreadyGroupMember()
 
+    def add_entries_to_group(self, values, group_dn, member_attr='member'):
+        """
+        Add values to the member_attr attribute of group group_dn with one
+        modification, without reading the group or the members.
+
+        :raises: errors.AlreadyGroupMember if any of the values is already
+                 present, no value is added then
+        """
+        assert isinstance(group_dn, DN)
+
+        logger.debug(
+            "add_entries_to_group: %d values group_dn=%s member_attr=%s",
+            len(values), group_dn, member_attr)
+
+        modlist = [(_ldap.MOD_ADD, member_attr, self.encode(list(values)))]
+        with self.error_handler():
+            try:
+                self.conn.modify_s(str(group_dn), modlist)
+            except _ldap.TYPE_OR_VALUE_EXISTS:
+                raise errors.AlreadyGroupMember()
+
     def remove_entry_from_group(self, dn, group_dn, member_attr='member'):
         """Remove entry from group."""
 
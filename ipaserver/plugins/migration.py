@@ -35,6 +35,7 @@ from ipapython.ipaldap import LDAPClient
 from ipapython.ipautil import write_tmp_file
 from ipapython.kerberos import Principal
 import datetime
+import itertools
 from ipaplatform.paths import paths
 
 if six.PY3:
@@ -713,6 +714,23 @@ migration process might be incomplete\n''')
             else:
                 options[name] = tuple()
 
+    def _iter_ds_entries(self, ds_ldap, ldap_obj, search_filter, search_base,
+                         scope):
+        """
+        Iterate through the objects to be migrated as they are received from
+        DS. Truncated search results are logged.
+        """
+        try:
+            for entry_attrs in ds_ldap.iter_entries(
+                    search_base, scope, search_filter, ['*'],
+                    time_limit=0, size_limit=-1):
+                yield entry_attrs
+        except errors.LimitsExceeded:
+            logger.error(
+                '%s: %s',
+                ldap_obj.name, self.truncated_err_msg
+            )
+
     def _get_search_bases(self, options, ds_base_dn, migrate_order):
         search_bases = dict()
         for ldap_obj_name in migrate_order:
@@ -753,12 +771,16 @@ migration process might be incomplete\n''')
             migrated[ldap_obj_name] = []
             failed[ldap_obj_name] = {}
 
+            # the entries are migrated as they are received, so that all of
+            # them are not held in memory
+            entries = self._iter_ds_entries(
+                ds_ldap, ldap_obj, search_filter,
+                search_bases[ldap_obj_name], scope)
             try:
-                entries, truncated = ds_ldap.find_entries(
-                    search_filter, ['*'], search_bases[ldap_obj_name],
-                    scope,
-                    time_limit=0, size_limit=-1
-                )
+                first_entry = next(entries, None)
+                if first_entry is None:
+                    raise errors.NotFound(reason=u'no matching entry found')
+                entries = itertools.chain([first_entry], entries)
             except errors.NotFound:
                 if not options.get('continue',False):
                     raise errors.NotFound(
@@ -770,13 +792,7 @@ migration process might be incomplete\n''')
                                     'objectclass': ', '.join(oc_list)}
                     )
                 else:
-                    truncated = False
                     entries = []
-            if truncated:
-                logger.error(
-                    '%s: %s',
-                    ldap_obj.name, self.truncated_err_msg
-                )
 
             blacklists = {}
             for blacklist in ('oc_blacklist', 'attr_blacklist'):
@@ -17,6 +17,8 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import collections
+
 from ipalib import api, errors
 from ipalib import Str
 from ipalib.plugable import Registry
@@ -140,6 +142,23 @@ class sudocmd(LDAPObject):
                 pass
         return dn
 
+    def get_dns_if_exist(self, keys):
+        # commands are looked up without trailing dot, like in get_dn()
+        lookup_keys = collections.OrderedDict(
+            (key, key[:-1] if key.endswith('.') else key) for key in keys)
+        (found, not_found) = super(sudocmd, self).get_dns_if_exist(
+            list(collections.OrderedDict.fromkeys(lookup_keys.values())))
+        not_found = dict(not_found)
+
+        dns = {}
+        failed = []
+        for key, lookup_key in lookup_keys.items():
+            if lookup_key in found:
+                dns[key] = found[lookup_key]
+            else:
+                failed.append((key, not_found[lookup_key]))
+        return (dns, failed)
+
 
 @register()
 class sudocmd_add(LDAPCreate):
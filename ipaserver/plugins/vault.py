@@ -21,7 +21,7 @@ import six
 
 from ipalib.frontend import Command, Object
 from ipalib import api, errors
-from ipalib import Bytes, Flag, Str, StrEnum
+from ipalib import Bytes, Flag, Int, Str, StrEnum
 from ipalib import output
 from ipalib.crud import PKQuery, Retrieve
 from ipalib.parameters import Principal
@@ -36,7 +36,6 @@ from ipapython import kerberos
 from ipapython.dn import DN
 
 if api.env.in_server:
-    import pki.account
     import pki.key
     # pylint: disable=no-member
     try:
@@ -528,7 +527,8 @@ class vault(LDAPObject):
             'ipapermright': {'read', 'search', 'compare'},
             'ipapermdefaultattr': {
                 'objectclass', 'cn', 'description', 'ipavaulttype',
-                'ipavaultsalt', 'ipavaultpublickey', 'owner', 'member',
+                'ipavaultsalt', 'ipavaultpublickey', 'ipavaultgeneration',
+                'ipavaultpendinggeneration', 'owner', 'member',
                 'memberuser', 'memberhost',
             },
             'default_privileges': {'Vault Administrators'},
@@ -551,7 +551,8 @@ class vault(LDAPObject):
             'ipapermright': {'write'},
             'ipapermdefaultattr': {
                 'objectclass', 'cn', 'description', 'ipavaulttype',
-                'ipavaultsalt', 'ipavaultpublickey',
+                'ipavaultsalt', 'ipavaultpublickey', 'ipavaultgeneration',
+                'ipavaultpendinggeneration',
             },
             'default_privileges': {'Vault Administrators'},
         },
@@ -732,9 +733,13 @@ class vault(LDAPObject):
         for entry in entries:
             self.backend.add_entry(entry)
 
-    def get_key_id(self, dn):
+    def get_key_id(self, dn, chunk=0, generation=None):
         """
         Generates a client key ID to archive/retrieve data in KRA.
+
+        The header of multi-part vault data is stored under the vault ID,
+        the parts under the vault ID suffixed with the generation of the
+        data and the part index.
         """
 
         # TODO: create container_dn after object initialization then reuse it
@@ -750,8 +755,61 @@ class vault(LDAPObject):
             name = rdn['cn']
             id = u'/' + name + id
 
+        if chunk:
+            id += u'#%s#%d' % (generation, chunk)
+
         return 'ipa:' + id
 
+    def deactivate_key(self, kra_client, dn, chunk=0, generation=None):
+        """
+        Deactivates a vault record in KRA.
+
+        :return: True if an active record was deactivated
+        """
+        response = kra_client.keys.list_keys(
+            self.get_key_id(dn, chunk, generation),
+            pki.key.KeyClient.KEY_STATUS_ACTIVE)
+
+        for key_info in response.key_infos:
+            kra_client.keys.modify_key_status(
+                key_info.get_key_id(),
+                pki.key.KeyClient.KEY_STATUS_INACTIVE)
+
+        return bool(response.key_infos)
+
+    def deactivate_parts(self, kra_client, dn, generation):
+        """
+        Deactivates the records of all parts of a generation of multi-part
+        vault data in KRA.
+        """
+        chunk = 1
+        while self.deactivate_key(kra_client, dn, chunk, generation):
+            chunk += 1
+
+    def get_generations(self, dn):
+        """
+        Returns the generations of multi-part vault data recorded in the
+        vault entry: the one referenced by the archived header and the one
+        being archived, None if there is none.
+        """
+        entry = self.backend.get_entry(
+            dn, ['ipavaultgeneration', 'ipavaultpendinggeneration'])
+        return (entry.single_value.get('ipavaultgeneration'),
+                entry.single_value.get('ipavaultpendinggeneration'))
+
+    def set_generations(self, dn, generation, pending_generation):
+        """
+        Records the generations of multi-part vault data in the vault entry.
+        """
+        entry = self.backend.get_entry(
+            dn, ['ipavaultgeneration', 'ipavaultpendinggeneration'])
+        entry['ipavaultgeneration'] = generation
+        entry['ipavaultpendinggeneration'] = pending_generation
+        try:
+            self.backend.update_entry(entry)
+        except errors.EmptyModlist:
+            pass
+
     def get_container_attribute(self, entry, options):
         if options.get('raw', False):
             return
@@ -819,27 +877,28 @@ class vault_del(LDAPDelete):
             raise errors.InvocationError(
                 format=_('KRA service is not enabled'))
 
+        # the generations of multi-part data are gone with the entry
+        generations = getattr(context, 'vault_generations', {})
+        try:
+            generations[dn] = self.obj.get_generations(dn)
+        except errors.NotFound:
+            pass
+        setattr(context, 'vault_generations', generations)
+
         return dn
 
     def post_callback(self, ldap, dn, *args, **options):
         assert isinstance(dn, DN)
 
-        with self.api.Backend.kra.get_client() as kra_client:
-            kra_account = pki.account.AccountClient(kra_client.connection)
-            kra_account.login()
-
-            client_key_id = self.obj.get_key_id(dn)
-
-            # deactivate vault record in KRA
-            response = kra_client.keys.list_keys(
-                client_key_id, pki.key.KeyClient.KEY_STATUS_ACTIVE)
-
-            for key_info in response.key_infos:
-                kra_client.keys.modify_key_status(
-                    key_info.get_key_id(),
-                    pki.key.KeyClient.KEY_STATUS_INACTIVE)
+        generations = getattr(context, 'vault_generations', {}).pop(
+            dn, (None, None))
 
-            kra_account.logout()
+        with self.api.Backend.kra.get_session() as kra_client:
+            # deactivate vault records in KRA
+            self.obj.deactivate_key(kra_client, dn)
+            for generation in generations:
+                if generation:
+                    self.obj.deactivate_parts(kra_client, dn, generation)
 
         return True
 
@@ -1025,6 +1084,15 @@ class vault_archive_internal(PKQuery):
             'nonce',
             doc=_('Nonce'),
         ),
+        Int(
+            'chunk?',
+            minvalue=0,
+            doc=_('Index of the part of multi-part vault data'),
+        ),
+        Str(
+            'generation?',
+            doc=_('Generation of the parts of multi-part vault data'),
+        ),
     )
 
     has_output = output.standard_entry
@@ -1040,26 +1108,46 @@ class vault_archive_internal(PKQuery):
         wrapped_vault_data = options.pop('vault_data')
         nonce = options.pop('nonce')
         wrapped_session_key = options.pop('session_key')
+        chunk = options.pop('chunk', None) or 0
+        generation = options.pop('generation', None)
+
+        if chunk and not generation:
+            raise errors.RequirementError(name='generation')
 
         # retrieve vault info
         vault = self.api.Command.vault_show(*args, **options)['result']
 
+        # parts of multi-part data are archived under a new generation
+        # before the header referencing them, the archived data stay intact
+        # until the header is replaced; the generations are recorded in the
+        # vault entry, the server never reads the archived data
+        old_generation, pending_generation = self.obj.get_generations(
+            vault['dn'])
+        interrupted_generation = None
+        if chunk == 1:
+            # a new archive of multi-part data supersedes an interrupted one
+            if pending_generation != generation:
+                interrupted_generation = pending_generation
+                self.obj.set_generations(
+                    vault['dn'], old_generation, generation)
+        elif generation and pending_generation != generation:
+            raise errors.ValidationError(
+                name='generation',
+                error=_('archiving of the vault data was superseded by '
+                        'another archive'))
+
         # connect to KRA
-        with self.api.Backend.kra.get_client() as kra_client:
-            kra_account = pki.account.AccountClient(kra_client.connection)
-            kra_account.login()
+        with self.api.Backend.kra.get_session() as kra_client:
+            client_key_id = self.obj.get_key_id(
+                vault['dn'], chunk, generation)
 
-            client_key_id = self.obj.get_key_id(vault['dn'])
+            if interrupted_generation:
+                self.obj.deactivate_parts(kra_client, vault['dn'],
+                                          interrupted_generation)
 
             # deactivate existing vault record in KRA
-            response = kra_client.keys.list_keys(
-                client_key_id,
-                pki.key.KeyClient.KEY_STATUS_ACTIVE)
-
-            for key_info in response.key_infos:
-                kra_client.keys.modify_key_status(
-                    key_info.get_key_id(),
-                    pki.key.KeyClient.KEY_STATUS_INACTIVE)
+            self.obj.deactivate_key(kra_client, vault['dn'], chunk,
+                                    generation)
 
             # forward wrapped data to KRA
             kra_client.keys.archive_encrypted_data(
@@ -1071,7 +1159,17 @@ class vault_archive_internal(PKQuery):
                 nonce_iv=nonce,
             )
 
-            kra_account.logout()
+            if not chunk:
+                # the header references the new generation now
+                if generation:
+                    pending_generation = None
+                self.obj.set_generations(
+                    vault['dn'], generation, pending_generation)
+
+                # deactivate the parts the replaced header referenced
+                if old_generation and old_generation != generation:
+                    self.obj.deactivate_parts(kra_client, vault['dn'],
+                                              old_generation)
 
         response = {
             'value': args[-1],
@@ -1093,6 +1191,15 @@ class vault_retrieve_internal(PKQuery):
             'session_key',
             doc=_('Session key wrapped with transport certificate'),
         ),
+        Int(
+            'chunk?',
+            minvalue=0,
+            doc=_('Index of the part of multi-part vault data'),
+        ),
+        Str(
+            'generation?',
+            doc=_('Generation of the parts of multi-part vault data'),
+        ),
     )
 
     has_output = output.standard_entry
@@ -1106,16 +1213,19 @@ class vault_retrieve_internal(PKQuery):
                 format=_('KRA service is not enabled'))
 
         wrapped_session_key = options.pop('session_key')
+        chunk = options.pop('chunk', None) or 0
+        generation = options.pop('generation', None)
+
+        if chunk and not generation:
+            raise errors.RequirementError(name='generation')
 
         # retrieve vault info
         vault = self.api.Command.vault_show(*args, **options)['result']
 
         # connect to KRA
-        with self.api.Backend.kra.get_client() as kra_client:
-            kra_account = pki.account.AccountClient(kra_client.connection)
-            kra_account.login()
-
-            client_key_id = self.obj.get_key_id(vault['dn'])
+        with self.api.Backend.kra.get_session() as kra_client:
+            client_key_id = self.obj.get_key_id(
+                vault['dn'], chunk, generation)
 
             # find vault record in KRA
             response = kra_client.keys.list_keys(
@@ -1132,8 +1242,6 @@ class vault_retrieve_internal(PKQuery):
                 key_info.get_key_id(),
                 wrapped_session_key)
 
-            kra_account.logout()
-
         response = {
             'value': args[-1],
             'result': {
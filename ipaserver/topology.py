@@ -6,8 +6,6 @@
 set of functions and classes useful for management of domain level 1 topology
 """
 
-from copy import deepcopy
-
 from ipalib import _
 from ipapython.graph import Graph
 
@@ -51,20 +49,29 @@ def create_topology_graph(masters, segments):
     return graph
 
 
-def get_topology_connection_errors(graph):
+def get_topology_connection_errors(graph, exclude=()):
     """
-    Traverse graph from each master and find out which masters are not
-    reachable.
+    Find out which masters are not reachable from each master.
+
+    The graph is split to strongly connected components first, so the check
+    of a connected topology is linear in the size of the graph and the sets
+    of reachable masters are computed once per component.
 
     :param graph: topology graph where vertices are masters
+    :param exclude: masters to consider removed from the topology
     :returns: list of errors, error is: (master, visited, not_visited)
     """
+    components = graph.strongly_connected_components(exclude)
+    if len(components) <= 1:
+        return []
+
+    vertices = graph.vertices.difference(exclude)
+    reachable = graph.reachability(components)
+
     connect_errors = []
-    master_cns = list(graph.vertices)
-    master_cns.sort()
-    for m in master_cns:
-        visited = graph.bfs(m)
-        not_visited = graph.vertices - visited
+    for m in sorted(vertices):
+        visited = reachable[m]
+        not_visited = vertices - visited
         if not_visited:
             connect_errors.append((m, list(visited), list(not_visited)))
     return connect_errors
@@ -149,24 +156,46 @@ class TopologyConnectivity(object):
         return errors_by_suffix
 
     def errors_after_master_removal(self, master_cn):
-        graphs_before = deepcopy(self.graphs)
-
-        for s in self.graphs:
-            try:
-                self.graphs[s].remove_vertex(master_cn)
-            except ValueError:
-                pass
-
-        errors_after_removal = self.errors
-
-        self.graphs = graphs_before
+        errors_after_removal = {}
+        for suffix in self.graphs:
+            errors_after_removal[suffix] = get_topology_connection_errors(
+                self.graphs[suffix], exclude=(master_cn,)
+            )
 
         return errors_after_removal
 
+    def errors_after_masters_removal(self, master_cns):
+        """
+        Evaluate removal of each of the candidate masters separately
+
+        :param master_cns: iterable of master names
+        :returns: dict mapping each master name to the errors by suffix
+                  which its removal would cause
+        """
+        return {
+            master_cn: self.errors_after_master_removal(master_cn)
+            for master_cn in master_cns
+        }
+
+    def safely_removable_masters(self):
+        """
+        Get masters whose removal leaves all topology suffixes connected
+        """
+        candidates = set()
+        for graph in self.graphs.values():
+            candidates.update(graph.vertices)
+
+        return sorted(
+            master_cn for master_cn in candidates
+            if all(graph.is_strongly_connected(exclude=(master_cn,))
+                   for graph in self.graphs.values())
+        )
+
     def check_current_state(self):
         err_msg = ""
-        for suffix in self.errors:
-            errors = self.errors[suffix]
+        errors_by_suffix = self.errors
+        for suffix in errors_by_suffix:
+            errors = errors_by_suffix[suffix]
             if errors:
                 err_msg = "\n".join([
                     err_msg,
@@ -1,4 +1,5 @@
 import contextlib
+import json
 import os
 import shlex
 import subprocess
@@ -311,6 +312,48 @@ class TestCLIParsing(object):
             mockldap.del_entry(adtrust_dn)
 
 
+@pytest.mark.tier1
+class TestCLIStream(object):
+    """Tests that commands read from a stream are executed in order
+    """
+    def run_stream(self, lines, batch_size=2):
+        if not api.Backend.rpcclient.isconnected():
+            api.Backend.rpcclient.connect()
+        out = StringIO()
+        try:
+            failed = api.Backend.cli.run_stream(
+                StringIO(lines), out, batch_size=batch_size)
+        except errors.NetworkError:
+            raise nose.SkipTest('%r: Server not available: %r' %
+                                (self.__module__, api.env.xmlrpc_uri))
+        return failed, [json.loads(l) for l in out.getvalue().splitlines()]
+
+    def test_stream(self):
+        failed, records = self.run_stream(
+            u'ping\n'
+            u'# comment\n'
+            u'\n'
+            u'ping\n'
+            u'no-such-command\n'
+            u'ping\n'
+        )
+        assert failed == 1
+        assert [r['line'] for r in records] == [1, 4, 5, 6]
+        assert [r['command'] for r in records] == [
+            u'ping', u'ping', u'no-such-command', u'ping']
+        assert 'summary' in records[0]['result']
+        assert records[2]['error']['name'] == u'CommandError'
+
+    def test_stream_batch_error(self):
+        failed, records = self.run_stream(
+            u'user-show no-such-user\n'
+            u'ping\n'
+        )
+        assert failed == 1
+        assert records[0]['error']['name'] == u'NotFound'
+        assert 'result' in records[1]
+
+
 def test_cli_fsencoding():
     # https://pagure.io/freeipa/issue/5887
     env = {
@@ -135,6 +135,25 @@ class test_update(unittest.TestCase):
         self.assertEqual(entry.single_value['cn'], 'Test User')
 
 
+    def test_1_dry_run(self):
+        """
+        Test the updater does not apply changes in dry run (test_1_dry_run)
+        """
+        updater = LDAPUpdate(dm_password=self.dm_password, sub_dict={},
+                             dry_run=True)
+        modified = updater.update([os.path.join(self.testdir,
+                                                "2_update.update")])
+        self.assertTrue(modified)
+        self.assertEqual(len(updater.plan), 1)
+        action, dn, _changes = updater.plan[0]
+        self.assertEqual(action, 'modify')
+        self.assertEqual(dn, self.user_dn)
+
+        entries = self.ld.get_entries(
+            self.user_dn, self.ld.SCOPE_BASE, 'objectclass=*', ['*'])
+        self.assertEqual(len(entries), 1)
+        self.assertNotIn('gecos', entries[0])
+
     def test_2_update(self):
         """
         Test the updater when adding an attribute to an existing entry (test_2_update)
@@ -0,0 +1,144 @@
+#
+# Copyright (C) 2026  FreeIPA Contributors see COPYING for license
+#
+
+import threading
+import time
+
+import pytest
+
+from ipaclient.install import ipadiscovery
+
+REALM = u'EXAMPLE.TEST'
+DOMAIN = u'example.test'
+
+
+class FakeLDAPServers(object):
+    """Stub of ipacheckldap() answering per server after a delay"""
+    def __init__(self):
+        self.results = {}
+        self.delays = {}
+        self.released = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def add(self, server, result, delay=0):
+        """Add a server, which answers never if delay is None"""
+        self.results[server] = result
+        self.delays[server] = delay
+
+    def ipacheckldap(self, thost, trealm, ca_cert_path=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            delay = self.delays[thost]
+            if delay is None:
+                self.released.wait()
+            else:
+                time.sleep(delay)
+        finally:
+            with self.lock:
+                self.running -= 1
+        return list(self.results[thost])
+
+
+@pytest.fixture
+def ldap_servers(monkeypatch):
+    fake = FakeLDAPServers()
+
+    def ipacheckldap(discovery, *args, **kwargs):
+        return fake.ipacheckldap(*args, **kwargs)
+
+    def ipadns_search_srv(discovery, domain, srv_record_name, default_port,
+                          break_on_first=True):
+        # servers in order of preference
+        return sorted(fake.results)
+
+    monkeypatch.setattr(ipadiscovery.IPADiscovery, 'ipacheckldap',
+                        ipacheckldap)
+    monkeypatch.setattr(ipadiscovery.IPADiscovery, 'ipadns_search_srv',
+                        ipadns_search_srv)
+    monkeypatch.setattr(ipadiscovery.IPADiscovery, 'ipadnssearchkrbkdc',
+                        lambda discovery, domain=None: [])
+    yield fake
+    fake.released.set()
+
+
+@pytest.mark.tier0
+class TestProbeServers(object):
+    def test_preferred_server_in_time(self, ldap_servers, monkeypatch):
+        monkeypatch.setattr(ipadiscovery, 'PREFERRED_SERVER_WAIT', 5)
+        ldap_servers.add('a.example.test', [0, 'a.example.test', REALM],
+                         delay=0.2)
+        ldap_servers.add('b.example.test', [0, 'b.example.test', REALM])
+        ldap_servers.add('c.example.test', [0, 'c.example.test', REALM],
+                         delay=None)
+
+        ds = ipadiscovery.IPADiscovery()
+        start = time.time()
+        assert ds.search(domain=DOMAIN, realm=REALM) == 0
+        assert time.time() - start < 5
+
+        # the server answering never is not waited for
+        assert ds.server == 'a.example.test'
+        assert ds.servers == ['a.example.test']
+
+    def test_preferred_server_too_late(self, ldap_servers, monkeypatch):
+        monkeypatch.setattr(ipadiscovery, 'PREFERRED_SERVER_WAIT', 0.1)
+        ldap_servers.add('a.example.test', [0, 'a.example.test', REALM],
+                         delay=None)
+        ldap_servers.add('b.example.test', [0, 'b.example.test', REALM])
+
+        ds = ipadiscovery.IPADiscovery()
+        assert ds.search(domain=DOMAIN, realm=REALM) == 0
+        assert ds.server == 'b.example.test'
+        assert ds.servers == ['b.example.test']
+
+    def test_order_kept(self, ldap_servers):
+        servers = ['a.example.test', 'b.example.test', 'c.example.test',
+                   'd.example.test']
+        # the servers answer in reverse order
+        ldap_servers.add(servers[0], [0, servers[0], REALM], delay=0.3)
+        ldap_servers.add(servers[1], [ipadiscovery.NOT_IPA_SERVER],
+                         delay=0.2)
+        ldap_servers.add(servers[2], [ipadiscovery.NO_ACCESS_TO_LDAP],
+                         delay=0.1)
+        ldap_servers.add(servers[3], [0, servers[3], REALM])
+
+        ds = ipadiscovery.IPADiscovery()
+        assert ds.search(domain=DOMAIN, servers=servers, realm=REALM) == 0
+        assert ds.servers == [servers[0], servers[2], servers[3]]
+        assert ds.server == servers[0]
+
+    def test_first_given_server_used(self, ldap_servers):
+        servers = ['a.example.test', 'b.example.test']
+        ldap_servers.add(servers[0], [ipadiscovery.NO_LDAP_SERVER])
+        ldap_servers.add(servers[1], [0, servers[1], REALM])
+
+        ds = ipadiscovery.IPADiscovery()
+        assert ds.search(domain=DOMAIN, servers=servers, realm=REALM) == 0
+        assert ds.servers == [servers[1]]
+        assert ds.server == servers[0]
+
+    def test_checks_bounded(self, ldap_servers):
+        servers = ['%02d.example.test' % i
+                   for i in range(ipadiscovery.PROBE_THREADS * 3)]
+        for server in servers:
+            ldap_servers.add(server, [0, server, REALM], delay=0.05)
+
+        ds = ipadiscovery.IPADiscovery()
+        assert ds.search(domain=DOMAIN, servers=servers, realm=REALM) == 0
+        assert ds.servers == servers
+        assert ldap_servers.max_running == ipadiscovery.PROBE_THREADS
+
+    def test_other_realm_rejected(self, ldap_servers):
+        servers = ['a.example.test', 'b.example.test']
+        ldap_servers.add(servers[0], [0, servers[0], u'OTHER.TEST'])
+        ldap_servers.add(servers[1], [0, servers[1], REALM], delay=0.1)
+
+        ds = ipadiscovery.IPADiscovery()
+        assert ds.search(domain=DOMAIN, servers=servers, realm=REALM) == 0
+        assert ds.servers == [servers[1]]
+        assert ds.realm == REALM
@@ -21,6 +21,11 @@
 Test the `ipalib.cli` module.
 """
 
+import csv
+import json
+
+from six import StringIO
+
 from ipatests.util import raises, ClassChecker
 from ipalib import cli, plugable
 
@@ -53,6 +58,36 @@ class test_textui(ClassChecker):
         assert o.max_col_width(rows, col=1) == 4
         assert o.max_col_width(rows, col=2) == 6
 
+    def test_write_entries(self):
+        """
+        Test the `ipalib.cli.textui.write_entries` method.
+        """
+        o = self.cls('the api instance')
+        entries = [
+            dict(uid=[u'admin'], memberof_group=[u'admins', u'trust admins']),
+            dict(uid=[u'tuser'], usercertificate=[b'\x00\x01']),
+        ]
+
+        out = StringIO()
+        o.write_entries(entries, 'jsonl', out)
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0])['memberof_group'] == [
+            u'admins', u'trust admins']
+        assert json.loads(lines[1])['usercertificate'] == [
+            {u'__base64__': u'AAE='}]
+
+        out = StringIO()
+        o.write_entries(entries, 'csv', out)
+        rows = list(csv.reader(StringIO(out.getvalue())))
+        assert sorted(rows[0]) == [
+            'memberof_group', 'uid', 'usercertificate']
+        row = dict(zip(rows[0], rows[1]))
+        assert row['memberof_group'] == 'admins\ntrust admins'
+        assert row['usercertificate'] == ''
+        row = dict(zip(rows[0], rows[2]))
+        assert row['usercertificate'] == 'AAE='
+
 
 def test_to_cli():
     """
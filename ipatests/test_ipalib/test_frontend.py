@@ -791,6 +791,48 @@ class test_Command(ClassChecker):
             'nested', 'Subclass', 'world', 4, dict, tuple, nope
         )
 
+    def test_validate_output_entries(self):
+        """
+        Test `ipalib.frontend.Command.validate_output` entry validation
+        modes in production mode.
+        """
+        def create(mode):
+            class api(object):
+                env = config.Env(context='cli',
+                                 validate_output_entries=mode)
+
+                @staticmethod
+                def is_production_mode():
+                    return True
+
+            class example(self.cls):
+                has_output = (output.ListOfEntries('result'),)
+            inst = example(api)
+            inst.finalize()
+            return inst
+
+        okay = dict(foo='bar')
+        nope = ('aye', 'bee')
+        wrong = dict(result=[okay] * 1000 + [nope] + [okay] * 1000)
+
+        e = raises(TypeError, create('all').validate_output, wrong)
+        assert str(e) == output.emsg % (
+            'example', 'ListOfEntries', 'result', 1000, dict, tuple, nope
+        )
+
+        # only a sample including the last entry is validated
+        inst = create('sample')
+        assert inst.validate_output(wrong) is None
+        wrong['result'].append(nope)
+        e = raises(TypeError, inst.validate_output, wrong)
+        assert str(e) == output.emsg % (
+            'example', 'ListOfEntries', 'result', 2001, dict, tuple, nope
+        )
+
+        assert create('none').validate_output(wrong) is None
+        raises(TypeError, create('none').validate_output,
+               dict(result=nope[0]))
+
     def test_get_output_params(self):
         """
         Test the `ipalib.frontend.Command.get_output_params` method.
@@ -1047,6 +1047,51 @@ class test_Str(ClassChecker):
             assert dummy.called() is True
             dummy.reset()
 
+    def test_convert_multivalue(self):
+        """
+        Test the `ipalib.parameters.Str.convert` method with multivalues.
+        """
+        o = self.cls('my_str', multivalue=True)
+        values = tuple(u'value%d' % i for i in range(100))
+        assert o.convert(list(values)) == values
+        assert o.convert(values + (u'', None)) == values
+        assert o.convert(values + (42,)) == values + (u'42',)
+        e = raises(errors.ConversionError, o.convert, values + (b'Hello',))
+        assert_equal(unicode(e.error), u'must be Unicode text')
+
+        o = parameters.IA5Str('my_str', multivalue=True)
+        e = raises(errors.ConversionError, o.convert, values + (unicode_str,))
+        assert e.name == 'my_str'
+
+    def test_validate_multivalue(self):
+        """
+        Test the `ipalib.parameters.Str.validate` method with multivalues.
+        """
+        o = self.cls('my_str', multivalue=True, minlength=2, maxlength=6,
+                     pattern='^[a-z0-9 ]+$')
+        values = tuple(u'val%d' % i for i in range(100))
+        assert o.validate(values) is None
+
+        # The error is the one of the first value which does not pass
+        for bad, error in ((u'a', u'must be at least 2 characters'),
+                           (u'abcdefg', u'can be at most 6 characters'),
+                           (u'ab ', u'Leading and trailing spaces are not '
+                                    u'allowed'),
+                           (u'ABC', u'must match pattern "^[a-z0-9 ]+$"')):
+            e = raises(errors.ValidationError, o.validate,
+                       values[:50] + (bad, u'X') + values[50:])
+            assert e.name == 'my_str'
+            assert unicode(e.error) == error
+
+        e = raises(TypeError, o.validate, values + (42,))
+        assert str(e) == TYPE_ERROR % ('my_str', unicode, 42, int)
+
+        fail = DummyRule(u'no good')
+        o = self.cls('my_str', fail, multivalue=True, maxlength=4)
+        e = raises(errors.ValidationError, o.validate, (u'abc', u'abcde'))
+        assert e.error == u'no good'
+        assert fail.calls == [(text.ugettext, u'abc')]
+
 
 class test_Password(ClassChecker):
     """
@@ -24,7 +24,10 @@ Test the `ipalib.plugable` module.
 # FIXME: Pylint errors
 # pylint: disable=no-member
 
+import importlib
+import json
 import os
+import sys
 import textwrap
 
 from ipalib import plugable, errors, create_api
@@ -307,3 +310,59 @@ class test_API(ClassChecker):
                 os.environ['IPA_CONFDIR'] = ipa_confdir
             else:
                 os.environ.pop('IPA_CONFDIR')
+
+    def test_plugin_manifest(self):
+        """
+        Test adding plugins from a plugin manifest.
+        """
+        api, home = create_test_api()
+        package_dir = home.join('manifest_test', 'plugins')
+        os.makedirs(package_dir)
+        for dirname in (home.join('manifest_test'), package_dir):
+            with open(os.path.join(dirname, '__init__.py'), 'w') as f:
+                f.write('')
+        with open(os.path.join(package_dir, 'example.py'), 'w') as f:
+            f.write(textwrap.dedent("""
+                from ipalib import Command, Registry
+                register = Registry()
+
+                @register()
+                class example_command(Command):
+                    def execute(self, **options):
+                        return dict(result=True)
+                """))
+        manifest = home.join('manifest.json')
+        sys.path.insert(0, home.path)
+        try:
+            package = importlib.import_module('manifest_test.plugins')
+            api.bootstrap(plugins_on_demand=True, plugin_manifest=manifest)
+            with open(manifest, 'w') as f:
+                json.dump(dict(
+                    context=api.env.context,
+                    packages={
+                        package.__name__: api.get_plugin_manifest(package),
+                    },
+                ), f)
+            del sys.modules['manifest_test.plugins.example']
+
+            api.add_package(package)
+            assert 'manifest_test.plugins.example' not in sys.modules
+            api.finalize()
+            cmd = api.Command.example_command
+            assert 'manifest_test.plugins.example' in sys.modules
+            assert cmd.name == 'example_command'
+            assert type(cmd).__module__ == 'manifest_test.plugins.example'
+
+            # a changed module makes the manifest stale
+            with open(os.path.join(package_dir, 'example.py'), 'a') as f:
+                f.write('\n')
+            api, _home = create_test_api()
+            api.bootstrap(plugins_on_demand=True, plugin_manifest=manifest)
+            assert api._load_plugin_manifest(
+                package.__name__, package_dir,
+                ['manifest_test.plugins.example']) is None
+        finally:
+            sys.path.remove(home.path)
+            for name in list(sys.modules):
+                if name.startswith('manifest_test'):
+                    del sys.modules[name]
@@ -0,0 +1,88 @@
+#
+# Copyright (C) 2026  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipapython/graph.py` module.
+"""
+
+import pytest
+
+from ipapython.graph import Graph
+
+pytestmark = pytest.mark.tier0
+
+
+def make_graph(vertices, edges):
+    graph = Graph()
+    for v in vertices:
+        graph.add_vertex(v)
+    for tail, head in edges:
+        graph.add_edge(tail, head)
+    return graph
+
+
+def both(*pairs):
+    edges = []
+    for tail, head in pairs:
+        edges.extend([(tail, head), (head, tail)])
+    return edges
+
+
+class TestGraph(object):
+    def test_scc_connected(self):
+        graph = make_graph('abc', both(('a', 'b'), ('b', 'c')))
+        assert graph.strongly_connected_components() == [
+            frozenset('abc')]
+        assert graph.is_strongly_connected()
+
+    def test_scc_order(self):
+        # a <-> b -> c <-> d
+        graph = make_graph('abcd', both(('a', 'b'), ('c', 'd')) +
+                           [('b', 'c')])
+        components = graph.strongly_connected_components()
+        assert set(components) == {frozenset('ab'), frozenset('cd')}
+        # sink component is listed first
+        assert components.index(frozenset('cd')) < components.index(
+            frozenset('ab'))
+        assert not graph.is_strongly_connected()
+
+    def test_scc_exclude(self):
+        # star topology with 'b' in the middle
+        graph = make_graph('abcd', both(('a', 'b'), ('b', 'c'), ('b', 'd')))
+        assert graph.is_strongly_connected()
+        assert not graph.is_strongly_connected(exclude=['b'])
+        assert graph.is_strongly_connected(exclude=['a'])
+        assert set(graph.strongly_connected_components(exclude=['b'])) == {
+            frozenset('a'), frozenset('c'), frozenset('d')}
+
+    def test_reachability(self):
+        # a <-> b -> c <-> d, e isolated
+        graph = make_graph('abcde', both(('a', 'b'), ('c', 'd')) +
+                           [('b', 'c')])
+        reachable = graph.reachability()
+        assert reachable['a'] == frozenset('abcd')
+        assert reachable['b'] == frozenset('abcd')
+        assert reachable['c'] == frozenset('cd')
+        assert reachable['e'] == frozenset('e')
+
+        reachable = graph.reachability(exclude=['c'])
+        assert 'c' not in reachable
+        assert reachable['a'] == frozenset('ab')
+        assert reachable['d'] == frozenset('d')
+
+    def test_reachability_matches_bfs(self):
+        vertices = ['v%d' % i for i in range(40)]
+        edges = [(vertices[i], vertices[(i * 7 + 3) % 40]) for i in range(40)]
+        edges += [(vertices[i], vertices[(i + 1) % 40])
+                  for i in range(0, 40, 3)]
+        graph = make_graph(vertices, edges)
+        reachable = graph.reachability()
+        for v in graph.vertices:
+            assert reachable[v] == graph.bfs(v)
+
+    def test_long_chain(self):
+        # deep graphs must not hit the recursion limit
+        n = 5000
+        graph = make_graph(range(n), both(*[(i, i + 1) for i in range(n - 1)]))
+        assert graph.is_strongly_connected()
+        assert not graph.is_strongly_connected(exclude=[n // 2])
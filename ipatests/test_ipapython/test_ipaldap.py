@@ -0,0 +1,93 @@
+#
+# Copyright (C) 2026  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipapython.ipaldap` module.
+"""
+
+import ldap
+import pytest
+
+from ipapython import ipaldap
+from ipapython.dn import DN
+
+pytestmark = pytest.mark.tier0
+
+
+def test_parse_add():
+    records = ipaldap.parse_ldif_changes(
+        "# comment\n"
+        "dn: cn=test,cn=plugins,\n"
+        " cn=config\n"
+        "changetype: add\n"
+        "objectclass: top\n"
+        "objectclass: nsSlapdPlugin\n"
+        "cn: test\n"
+        "description:: dGVzdA==\n"
+    )
+    assert len(records) == 1
+    dn, changetype, changes = records[0]
+    assert dn == DN('cn=test,cn=plugins,cn=config')
+    assert changetype == 'add'
+    assert dict(changes) == {
+        'objectclass': [b'top', b'nsSlapdPlugin'],
+        'cn': [b'test'],
+        'description': [b'test'],
+    }
+
+
+def test_parse_modify():
+    records = ipaldap.parse_ldif_changes(
+        "dn: cn=config\n"
+        "changetype: modify\n"
+        "replace: nsslapd-sizelimit\n"
+        "nsslapd-sizelimit: 100\n"
+        "-\n"
+        "delete: nsslapd-timelimit\n"
+        "-\n"
+        "add: aci\n"
+        "aci: one\n"
+        "aci: two\n"
+        "\n"
+        "dn: cn=old,cn=config\n"
+        "changetype: modrdn\n"
+        "newrdn: cn=new\n"
+        "deleteoldrdn: 1\n"
+        "\n"
+        "dn: cn=new,cn=config\n"
+        "changetype: delete\n"
+    )
+    assert records == [
+        (DN('cn=config'), 'modify', [
+            (ldap.MOD_REPLACE, 'nsslapd-sizelimit', [b'100']),
+            (ldap.MOD_DELETE, 'nsslapd-timelimit', None),
+            (ldap.MOD_ADD, 'aci', [b'one', b'two']),
+        ]),
+        (DN('cn=old,cn=config'), 'modrdn',
+         dict(newrdn='cn=new', deleteoldrdn=True, newsuperior=None)),
+        (DN('cn=new,cn=config'), 'delete', None),
+    ]
+
+
+def test_parse_without_changetype():
+    records = ipaldap.parse_ldif_changes(
+        "dn: cn=config\n"
+        "nsslapd-sizelimit: 100\n"
+    )
+    assert records == [
+        (DN('cn=config'), 'modify', [
+            (ldap.MOD_REPLACE, 'nsslapd-sizelimit', [b'100']),
+        ]),
+    ]
+
+
+@pytest.mark.parametrize('data', [
+    "cn: test\n",
+    "dn: cn=config\nchangetype: rename\n",
+    "dn: cn=config\nchangetype: modify\nreplace: cn\nsn: test\n",
+    "dn: cn=config\nchangetype: delete\ncn: test\n",
+    "dn: cn=config\ncn:< file:///etc/passwd\n",
+])
+def test_parse_invalid(data):
+    with pytest.raises(ValueError):
+        ipaldap.parse_ldif_changes(data)
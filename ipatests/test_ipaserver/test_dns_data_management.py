@@ -0,0 +1,171 @@
+#
+# Copyright (C) 2026  FreeIPA Contributors see COPYING for license
+#
+"""
+Test the `ipaserver/dns_data_management.py` module.
+"""
+import pytest
+
+from ipapython.dn import DN
+from ipapython.dnsutil import DNSName
+from ipaserver.dns_data_management import (
+    CNAME_TEMPLATE_ATTR,
+    IPA_DEFAULT_MASTER_SRV_REC,
+    IPASystemRecords,
+)
+
+DOMAIN = u'example.test'
+REALM = u'EXAMPLE.TEST'
+SERVER = u'master.example.test'
+
+
+class FakeEntry(dict):
+    def __init__(self, dn, **attrs):
+        super(FakeEntry, self).__init__(attrs)
+        self.dn = dn
+
+    @property
+    def single_value(self):
+        return {attr: values[0] for attr, values in self.items()}
+
+
+class FakeLDAP(object):
+    SCOPE_ONELEVEL = 1
+
+    def __init__(self):
+        self.entries = []
+        self.searches = 0
+        self.added = []
+        self.updated = []
+
+    def find_entries(self, base_dn, scope, filter, attrs_list, size_limit,
+                     time_limit, paged_search):
+        self.searches += 1
+        return [e for e in self.entries if e.dn[1:] == base_dn], False
+
+    def make_entry(self, dn, **attrs):
+        return FakeEntry(dn, **attrs)
+
+    def add_entry(self, entry):
+        self.added.append(entry)
+
+    def update_entry(self, entry):
+        self.updated.append(entry)
+
+
+class FakeCommands(object):
+    def server_find(self, **options):
+        return {'result': [{
+            'cn': [SERVER],
+            'ipaserviceweight': [u'100'],
+            'enabled_role_servrole': [],
+        }]}
+
+    def location_find(self, **options):
+        return {'result': []}
+
+    def dnszone_show(self, *keys, **options):
+        return {'result': {}}
+
+
+class FakeDNSZone(object):
+    def get_dn(self, name):
+        return DN(('idnsname', name.ToASCII()), ('cn', 'dns'),
+                  ('dc', 'example'), ('dc', 'test'))
+
+
+class FakeDNSRecord(object):
+    object_class = ['top', 'idnsrecord']
+
+
+class FakeNamespace(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+@pytest.fixture
+def ldap():
+    return FakeLDAP()
+
+
+@pytest.fixture
+def system_records(ldap):
+    api = FakeNamespace(
+        env=FakeNamespace(domain=DOMAIN, realm=REALM),
+        Command=FakeCommands(),
+        Backend=FakeNamespace(ldap2=ldap),
+        Object=FakeNamespace(dnszone=FakeDNSZone(),
+                             dnsrecord=FakeDNSRecord()),
+    )
+    system_records = IPASystemRecords(api)
+
+    # the zone contains up to date records
+    zone_dn = FakeDNSZone().get_dn(DNSName(DOMAIN).make_absolute())
+    ldap.entries.append(FakeEntry(
+        DN(('idnsname', '_kerberos'), zone_dn),
+        objectclass=[u'top', u'idnsrecord'],
+        idnsname=[DNSName(u'_kerberos')],
+        txtrecord=[REALM],
+    ))
+    for name, port in IPA_DEFAULT_MASTER_SRV_REC:
+        ldap.entries.append(FakeEntry(
+            DN(('idnsname', name.ToASCII()), zone_dn),
+            objectclass=[u'top', u'idnsrecord', u'idnsTemplateObject'],
+            idnsname=[name],
+            srvrecord=[u'0 100 %d %s.' % (port, SERVER)],
+            **{CNAME_TEMPLATE_ATTR: [cname_template(name)]}
+        ))
+
+    return system_records
+
+
+def cname_template(name):
+    return u'%s.\\{substitutionvariable_ipalocation\\}._locations' % name
+
+
+def get_entry(ldap, name):
+    for entry in ldap.entries:
+        if entry['idnsname'][0] == DNSName(name):
+            return entry
+    raise KeyError(name)
+
+
+@pytest.mark.tier0
+class TestUpdateDNSRecords(object):
+    def test_unchanged(self, ldap, system_records):
+        base, locations = system_records.update_dns_records()
+
+        assert ldap.searches == 1
+        assert ldap.added == []
+        assert ldap.updated == []
+        assert len(base[0]) == len(IPA_DEFAULT_MASTER_SRV_REC) + 1
+        assert base[1] == []
+        assert locations == ([], [])
+
+    def test_changed_srv_records(self, ldap, system_records):
+        entry = get_entry(ldap, u'_ldap._tcp')
+        entry['srvrecord'] = [u'0 100 389 %s.' % SERVER,
+                              u'0 100 389 replica.example.test.']
+
+        system_records.update_dns_records()
+
+        assert ldap.added == []
+        assert ldap.updated == [entry]
+        assert entry['srvrecord'] == [u'0 100 389 %s.' % SERVER]
+
+    def test_missing_name(self, ldap, system_records):
+        entry = get_entry(ldap, u'_kpasswd._udp')
+        ldap.entries.remove(entry)
+
+        system_records.update_dns_records()
+
+        assert ldap.updated == []
+        assert len(ldap.added) == 1
+        added = ldap.added[0]
+        assert added.dn == entry.dn
+        assert added['idnsname'] == [DNSName(u'_kpasswd._udp')]
+        assert added['objectclass'] == [
+            'top', 'idnsrecord', u'idnsTemplateObject']
+        assert added['srvrecord'] == [u'0 100 464 %s.' % SERVER]
+        assert added[CNAME_TEMPLATE_ATTR] == [
+            cname_template(DNSName(u'_kpasswd._udp'))]
@@ -0,0 +1,146 @@
+#
+# Copyright (C) 2026  FreeIPA Contributors see COPYING for license
+#
+
+"""
+Tests for waiting for DNS propagation in `ipaserver.plugins.dns`.
+"""
+
+import threading
+
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import pytest
+
+from ipalib import errors
+from ipalib.config import Env
+from ipaserver.plugins import dns as dns_plugin
+
+WAIT_FOR_DNS = 10  # seconds
+DOMAIN = dns.name.from_text(u'example.test.')
+WWW = dns.name.from_text(u'www.example.test.')
+MAIL = dns.name.from_text(u'mail.example.test.')
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeAnswer(object):
+    def __init__(self, rrset):
+        self.rrset = rrset
+        self.response = 'response with %s' % rrset
+
+
+class FakeDNS(object):
+    """Answers queries with results for the given name and round"""
+    def __init__(self):
+        self.answers = {}
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def a_rrset(self, name, *addresses):
+        return dns.rrset.from_text(name, 86400, dns.rdataclass.IN,
+                                   dns.rdatatype.A, *addresses)
+
+    def query(self, resolver, qname, rdtype, rdclass=dns.rdataclass.IN,
+              raise_on_no_answer=True):
+        with self.lock:
+            answer_round = len([q for q in self.queries if q == qname])
+            self.queries.append(qname)
+        answers = self.answers[qname]
+        answer = answers[min(answer_round, len(answers) - 1)]
+        if isinstance(answer, Exception):
+            raise answer
+        return FakeAnswer(answer)
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(dns_plugin.time, 'time', fake.time)
+    monkeypatch.setattr(dns_plugin.time, 'sleep', fake.sleep)
+    return fake
+
+
+@pytest.fixture
+def fake_dns(monkeypatch):
+    fake = FakeDNS()
+
+    def query(resolver, *args, **kwargs):
+        return fake.query(resolver, *args, **kwargs)
+
+    monkeypatch.setattr(dns.resolver.Resolver, 'query', query)
+    return fake
+
+
+@pytest.fixture
+def dnsrecord():
+    class api(object):
+        env = Env(wait_for_dns=WAIT_FOR_DNS)
+
+    return dns_plugin.dnsrecord(api)
+
+
+@pytest.mark.tier0
+class TestWaitForRRsets(object):
+    def test_match_later_round(self, dnsrecord, fake_time, fake_dns):
+        fake_dns.answers[WWW] = [
+            fake_dns.a_rrset(WWW, '192.0.2.1'),
+            dns.resolver.NXDOMAIN(),
+            fake_dns.a_rrset(WWW, '192.0.2.2'),
+        ]
+        fake_dns.answers[MAIL] = [fake_dns.a_rrset(MAIL, '192.0.2.3')]
+
+        dnsrecord.wait_for_modified_entries({
+            (DOMAIN, dns.name.from_text(u'www', None)):
+                {'arecord': [u'192.0.2.2']},
+            (DOMAIN, dns.name.from_text(u'mail', None)):
+                {'arecord': [u'192.0.2.3']},
+        })
+
+        # the matching name is not queried again
+        assert fake_dns.queries.count(WWW) == 3
+        assert fake_dns.queries.count(MAIL) == 1
+        assert fake_time.sleeps == [dns_plugin._DNS_WAIT_MIN_PERIOD,
+                                    dns_plugin._DNS_WAIT_MIN_PERIOD * 2]
+
+    def test_nxdomain_deleted_name(self, dnsrecord, fake_time, fake_dns):
+        fake_dns.answers[WWW] = [dns.resolver.NXDOMAIN()]
+
+        dnsrecord.wait_for_modified_attrs(None, WWW, DOMAIN)
+
+    def test_nxdomain_existing_name(self, dnsrecord, fake_time, fake_dns):
+        fake_dns.answers[WWW] = [dns.resolver.NXDOMAIN()]
+
+        with pytest.raises(errors.DNSDataMismatch):
+            dnsrecord.wait_for_modified_attrs(
+                {'arecord': [u'192.0.2.1']}, WWW, DOMAIN)
+
+    def test_no_nameservers_ignored(self, dnsrecord, fake_time, fake_dns):
+        fake_dns.answers[WWW] = [dns.resolver.NoNameservers()]
+
+        dnsrecord.wait_for_modified_attrs(
+            {'arecord': [u'192.0.2.1']}, WWW, DOMAIN)
+
+    def test_mismatch_after_deadline(self, dnsrecord, fake_time, fake_dns):
+        fake_dns.answers[WWW] = [fake_dns.a_rrset(WWW, '192.0.2.1')]
+
+        with pytest.raises(errors.DNSDataMismatch):
+            dnsrecord.wait_for_modified_attrs(
+                {'arecord': [u'192.0.2.2']}, WWW, DOMAIN)
+
+        assert fake_time.now == pytest.approx(WAIT_FOR_DNS)
+        assert max(fake_time.sleeps) <= dns_plugin._DNS_WAIT_MAX_PERIOD
@@ -4,8 +4,12 @@
 """
 Test the `ipaserver/dnssec` package.
 """
+import os
+
 import dns.name
 
+from ipaplatform.paths import paths
+from ipaserver.dnssec.bindmgr import BINDMgr
 from ipaserver.dnssec.odsmgr import ODSZoneListReader
 
 
@@ -39,3 +43,61 @@ def test_ods_zonelist_reader():
     assert reader.mapping == {uuid: name}
     assert reader.names == {name}
     assert reader.uuids == {uuid}
+
+
+class FakeBINDMgr(BINDMgr):
+    def __init__(self):
+        super(FakeBINDMgr, self).__init__(api=None)
+        self.installed = []
+        self.notified = []
+
+    def dn2zone_name(self, dn):
+        return dns.name.from_text(dn.split(',')[-1].split('=')[1])
+
+    def get_zone_dir_name(self, zone):
+        return zone.to_text(omit_final_dot=True)
+
+    def install_key(self, zone, uuid, attrs, workdir):
+        self.installed.append(uuid)
+        basename = 'K%s+008+%s' % (zone.to_text(), attrs['tag'][0])
+        for suffix in ('.key', '.private', '.uuid', '.dn'):
+            with open(os.path.join(workdir, basename + suffix), 'w'):
+                pass
+        return basename
+
+    def notify_zone(self, zone):
+        self.notified.append(zone)
+
+
+def test_bindmgr_incremental_sync(tmpdir, monkeypatch):
+    monkeypatch.setattr(paths, 'BIND_LDAP_DNS_ZONE_WORKDIR', str(tmpdir))
+    monkeypatch.setattr(paths, 'DNSSEC_TOKENS_DIR', str(tmpdir.join('t')))
+    zone = dns.name.from_text('ipa.example.')
+    keys_dir = tmpdir.join('ipa.example', 'keys')
+
+    def key(tag):
+        return {'dn': 'cn=%s,idnsname=ipa.example.' % tag, 'tag': [tag]}
+
+    mgr = FakeBINDMgr()
+    mgr.ldap_event('add', 'uuid1', key('1'))
+    mgr.ldap_event('add', 'uuid2', key('2'))
+    mgr.sync({zone})
+    assert sorted(mgr.installed) == ['uuid1', 'uuid2']
+    assert mgr.notified == [zone]
+    assert len(keys_dir.listdir()) == 8
+
+    # nothing changed
+    mgr.ldap_event('mod', 'uuid1', key('1'))
+    mgr.sync({zone})
+    assert len(mgr.installed) == 2
+    assert mgr.notified == [zone]
+
+    # only the new and the removed keys are processed
+    mgr.ldap_event('add', 'uuid3', key('3'))
+    mgr.ldap_event('del', 'uuid1', key('1'))
+    mgr.sync({zone})
+    assert mgr.installed[2:] == ['uuid3']
+    assert mgr.notified == [zone, zone]
+    assert sorted(f.basename for f in keys_dir.listdir()
+                  if f.ext == '.key') == [
+        'Kipa.example.+008+2.key', 'Kipa.example.+008+3.key']
@@ -0,0 +1,70 @@
+#
+# Copyright (C) 2026  FreeIPA Contributors see COPYING for license
+#
+
+"""
+Tests for the `ipaserver.install.replication` module.
+"""
+
+import pytest
+
+from ipaserver.install import replication
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(replication.time, 'time', fake.time)
+    monkeypatch.setattr(replication.time, 'sleep', fake.sleep)
+    return fake
+
+
+@pytest.mark.tier0
+class TestPollUntil(object):
+    def test_done_immediately(self, fake_time):
+        assert replication.poll_until(lambda: (True, 'x')) == (True, 'x')
+        assert fake_time.sleeps == []
+
+    def test_backoff(self, fake_time):
+        calls = []
+
+        def check():
+            calls.append(None)
+            return len(calls) == 6, None
+
+        assert replication.poll_until(check) == (True, None)
+        assert fake_time.sleeps == sorted(fake_time.sleeps)
+        assert fake_time.sleeps[0] == replication.POLL_INTERVAL_MIN
+        assert fake_time.sleeps[-1] > replication.POLL_INTERVAL_MIN
+        assert max(fake_time.sleeps) <= replication.POLL_INTERVAL_MAX
+
+    def test_progress_resets_interval(self, fake_time):
+        states = [1, 1, 1, 1, 2, 2]
+
+        def check():
+            state = states.pop(0)
+            return not states, state
+
+        replication.poll_until(check)
+        assert fake_time.sleeps[3] > replication.POLL_INTERVAL_MIN
+        assert fake_time.sleeps[4] == replication.POLL_INTERVAL_MIN
+
+    def test_timeout(self, fake_time):
+        done, state = replication.poll_until(lambda: (False, 'waiting'),
+                                             timeout=30)
+        assert not done
+        assert state == 'waiting'
+        assert fake_time.now == pytest.approx(30)
@@ -36,3 +36,49 @@ def test_format_seconds():
     assert service.format_seconds(62) == '1 minute 2 seconds'
     assert service.format_seconds(120) == '2 minutes'
     assert service.format_seconds(125) == '2 minutes 5 seconds'
+
+
+class _Output(object):
+    def __init__(self):
+        self.lines = []
+
+    def write(self, data):
+        if data != "\n":
+            self.lines.append(data)
+
+    def flush(self):
+        pass
+
+
+@pytest.fixture
+def svc():
+    svc = service.Service('test', sstore=object(), fstore=object())
+    svc.output_fd = _Output()
+    return svc
+
+
+@pytest.mark.tier0
+class TestStartCreation(object):
+    def test_sequential(self, svc):
+        calls = []
+        svc.step("first", lambda: calls.append(1))
+        svc.step("second", lambda: calls.append(2))
+        svc.start_creation()
+        assert calls == [1, 2]
+        assert "  [2/2]: second" in svc.output_fd.lines
+        assert svc.steps == []
+
+    def test_cleanup_after_failure(self, svc):
+        calls = []
+
+        def fail():
+            raise RuntimeError("failed")
+
+        svc.step("first", fail)
+        svc.step("skipped", lambda: calls.append('skipped'))
+        svc.step("cleanup", lambda: calls.append('cleanup'),
+                 run_after_failure=True)
+        with pytest.raises(RuntimeError):
+            svc.start_creation()
+        assert calls == ['cleanup']
+        assert "  [cleanup]: cleanup" in svc.output_fd.lines
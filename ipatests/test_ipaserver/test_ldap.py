@@ -133,6 +133,70 @@ class test_ldap(object):
         cert = entry_attrs.get('usercertificate')[0]
         assert cert.serial_number is not None
 
+    def test_iter_entries(self):
+        """
+        Test iterating over search results page by page and stopping early
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        entries = self.conn.get_entries(
+            api.env.basedn, self.conn.SCOPE_ONELEVEL, attrs_list=[''])
+        iterated = list(self.conn.iter_entries(
+            api.env.basedn, self.conn.SCOPE_ONELEVEL, attrs_list=[''],
+            size_limit=2))
+        assert sorted(e.dn for e in iterated) == sorted(e.dn for e in entries)
+
+        result = self.conn.iter_entries(
+            api.env.basedn, self.conn.SCOPE_ONELEVEL, attrs_list=[''],
+            size_limit=2)
+        assert next(result).dn in set(e.dn for e in entries)
+        result.close()
+
+        # stopped in a later page, the paged search is cancelled
+        result = self.conn.iter_entries(
+            api.env.basedn, self.conn.SCOPE_ONELEVEL, attrs_list=[''],
+            size_limit=2)
+        assert len([next(result), next(result)]) == 2
+        result.close()
+
+        # the connection is usable after the search has been abandoned
+        entry_attrs = self.conn.get_entry(api.env.basedn, ['associateddomain'])
+        assert entry_attrs.single_value['associateddomain'] == api.env.domain
+
+    def test_get_entries_multi(self):
+        """
+        Test pipelined searches return results in order of the searches
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        missing_dn = DN(('cn', 'does not exist'), api.env.basedn)
+        searches = [
+            (self.dn, self.conn.SCOPE_BASE, None, ['krbprincipalname']),
+            (missing_dn, self.conn.SCOPE_BASE, None, ['']),
+            (api.env.basedn, self.conn.SCOPE_BASE, None, ['associateddomain']),
+        ]
+        results = self.conn.get_entries_multi(searches, window=2)
+        assert [[e.dn for e in entries] for entries in results] == [
+            [self.dn], [], [api.env.basedn]]
+        assert (results[2][0].single_value['associateddomain'] ==
+                api.env.domain)
+
+    def test_get_effective_rights_multi(self):
+        """
+        Test retrieving effective rights of multiple entries
+        """
+        self.conn = ldap2(api)
+        self.conn.connect(autobind=AUTOBIND_DISABLED)
+        missing_dn = DN(('cn', 'does not exist'), api.env.basedn)
+        rights = self.conn.get_effective_rights_multi(
+            [self.dn, missing_dn], ['usercertificate'])
+        assert len(rights) == 2
+        assert 'attributelevelrights' in rights[0]
+        assert rights[1] is None
+
+        with pytest.raises(errors.NotFound):
+            self.conn.get_effective_rights(missing_dn, ['usercertificate'])
+
 
 @pytest.mark.tier0
 class test_LDAPEntry(object):
@@ -131,6 +131,32 @@ class test_otptoken_import(object):
                 'type': u'hotp',
             })]
 
+    def test_save(self, tmpdir):
+        doc = PSKCDocument(os.path.join(basename, "pskc-figure6.xml"))
+        doc.setKey(codecs.decode('12345678901234567890123456789012', 'hex'))
+        # key packages are processed while the document is iterated
+        keypkgs = [(t, t.options) for t in doc.getKeyPackages()]
+        assert [t.index for (t, _options) in keypkgs] == [0]
+
+        # key packages which were not removed are kept with the header
+        dest = str(tmpdir.join("kept.xml"))
+        doc.save(dest)
+        saved = PSKCDocument(dest)
+        assert saved.keyname == 'Pre-shared-key'
+        saved.setKey(codecs.decode('12345678901234567890123456789012', 'hex'))
+        assert [(t.id, t.options) for t in saved.getKeyPackages()] == \
+            [(u'12345678', keypkgs[0][1])]
+
+        keypkgs[0][0].remove()
+        dest = str(tmpdir.join("removed.xml"))
+        doc.save(dest)
+        try:
+            PSKCDocument(dest)
+        except ValueError: # No key packages left.
+            pass
+        else:
+            assert False
+
     def test_valid_tokens(self):
         assert convertHashName('sha1') == u'sha1'
         assert convertHashName('hmac-sha1') == u'sha1'
@@ -268,6 +268,38 @@ class TestAutomemberRebuildHostMembership(XMLRPC_test):
         hostgroup1.remove_member(dict(host=host1.fqdn))
         hostgroup1.retrieve()
 
+    def test_rebuild_membership_dry_run_and_rules(self, automember_hostgroup,
+                                                  hostgroup1, host1):
+        """ Show membership which would be added by the rule, then add it
+        without running a task. Check the host has been added only once. """
+        command = automember_hostgroup.make_rebuild_command(
+            hosts=host1.fqdn, dry_run=True)
+        assert_deepequal(dict(
+            value=None,
+            result={hostgroup1.cn: [host1.fqdn]},
+            summary=u'1 membership would be added',
+        ), command())
+        hostgroup1.retrieve()
+
+        command = automember_hostgroup.make_rebuild_command(
+            type=u'hostgroup', rules=automember_hostgroup.cn)
+        assert_deepequal(dict(
+            value=None,
+            result={hostgroup1.cn: [host1.fqdn]},
+            summary=u'Automember rebuild membership completed, '
+                    u'1 membership added',
+        ), command())
+        assert_deepequal(dict(
+            value=None,
+            result=dict(),
+            summary=u'Automember rebuild membership completed, '
+                    u'0 memberships added',
+        ), command())
+        hostgroup1.attrs.update(member_host=[host1.fqdn])
+        hostgroup1.retrieve()
+        hostgroup1.remove_member(dict(host=host1.fqdn))
+        hostgroup1.retrieve()
+
     def test_rebuild_membership_for_host(self, host1, automember_hostgroup,
                                          hostgroup1):
         """ Rebuild automember membership for one host, both synchronously and
@@ -21,11 +21,14 @@
 Test the `ipalib.plugins.baseldap` module.
 """
 
+import re
+
 import ldap
 
 from ipapython.dn import DN
 from ipapython import ipaldap
-from ipalib import errors
+from ipalib import errors, Str
+from ipalib.config import Env
 from ipalib.frontend import Command
 from ipaserver.plugins import baseldap
 from ipatests.util import assert_deepequal
@@ -221,3 +224,162 @@ def test_entry_to_dict():
     assert_deepequal(
         baseldap.entry_to_dict(entry, all=True, raw=True),
         the_dict)
+
+
+class FakeDirectory(ipaldap.LDAPClient):
+    """LDAP client searching entries in memory by (attr=value) filters"""
+    case_exact_attrs = ('sudocmd',)
+
+    class FakeSchema(object):
+        def get_obj(self, type, name):
+            return None
+
+    def __init__(self):
+        super(FakeDirectory, self).__init__('ldap://test',
+                                            force_schema_updates=False)
+        self._has_schema = True
+        self._schema = self.FakeSchema()
+        self.entries = []
+        self.searches = []
+
+    def add(self, dn, **attrs):
+        self.entries.append(self.make_entry(dn, **attrs))
+
+    def _match(self, entry, attr, value):
+        for entry_value in entry.get(attr, []):
+            if attr in self.case_exact_attrs:
+                if entry_value == value:
+                    return True
+            elif entry_value.lower() == value.lower():
+                return True
+        return False
+
+    def get_entries_multi(self, searches, time_limit=None, size_limit=None,
+                          window=ipaldap.MULTI_SEARCH_WINDOW):
+        results = []
+        for base_dn, scope, search_filter, _attrs_list in searches:
+            self.searches.append(search_filter)
+            assertions = [
+                (attr, value) for attr, value
+                in re.findall(r'\(([^()=]+)=([^()]*)\)', search_filter)
+                if attr != 'objectclass']
+            result = []
+            for entry in self.entries:
+                if scope == self.SCOPE_ONELEVEL:
+                    if entry.dn[1:] != base_dn:
+                        continue
+                elif not entry.dn.endswith(base_dn):
+                    continue
+                if any(self._match(entry, attr, value)
+                       for attr, value in assertions):
+                    result.append(entry)
+            results.append(result)
+        return results
+
+
+class FakeObjects(dict):
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            key = key[0]
+        return super(FakeObjects, self).__getitem__(key)
+
+
+class FakeAPI(object):
+    def __init__(self, basedn):
+        self.env = Env()
+        self.env.basedn = basedn
+        self.Object = FakeObjects()
+
+
+@pytest.fixture
+def member_api():
+    from ipaserver.plugins.host import host
+    from ipaserver.plugins.sudocmd import sudocmd
+
+    basedn = DN(('dc', 'example'), ('dc', 'com'))
+    api = FakeAPI(basedn)
+    conn = FakeDirectory()
+
+    for cls, pkey in ((host, 'fqdn'), (sudocmd, 'sudocmd')):
+        obj = cls(api)
+        obj.backend = conn
+        obj.primary_key = Str(pkey, primary_key=True)
+        api.Object[cls.__name__] = obj
+
+    host_container = DN(host.container_dn, basedn)
+    conn.add(DN(('fqdn', 'web.example.com'), host_container),
+             fqdn=[u'web.example.com'], serverhostname=[u'web'])
+    conn.add(DN(('fqdn', 'db.example.com'), host_container),
+             fqdn=[u'db.example.com'], serverhostname=[u'db'])
+
+    sudocmd_container = DN(sudocmd.container_dn, basedn)
+    conn.add(DN(('ipauniqueid', '1'), sudocmd_container),
+             sudocmd=[u'/usr/bin/less'])
+    conn.add(DN(('ipauniqueid', '2'), sudocmd_container),
+             sudocmd=[u'/usr/bin/LESS'])
+
+    return api
+
+
+@pytest.mark.tier0
+def test_get_dns_if_exist_host(member_api):
+    host = member_api.Object['host']
+    basedn = member_api.env.basedn
+    (dns, failed) = host.get_dns_if_exist(
+        [u'web.example.com', u'db', u'missing.example.com'])
+
+    host_container = DN(host.container_dn, basedn)
+    assert dns == {
+        u'web.example.com': DN(('fqdn', 'web.example.com'), host_container),
+        u'db': DN(('fqdn', 'db.example.com'), host_container),
+    }
+    assert [(key, type(e)) for key, e in failed] == [
+        (u'missing.example.com', errors.NotFound)]
+    # one search by FQDN, one by short name for the rest
+    assert len(host.backend.searches) == 2
+
+
+@pytest.mark.tier0
+def test_get_dns_if_exist_rdn_attribute(member_api):
+    sudocmd = member_api.Object['sudocmd']
+    basedn = member_api.env.basedn
+    (dns, failed) = sudocmd.get_dns_if_exist(
+        [u'/usr/bin/less', u'/usr/bin/LESS.', u'/usr/bin/vim'])
+
+    sudocmd_container = DN(sudocmd.container_dn, basedn)
+    assert dns == {
+        u'/usr/bin/less': DN(('ipauniqueid', '1'), sudocmd_container),
+        u'/usr/bin/LESS.': DN(('ipauniqueid', '2'), sudocmd_container),
+    }
+    assert [(key, type(e)) for key, e in failed] == [
+        (u'/usr/bin/vim', errors.NotFound)]
+    assert len(sudocmd.backend.searches) == 1
+
+
+@pytest.mark.tier0
+def test_get_member_dns(member_api):
+    class fakegroup(object):
+        attribute_members = {'member': ['host', 'sudocmd']}
+
+    class fakegroup_add_member(baseldap.LDAPAddMember):
+        pass
+
+    member_api.Object['fakegroup'] = fakegroup()
+    command = fakegroup_add_member(member_api)
+    basedn = member_api.env.basedn
+    host_container = DN(member_api.Object['host'].container_dn, basedn)
+    sudocmd_container = DN(member_api.Object['sudocmd'].container_dn, basedn)
+
+    (member_dns, failed) = command.get_member_dns(
+        host=[u'db', u'missing.example.com', u'web.example.com'],
+        sudocmd=[u'/usr/bin/LESS'])
+
+    assert member_dns == {'member': {
+        'host': [DN(('fqdn', 'db.example.com'), host_container),
+                 DN(('fqdn', 'web.example.com'), host_container)],
+        'sudocmd': [DN(('ipauniqueid', '2'), sudocmd_container)],
+    }}
+    assert failed == {'member': {
+        'host': [(u'missing.example.com', u'no such entry')],
+        'sudocmd': [],
+    }}
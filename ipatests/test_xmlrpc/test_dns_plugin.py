@@ -27,6 +27,7 @@ from ipapython.dnsutil import DNSName
 from ipapython.dn import DN
 from ipatests.test_xmlrpc import objectclasses
 from ipatests.test_xmlrpc.xmlrpc_test import Declarative, fuzzy_digits
+from ipatests.util import Fuzzy
 import pytest
 
 try:
@@ -3034,6 +3035,150 @@ class test_dns(Declarative):
         ),
 
 
+        dict(
+            desc='Import records into zone %r' % zone1,
+            command=('dnszone_import', [zone1], {
+                'format': u'json',
+                'zonedata': (
+                    u'{"name": "import", "type": "A", "data": "172.16.29.1"}\n'
+                    u'{"name": "import", "type": "A", "data": "172.16.29.2"}\n'
+                    u'{"name": "import", "type": "TXT", "data": "\\"text\\""}\n'
+                ),
+            }),
+            expected={
+                'value': zone1_absolute_dnsname,
+                'summary': (u'Imported resource records into zone "%s"' %
+                            zone1_absolute),
+                'result': {
+                    'added': 1,
+                    'updated': 0,
+                    'records': 3,
+                    'skipped': 0,
+                },
+            },
+        ),
+
+
+        dict(
+            desc='Import the same records into zone %r again' % zone1,
+            command=('dnszone_import', [zone1], {
+                'zonedata': u'import IN A 172.16.29.1\n',
+            }),
+            expected={
+                'value': zone1_absolute_dnsname,
+                'summary': (u'Imported resource records into zone "%s"' %
+                            zone1_absolute),
+                'result': {
+                    'added': 0,
+                    'updated': 0,
+                    'records': 0,
+                    'skipped': 0,
+                },
+            },
+        ),
+
+
+        dict(
+            desc='Try to import a record of unsupported type into zone %r' %
+                 zone1,
+            command=('dnszone_import', [zone1], {
+                'zonedata': u'import IN WKS 172.16.29.1 TCP 25\n',
+            }),
+            expected=errors.ValidationError(
+                name='zonedata',
+                error=u'import: unsupported record type WKS'),
+        ),
+
+
+        dict(
+            desc='Import records with and without TTL into zone %r' % zone1,
+            command=('dnszone_import', [zone1], {
+                'zonedata': (u'import2 IN A 172.16.29.3\n'
+                             u'import3 600 IN A 172.16.29.4\n'),
+            }),
+            expected={
+                'value': zone1_absolute_dnsname,
+                'summary': (u'Imported resource records into zone "%s"' %
+                            zone1_absolute),
+                'result': {
+                    'added': 2,
+                    'updated': 0,
+                    'records': 2,
+                    'skipped': 0,
+                },
+            },
+        ),
+
+
+        dict(
+            desc='Check record without TTL got no TTL in zone %r' % zone1,
+            command=('dnsrecord_show', [zone1, u'import2'], {'all': True}),
+            expected=lambda o, x: 'dnsttl' not in x['result'],
+        ),
+
+
+        dict(
+            desc='Check record with TTL kept its TTL in zone %r' % zone1,
+            command=('dnsrecord_show', [zone1, u'import3'], {'all': True}),
+            expected=lambda o, x: (
+                [int(v) for v in x['result'].get('dnsttl', [])] == [600]),
+        ),
+
+
+        dict(
+            desc='Import a new TTL of existing records into zone %r' % zone1,
+            command=('dnszone_import', [zone1], {
+                'zonedata': u'import3 300 IN A 172.16.29.4\n',
+            }),
+            expected={
+                'value': zone1_absolute_dnsname,
+                'summary': (u'Imported resource records into zone "%s"' %
+                            zone1_absolute),
+                'result': {
+                    'added': 0,
+                    'updated': 1,
+                    'records': 0,
+                    'skipped': 0,
+                },
+            },
+        ),
+
+
+        dict(
+            desc='Check existing records got the new TTL in zone %r' % zone1,
+            command=('dnsrecord_show', [zone1, u'import3'], {'all': True}),
+            expected=lambda o, x: (
+                [int(v) for v in x['result'].get('dnsttl', [])] == [300]),
+        ),
+
+
+        dict(
+            desc='Try to import records of a name with different TTLs into '
+                 'zone %r' % zone1,
+            command=('dnszone_import', [zone1], {
+                'zonedata': (u'import4 600 IN A 172.16.29.5\n'
+                             u'import4 300 IN TXT "text"\n'),
+            }),
+            expected=errors.ValidationError(
+                name='zonedata',
+                error=u'import4: records of a name must have the same TTL'),
+        ),
+
+
+        dict(
+            desc='Export zone %r' % zone1,
+            command=('dnszone_export', [zone1], {}),
+            expected={
+                'value': zone1_absolute_dnsname,
+                'summary': (u'Exported resource records of zone "%s"' %
+                            zone1_absolute),
+                'result': Fuzzy(
+                    u'(?s)^\\$ORIGIN %s\n.*\nimport IN A 172\\.16\\.29\\.1\n'
+                    % zone1_absolute.replace(u'.', u'\\.')),
+            },
+        ),
+
+
         dict(
             desc='Disable zone %r' % zone1,
             command=('dnszone_disable', [zone1], {}),
@@ -21,13 +21,18 @@
 Test the `ipaserver/plugins/vault.py` module.
 """
 
+import os
+
 import nose
 import pytest
 import six
 
-from ipalib import api
+from ipaclient.plugins import vault as vault_client
+from ipalib import api, errors
 from ipatests.test_xmlrpc.xmlrpc_test import Declarative, fuzzy_bytes
 
+if six.PY3:
+    unicode = str
 
 vault_name = u'test_vault'
 service_name = u'HTTP/server.example.com'
@@ -1005,3 +1010,102 @@ class test_vault_plugin(Declarative):
         },
 
     ]
+
+
+multipart_vault_name = u'multipart_test_vault'
+
+
+@pytest.mark.tier1
+class test_vault_multipart(object):
+    """Test archiving files larger than the vault data size limit in parts
+    """
+    chunk_size = 1024
+
+    @classmethod
+    def setup_class(cls):
+        if not api.Backend.rpcclient.isconnected():
+            api.Backend.rpcclient.connect()
+
+        if not api.Command.kra_is_enabled()['result']:
+            raise nose.SkipTest('KRA service is not enabled')
+
+        api.Command.vault_add(multipart_vault_name, ipavaulttype=u'standard')
+
+    @classmethod
+    def teardown_class(cls):
+        api.Command.vault_del(multipart_vault_name, **{'continue': True})
+
+    @pytest.fixture(autouse=True)
+    def small_parts(self, monkeypatch):
+        monkeypatch.setattr(vault_client, 'MAX_VAULT_DATA_SIZE',
+                            self.chunk_size)
+        monkeypatch.setattr(vault_client, 'VAULT_DATA_CHUNK_SIZE',
+                            self.chunk_size)
+
+    def archive(self, tmpdir, data):
+        input_file = tmpdir.join('in')
+        input_file.write_binary(data)
+        return api.Command.vault_archive(multipart_vault_name,
+                                         **{'in': unicode(input_file)})
+
+    def retrieve(self, tmpdir):
+        output_file = tmpdir.join('out')
+        api.Command.vault_retrieve(multipart_vault_name,
+                                   out=unicode(output_file))
+        return output_file.read_binary()
+
+    def test_archive_retrieve(self, tmpdir):
+        data = os.urandom(self.chunk_size * 3 + 100)
+        self.archive(tmpdir, data)
+
+        assert self.retrieve(tmpdir) == data
+        result = api.Command.vault_retrieve(multipart_vault_name)
+        assert result['result']['data'] == data
+
+        # replace multi-part data with other multi-part and single-part data
+        data = os.urandom(self.chunk_size * 2 + 1)
+        self.archive(tmpdir, data)
+        assert self.retrieve(tmpdir) == data
+
+        data = os.urandom(self.chunk_size // 2)
+        self.archive(tmpdir, data)
+        assert self.retrieve(tmpdir) == data
+
+    def test_interrupted_archive(self, tmpdir, monkeypatch):
+        data = os.urandom(self.chunk_size * 2 + 100)
+        self.archive(tmpdir, data)
+
+        plugin_class = type(api.Command.vault_archive)
+        archive_part = plugin_class._archive_part
+        archived = []
+
+        def interrupted_archive_part(self, vault_data, chunk, *args,
+                                     **options):
+            if len(archived) == 2:
+                raise errors.NetworkError(uri='kra', error='interrupted')
+            archived.append(chunk)
+            return archive_part(self, vault_data, chunk, *args, **options)
+
+        monkeypatch.setattr(plugin_class, '_archive_part',
+                            interrupted_archive_part)
+        with pytest.raises(errors.NetworkError):
+            self.archive(tmpdir, os.urandom(self.chunk_size * 4))
+
+        # the parts of the new data were archived, the old data remain
+        assert archived == [1, 2]
+        assert self.retrieve(tmpdir) == data
+
+        # the interrupted archive is recorded in the vault entry
+        vault = api.Command.vault_show(multipart_vault_name, all=True)
+        generation = vault['result']['ipavaultgeneration']
+        assert vault['result']['ipavaultpendinggeneration'] != generation
+
+        # the next archive supersedes the interrupted one
+        monkeypatch.setattr(plugin_class, '_archive_part', archive_part)
+        data = os.urandom(self.chunk_size * 2)
+        self.archive(tmpdir, data)
+        assert self.retrieve(tmpdir) == data
+
+        vault = api.Command.vault_show(multipart_vault_name, all=True)
+        assert 'ipavaultpendinggeneration' not in vault['result']
+        assert vault['result']['ipavaultgeneration'] != generation